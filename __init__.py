@@ -94,11 +94,15 @@ try:
     # 导入其他模块（这些模块可能依赖 vendor/ 内的第三方包）
     with vendored_sys_path():
         from .gui.reader_window import ReaderWindow
+        from .utils.ai_transport import close_shared_transport
         from aqt import gui_hooks
 
     # Ensure Anki can close even if AnkiMorphs settings dialog is mid-initialization.
     gui_hooks.profile_will_close.append(_patch_ankimorphs_settings_dialog_close)
 
+    # 各阅读器窗口共用 AI 传输层：随配置文件关闭而关闭，不随某个窗口关闭
+    gui_hooks.profile_will_close.append(close_shared_transport)
+
     def show_reader():
         """显示阅读器窗口"""
         # 创建阅读器窗口
@@ -0,0 +1,163 @@
+from __future__ import annotations
+
+from typing import Callable, Dict, List, Optional, Tuple
+
+from aqt.qt import *
+
+# 同时显示的段数：当前段前后各留一些余量，滚动到窗口边缘前就已在文档中
+WINDOW_SEGMENTS = 5
+_ANCHOR_PREFIX = "reader-segment-"
+
+
+class ChapterWindow(QObject):
+    """超长章节的窗口化显示
+
+    章节按 html_segments 切成若干段，文档中只放当前段附近的几段；
+    滚动接近窗口边缘时，以当前所在段为中心重新放入一组段，并保持画面位置不变。
+    点词、取上下文仍直接作用于文档中的文字；阅读位置以“段索引 + 段内偏移”表示，
+    与窗口从哪一段开始无关。
+    """
+
+    def __init__(self, text_edit: QTextEdit, show_html: Callable[[str], None], parent=None):
+        super().__init__(parent)
+        self.text_edit = text_edit
+        # 放入 HTML 并套用阅读样式（由阅读器提供）
+        self._show_html = show_html
+        self._segments: List[str] = []
+        # 原章节的 <body> 开始标签：各段放入文档时用它包裹，保留书写方向等属性
+        self._body_tag = ""
+        self._first = 0
+        self._last = 0
+        # 窗口内各段开头所在的文本块编号；像素位置随排版变化，需要时再计算
+        self._segment_blocks: Dict[int, int] = {}
+        self._shifting = False
+        self._shift_timer = QTimer(self)
+        self._shift_timer.setSingleShot(True)
+        self._shift_timer.setInterval(0)
+        self._shift_timer.timeout.connect(self._shift_if_needed)
+        text_edit.verticalScrollBar().valueChanged.connect(self._on_scrolled)
+
+    def is_active(self) -> bool:
+        return len(self._segments) > 1
+
+    def load(self, segments: List[str], segment_index: int = 0, offset: int = 0, body_tag: str = "") -> None:
+        """显示一个分段章节，并定位到指定段内的偏移"""
+        self._segments = list(segments)
+        self._body_tag = body_tag
+        segment_index = self._clamp(segment_index)
+        self._render(self._window_start(segment_index))
+        self.restore(segment_index, offset)
+
+    def clear(self) -> None:
+        """退出窗口化显示（切换到普通章节时调用）"""
+        self._shift_timer.stop()
+        self._segments = []
+        self._segment_blocks = {}
+        self._first = self._last = 0
+
+    def position(self) -> Tuple[int, int]:
+        """当前阅读位置：(段索引, 相对该段开头的滚动偏移)"""
+        value = self.text_edit.verticalScrollBar().value()
+        if not self.is_active():
+            return 0, value
+        current = self._first
+        current_top = 0
+        for index in range(self._first, self._last):
+            top = self._segment_top(index)
+            if top is None:
+                continue
+            if top > value:
+                break
+            current, current_top = index, top
+        return current, value - current_top
+
+    def restore(self, segment_index: int, offset: int) -> None:
+        """滚动到指定段内的偏移（该段不在窗口内时先重新放入窗口）"""
+        if not self.is_active():
+            self.text_edit.verticalScrollBar().setValue(offset)
+            return
+        segment_index = self._clamp(segment_index)
+        if not self._first <= segment_index < self._last:
+            self._render(self._window_start(segment_index))
+        top = self._segment_top(segment_index) or 0
+        self._set_scroll(top + max(0, offset))
+
+    def _clamp(self, segment_index: int) -> int:
+        return max(0, min(segment_index, len(self._segments) - 1))
+
+    def _window_start(self, segment_index: int) -> int:
+        """让指定段位于窗口第二段的位置：向上向下都留有余量"""
+        return max(0, min(segment_index - 1, len(self._segments) - WINDOW_SEGMENTS))
+
+    def _render(self, first: int) -> None:
+        self._first = first
+        self._last = min(len(self._segments), first + WINDOW_SEGMENTS)
+        # 每段前放一个空锚点，排版后据此找到各段开头所在的文本块
+        html = "".join(
+            f'<a name="{_ANCHOR_PREFIX}{index}"></a>{self._segments[index]}'
+            for index in range(self._first, self._last)
+        )
+        if self._body_tag:
+            html = f"{self._body_tag}{html}</body>"
+        self._shifting = True
+        try:
+            self._show_html(html)
+        finally:
+            self._shifting = False
+        self._segment_blocks = self._find_segment_blocks()
+
+    def _find_segment_blocks(self) -> Dict[int, int]:
+        blocks: Dict[int, int] = {}
+        wanted = self._last - self._first
+        block = self.text_edit.document().begin()
+        while block.isValid() and len(blocks) < wanted:
+            iterator = block.begin()
+            while not iterator.atEnd():
+                for name in iterator.fragment().charFormat().anchorNames():
+                    if name.startswith(_ANCHOR_PREFIX):
+                        blocks.setdefault(int(name[len(_ANCHOR_PREFIX):]), block.blockNumber())
+                iterator += 1
+            block = block.next()
+        return blocks
+
+    def _segment_top(self, segment_index: int) -> Optional[int]:
+        if segment_index == self._first:
+            return 0
+        block_number = self._segment_blocks.get(segment_index)
+        if block_number is None:
+            return None
+        document = self.text_edit.document()
+        block = document.findBlockByNumber(block_number)
+        return int(document.documentLayout().blockBoundingRect(block).top())
+
+    def _set_scroll(self, value: int) -> None:
+        self._shifting = True
+        try:
+            self.text_edit.verticalScrollBar().setValue(value)
+        finally:
+            self._shifting = False
+
+    def _on_scrolled(self, value: int) -> None:
+        if self._shifting or not self.is_active():
+            return
+        # 不在滚动信号中直接替换文档
+        self._shift_timer.start()
+
+    def _shift_if_needed(self) -> None:
+        if not self.is_active():
+            return
+        scrollbar = self.text_edit.verticalScrollBar()
+        margin = self.text_edit.viewport().height()
+        near_top = self._first > 0 and scrollbar.value() <= margin
+        near_bottom = (
+            self._last < len(self._segments)
+            and scrollbar.value() >= scrollbar.maximum() - margin
+        )
+        if not (near_top or near_bottom):
+            return
+        segment_index, offset = self.position()
+        first = self._window_start(segment_index)
+        if first == self._first:
+            return
+        self._render(first)
+        self.restore(segment_index, offset)
@@ -1,13 +1,15 @@
 from aqt.qt import *
 
+from .library_model import ACTION_COLUMN, DEFAULT_SORT_COLUMN, DeleteButtonDelegate, LibraryTableModel
+
 
 class EPUBManagerDialog(QDialog):
     def __init__(self, parent=None):
         super().__init__(parent)
         self.parent = parent
         self.db_handler = parent.db_handler
+        # 启用排序时视图会按默认排序列调用 model.sort()，由此加载第一页
         self.setup_ui()
-        self.load_books()
 
     def setup_ui(self):
         """设置UI"""
@@ -17,19 +19,50 @@ class EPUBManagerDialog(QDialog):
 
         layout = QVBoxLayout()
 
-        self.table = QTableWidget()
-        self.table.setColumnCount(7)
-        self.table.setHorizontalHeaderLabels(["书名", "作者", "语言", "章节", "进度", "添加时间", "操作"])
-        self.table.horizontalHeader().setSectionResizeMode(0, QHeaderView.ResizeMode.Stretch)
-        self.table.horizontalHeader().setSectionResizeMode(1, QHeaderView.ResizeMode.ResizeToContents)
-        self.table.horizontalHeader().setSectionResizeMode(2, QHeaderView.ResizeMode.ResizeToContents)
-        self.table.horizontalHeader().setSectionResizeMode(3, QHeaderView.ResizeMode.ResizeToContents)
-        self.table.horizontalHeader().setSectionResizeMode(4, QHeaderView.ResizeMode.ResizeToContents)
-        self.table.horizontalHeader().setSectionResizeMode(5, QHeaderView.ResizeMode.ResizeToContents)
-        self.table.horizontalHeader().setSectionResizeMode(6, QHeaderView.ResizeMode.ResizeToContents)
-
-        self.table.setSelectionBehavior(QTableWidget.SelectionBehavior.SelectRows)
-        self.table.setSelectionMode(QTableWidget.SelectionMode.SingleSelection)
+        filter_layout = QHBoxLayout()
+        self.filter_edit = QLineEdit()
+        self.filter_edit.setPlaceholderText("按书名或作者筛选")
+        self.filter_edit.setClearButtonEnabled(True)
+        filter_layout.addWidget(self.filter_edit)
+        self.count_label = QLabel()
+        filter_layout.addWidget(self.count_label)
+        layout.addLayout(filter_layout)
+
+        # 输入停顿后再查询，避免每个按键都触发一次 SQL
+        self._filter_timer = QTimer(self)
+        self._filter_timer.setSingleShot(True)
+        self._filter_timer.setInterval(250)
+        self._filter_timer.timeout.connect(self._apply_filter)
+        self.filter_edit.textChanged.connect(lambda _text: self._filter_timer.start())
+
+        self.model = LibraryTableModel(self.db_handler, self)
+        self.model.modelReset.connect(self._update_count_label)
+
+        self.table = QTableView()
+        self.table.setModel(self.model)
+        self.delete_delegate = DeleteButtonDelegate(self.table)
+        # 删除会重置模型，排队到委托的事件处理结束后再执行
+        self.delete_delegate.delete_requested.connect(self.delete_book, Qt.ConnectionType.QueuedConnection)
+        self.table.setItemDelegateForColumn(ACTION_COLUMN, self.delete_delegate)
+        self.table.setMouseTracking(True)
+
+        header = self.table.horizontalHeader()
+        # 按内容自动调整列宽需要测量所有行，改为固定宽度的交互式列
+        header.setSectionResizeMode(QHeaderView.ResizeMode.Interactive)
+        header.setSectionResizeMode(0, QHeaderView.ResizeMode.Stretch)
+        header.setSectionResizeMode(ACTION_COLUMN, QHeaderView.ResizeMode.Fixed)
+        header.resizeSection(ACTION_COLUMN, 70)
+        self.table.verticalHeader().setVisible(False)
+        self.table.verticalHeader().setSectionResizeMode(QHeaderView.ResizeMode.Fixed)
+
+        self.table.setSelectionBehavior(QAbstractItemView.SelectionBehavior.SelectRows)
+        self.table.setSelectionMode(QAbstractItemView.SelectionMode.SingleSelection)
+        self.table.setEditTriggers(QAbstractItemView.EditTrigger.NoEditTriggers)
+        self.table.doubleClicked.connect(lambda _index: self.open_selected_book())
+
+        # 排序在 SQL 中完成：点击表头时视图调用 model.sort()
+        header.setSortIndicator(DEFAULT_SORT_COLUMN, Qt.SortOrder.DescendingOrder)
+        self.table.setSortingEnabled(True)
 
         layout.addWidget(self.table)
 
@@ -53,49 +86,23 @@ class EPUBManagerDialog(QDialog):
         self.setLayout(layout)
 
     def load_books(self):
-        """加载书籍列表"""
-        books = self.db_handler.get_book_list()
-        self.table.setRowCount(len(books))
-
-        for row, book in enumerate(books):
-            title_item = QTableWidgetItem(book[1])
-            title_item.setData(Qt.ItemDataRole.UserRole, book[0])
-            self.table.setItem(row, 0, title_item)
-
-            self.table.setItem(row, 1, QTableWidgetItem(book[2] or "未知"))
-            self.table.setItem(row, 2, QTableWidgetItem(book[4] or "未知"))
-
-            chapters = self.db_handler.get_chapter_list(book[0])
-            chapter_count = len(chapters)
-            self.table.setItem(row, 3, QTableWidgetItem(str(chapter_count)))
-
-            progress = self.db_handler.get_book_progress(book[0])
-            if progress:
-                progress_text = f"{progress['chapter_index'] + 1}/{chapter_count}"
-            else:
-                progress_text = "未开始"
-            self.table.setItem(row, 4, QTableWidgetItem(progress_text))
-
-            self.table.setItem(row, 5, QTableWidgetItem(str(book[5])))
-
-            btn_widget = QWidget()
-            btn_layout = QHBoxLayout(btn_widget)
-            btn_layout.setContentsMargins(2, 2, 2, 2)
+        """加载书籍列表（只读取第一页，其余在滚动时按需读取）"""
+        self.model.refresh()
 
-            delete_btn = QPushButton("删除")
-            delete_btn.clicked.connect(lambda checked, book_id=book[0]: self.delete_book(book_id))
-            btn_layout.addWidget(delete_btn)
+    def _apply_filter(self):
+        self.model.set_filter(self.filter_edit.text())
 
-            self.table.setCellWidget(row, 6, btn_widget)
+    def _update_count_label(self):
+        self.count_label.setText(f"共 {self.model.total_count()} 本")
 
     def open_selected_book(self):
         """打开选中的书籍"""
-        selected_items = self.table.selectedItems()
-        if not selected_items:
+        selected_rows = self.table.selectionModel().selectedRows()
+        if not selected_rows:
             QMessageBox.warning(self, "提示", "请先选择一本书。")
             return
 
-        book_id = self.table.item(selected_items[0].row(), 0).data(Qt.ItemDataRole.UserRole)
+        book_id = self.model.book_id(selected_rows[0].row())
         if book_id:
             try:
                 print(f"正在打开书籍ID: {book_id}")
@@ -142,8 +149,9 @@ class EPUBManagerDialog(QDialog):
             "EPUB Files (*.epub)",
         )
         if file_name:
+            # 导入在后台进行，首章写入后阅读器即会打开该书
             self.parent.open_epub(file_name)
-            self.load_books()
+            self.accept()
 
     def delete_book(self, book_id: int):
         """删除书籍"""
@@ -162,6 +170,7 @@ class EPUBManagerDialog(QDialog):
                 if self.parent.current_book_id == book_id:
                     self.parent.current_book_id = None
                     self.parent.current_chapter_index = 0
+                    self.parent.chapter_window.clear()
                     self.parent.textEdit.clear()
                     self.parent.ui.chapter_combo.clear()
 
@@ -0,0 +1,77 @@
+from __future__ import annotations
+
+from typing import Dict, List, Optional
+
+from aqt.qt import QThread, pyqtSignal
+
+from ..utils.epub_handler import EPUBHandler
+
+# 第一批只含一章，让阅读器尽快显示首章；之后按批提交，减少跨线程信号与事务次数
+FIRST_BATCH_SIZE = 1
+BATCH_SIZE = 16
+
+
+class EPUBImportThread(QThread):
+    """在后台线程中解析 EPUB，按批把章节交给主线程写入数据库。
+
+    数据库写入仍在主线程（信号槽）中完成，本线程只负责读取与解析。
+    """
+
+    loaded = pyqtSignal(dict, int)  # metadata, spine_count
+    progress = pyqtSignal(int, int, str)  # done, total, chapter_title
+    chapters_ready = pyqtSignal(int, list)  # start_index, chapters
+    completed = pyqtSignal(int)  # chapter_count
+    failed = pyqtSignal(str)  # error_message
+    cancelled = pyqtSignal()
+
+    def __init__(self, *, file_path: str, parser: Optional[str] = None, parent=None):
+        super().__init__(parent)
+        self.file_path = file_path
+        self._parser = parser
+        self._cancelled = False
+
+    def cancel(self) -> None:
+        self._cancelled = True
+
+    def is_cancelled(self) -> bool:
+        return self._cancelled
+
+    def run(self) -> None:
+        try:
+            handler = EPUBHandler(parser=self._parser)
+            if not handler.load_book(self.file_path, lazy=True):
+                self.failed.emit("无法加载EPUB文件")
+                return
+
+            total = handler.get_chapter_count()
+            self.loaded.emit(handler.get_metadata(), total)
+
+            batch: List[Dict] = []
+            batch_start = 0
+            batch_size = FIRST_BATCH_SIZE
+            count = 0
+            chapters = handler.iter_chapters()
+            try:
+                for chapter in chapters:
+                    if self._cancelled:
+                        self.cancelled.emit()
+                        return
+                    batch.append(chapter)
+                    count += 1
+                    self.progress.emit(count, total, chapter['name'])
+                    if len(batch) >= batch_size:
+                        self.chapters_ready.emit(batch_start, batch)
+                        batch_start = count
+                        batch = []
+                        batch_size = BATCH_SIZE
+            finally:
+                chapters.close()
+
+            if self._cancelled:
+                self.cancelled.emit()
+                return
+            if batch:
+                self.chapters_ready.emit(batch_start, batch)
+            self.completed.emit(count)
+        except Exception as exc:
+            self.failed.emit(str(exc))
@@ -0,0 +1,163 @@
+from __future__ import annotations
+
+from typing import Dict, List, Optional
+
+from aqt.qt import *
+
+# 每次从数据库取的行数：视图滚动到底部时再取下一页
+PAGE_SIZE = 200
+
+# (表头, 排序字段)；排序字段为 None 的列不可排序
+COLUMNS = [
+    ("书名", "title"),
+    ("作者", "author"),
+    ("语言", "language"),
+    ("章节", "chapter_count"),
+    ("进度", "progress"),
+    ("最后阅读", "last_read"),
+    ("添加时间", "created_at"),
+    ("操作", None),
+]
+ACTION_COLUMN = len(COLUMNS) - 1
+DEFAULT_SORT_COLUMN = 6
+
+
+class LibraryTableModel(QAbstractTableModel):
+    """书库列表模型：按页从数据库读取，排序与筛选都交给 SQL 完成"""
+
+    def __init__(self, db_handler, parent=None):
+        super().__init__(parent)
+        self.db_handler = db_handler
+        self._rows: List[Dict] = []
+        self._total = 0
+        self._filter_text = ""
+        self._sort_key = COLUMNS[DEFAULT_SORT_COLUMN][1]
+        self._descending = True
+
+    def refresh(self) -> None:
+        """重新统计并只加载第一页（排序、筛选或数据变化后调用）"""
+        self.beginResetModel()
+        self._total = self.db_handler.count_books(self._filter_text)
+        self._rows = self._fetch(0)
+        self.endResetModel()
+
+    def _fetch(self, offset: int) -> List[Dict]:
+        return self.db_handler.get_library_summary(
+            filter_text=self._filter_text,
+            sort_key=self._sort_key,
+            descending=self._descending,
+            offset=offset,
+            limit=PAGE_SIZE,
+        )
+
+    def set_filter(self, text: str) -> None:
+        text = text.strip()
+        if text == self._filter_text:
+            return
+        self._filter_text = text
+        self.refresh()
+
+    def book_id(self, row: int) -> Optional[int]:
+        if 0 <= row < len(self._rows):
+            return self._rows[row]['id']
+        return None
+
+    def total_count(self) -> int:
+        return self._total
+
+    def rowCount(self, parent=QModelIndex()) -> int:
+        return 0 if parent.isValid() else len(self._rows)
+
+    def columnCount(self, parent=QModelIndex()) -> int:
+        return 0 if parent.isValid() else len(COLUMNS)
+
+    def canFetchMore(self, parent=QModelIndex()) -> bool:
+        return not parent.isValid() and len(self._rows) < self._total
+
+    def fetchMore(self, parent=QModelIndex()) -> None:
+        if parent.isValid():
+            return
+        rows = self._fetch(len(self._rows))
+        if not rows:
+            # 数据在两次查询之间被删除，按实际数量结束
+            self._total = len(self._rows)
+            return
+        self.beginInsertRows(QModelIndex(), len(self._rows), len(self._rows) + len(rows) - 1)
+        self._rows.extend(rows)
+        self.endInsertRows()
+
+    def sort(self, column: int, order=Qt.SortOrder.AscendingOrder) -> None:
+        if not 0 <= column < len(COLUMNS) or COLUMNS[column][1] is None:
+            return
+        self._sort_key = COLUMNS[column][1]
+        self._descending = order == Qt.SortOrder.DescendingOrder
+        self.refresh()
+
+    def headerData(self, section, orientation, role=Qt.ItemDataRole.DisplayRole):
+        if orientation == Qt.Orientation.Horizontal and role == Qt.ItemDataRole.DisplayRole:
+            if 0 <= section < len(COLUMNS):
+                return COLUMNS[section][0]
+        return None
+
+    def data(self, index, role=Qt.ItemDataRole.DisplayRole):
+        if not index.isValid() or index.row() >= len(self._rows):
+            return None
+        book = self._rows[index.row()]
+        if role == Qt.ItemDataRole.UserRole:
+            return book['id']
+        if role != Qt.ItemDataRole.DisplayRole:
+            return None
+
+        column = index.column()
+        if column == 0:
+            return book['title']
+        if column == 1:
+            return book['author'] or "未知"
+        if column == 2:
+            return book['language'] or "未知"
+        if column == 3:
+            return str(book['chapter_count'])
+        if column == 4:
+            progress = book['progress']
+            if progress:
+                return f"{progress['chapter_index'] + 1}/{book['chapter_count']}"
+            return "未开始"
+        if column == 5:
+            return str(book['last_read'] or "")
+        if column == 6:
+            return str(book['created_at'])
+        if column == ACTION_COLUMN:
+            return "删除"
+        return None
+
+
+class DeleteButtonDelegate(QStyledItemDelegate):
+    """在操作列绘制“删除”按钮；只绘制，不为每行创建控件"""
+
+    delete_requested = pyqtSignal(int)  # book_id
+
+    def paint(self, painter, option, index):
+        button = QStyleOptionButton()
+        button.rect = option.rect.adjusted(2, 2, -2, -2)
+        button.text = index.data(Qt.ItemDataRole.DisplayRole) or ""
+        button.state = QStyle.StateFlag.State_Enabled
+        if option.state & QStyle.StateFlag.State_MouseOver:
+            button.state |= QStyle.StateFlag.State_MouseOver
+        style = option.widget.style() if option.widget else QApplication.style()
+        style.drawControl(QStyle.ControlElement.CE_PushButton, button, painter, option.widget)
+
+    def sizeHint(self, option, index):
+        width = option.fontMetrics.horizontalAdvance(index.data(Qt.ItemDataRole.DisplayRole) or "")
+        return QSize(width + 24, option.fontMetrics.height() + 10)
+
+    def editorEvent(self, event, model, option, index):
+        if (
+            event.type() == QEvent.Type.MouseButtonRelease
+            and event.button() == Qt.MouseButton.LeftButton
+            and option.rect.contains(event.position().toPoint())
+        ):
+            book_id = index.data(Qt.ItemDataRole.UserRole)
+            if book_id is not None:
+                self.delete_requested.emit(book_id)
+            return True
+        return super().editorEvent(event, model, option, index)
@@ -0,0 +1,252 @@
+from __future__ import annotations
+
+import time
+from collections import deque
+from dataclasses import dataclass
+from typing import Any, Callable, Deque, Dict, List, Mapping, Optional, Tuple
+
+from aqt.qt import QObject, QTimer, pyqtSignal
+
+from ..utils.ai_client import AIClient
+from ..utils.ai_transport import shared_transport
+from ..utils.lookup_cache import LookupCache
+from ..utils.paths import known_words_path, word_frequency_path
+from ..utils.word_rarity import WordRanker, load_word_list
+from .lookup_thread import stream_batch_lookup
+
+# 估算每个词的输出 token 数（预算检查用）
+ESTIMATED_OUTPUT_TOKENS = 300
+
+# build_request(word, context) -> (prompt, 缓存键, 释义语言)
+LookupRequestBuilder = Callable[[str, str], Tuple[str, str, str]]
+# build_batch_prompt([(word, context)]) -> prompt
+BatchPromptBuilder = Callable[[List[Tuple[str, str]]], str]
+
+
+def estimate_tokens(text: str) -> int:
+    """粗略估算 token 数：ASCII 约 4 个字符一个 token，其余字符（如中文）约一个字符一个"""
+    ascii_chars = sum(1 for ch in text if ord(ch) < 128)
+    return ascii_chars // 4 + (len(text) - ascii_chars) + 1
+
+
+@dataclass(frozen=True)
+class PrefetchSettings:
+    enabled: bool = False
+    words_per_page: int = 5
+    requests_per_minute: int = 6
+    tokens_per_chapter: int = 20000
+
+    @classmethod
+    def from_config(cls, config: Mapping[str, Any]) -> "PrefetchSettings":
+        """从 config.json 的 "lookup_prefetch" 项读取，缺失或无效的字段使用默认值"""
+        raw = config.get("lookup_prefetch")
+        if not isinstance(raw, Mapping):
+            return cls()
+        defaults = cls()
+        try:
+            return cls(
+                enabled=bool(raw.get("enabled", defaults.enabled)),
+                words_per_page=max(1, int(raw.get("words_per_page", defaults.words_per_page))),
+                requests_per_minute=max(1, int(raw.get("requests_per_minute", defaults.requests_per_minute))),
+                tokens_per_chapter=max(0, int(raw.get("tokens_per_chapter", defaults.tokens_per_chapter))),
+            )
+        except (TypeError, ValueError):
+            return defaults
+
+
+class PrefetchBudget:
+    """预取的花费上限：每分钟请求数与每章 token 数"""
+
+    def __init__(self, requests_per_minute: int, tokens_per_chapter: int):
+        self.requests_per_minute = requests_per_minute
+        self.tokens_per_chapter = tokens_per_chapter
+        self._request_times: Deque[float] = deque()
+        self.tokens_used = 0
+
+    def reset_chapter(self) -> None:
+        self.tokens_used = 0
+
+    def chapter_exhausted(self, estimated_tokens: int) -> bool:
+        return self.tokens_used + estimated_tokens > self.tokens_per_chapter
+
+    def seconds_until_slot(self) -> float:
+        """距离下一次允许请求还需等待的秒数（0 表示现在即可）"""
+        now = time.monotonic()
+        while self._request_times and now - self._request_times[0] >= 60:
+            self._request_times.popleft()
+        if len(self._request_times) < self.requests_per_minute:
+            return 0.0
+        return 60 - (now - self._request_times[0])
+
+    def record_request(self) -> None:
+        self._request_times.append(time.monotonic())
+
+    def record_tokens(self, tokens: int) -> None:
+        self.tokens_used += tokens
+
+
+class LookupPrefetcher(QObject):
+    """在后台预先查询可见页面中的生僻词，结果写入查词缓存
+
+    一页中选出的词合并为一个批量请求（共用的上下文只发送一次），每次只有一个
+    低优先级请求在进行，用户正在查词时暂停；结果按与单独点击相同的缓存键写入，
+    点击这些词时（同一句上下文）可直接命中缓存，其它位置也能先显示基本义。
+    """
+
+    _item_ready = pyqtSignal(object)  # (请求, 结果, 原始输出)
+    _batch_done = pyqtSignal(object)  # (请求列表, 估算的 token 数, 错误信息或 None)
+
+    def __init__(
+        self,
+        text_edit,
+        lookup_cache: LookupCache,
+        build_request: LookupRequestBuilder,
+        build_batch_prompt: BatchPromptBuilder,
+        is_busy: Callable[[], bool],
+        parent=None,
+    ):
+        super().__init__(parent)
+        self.text_edit = text_edit
+        self.lookup_cache = lookup_cache
+        self._build_request = build_request
+        self._build_batch_prompt = build_batch_prompt
+        self._is_busy = is_busy
+        self._ai_client: Optional[AIClient] = None
+        self.settings = PrefetchSettings()
+        self.budget = PrefetchBudget(self.settings.requests_per_minute, self.settings.tokens_per_chapter)
+        self.ranker = WordRanker()
+        self._queue: Deque[Dict[str, str]] = deque()
+        self._queued_keys = set()
+        self._future = None
+        self.requests = 0
+        self.failures = 0
+
+        # 滚动停下一会儿后再扫描可见区域
+        self._scan_timer = QTimer(self)
+        self._scan_timer.setSingleShot(True)
+        self._scan_timer.setInterval(1500)
+        self._scan_timer.timeout.connect(self._scan)
+        self._pump_timer = QTimer(self)
+        self._pump_timer.setSingleShot(True)
+        self._pump_timer.timeout.connect(self._pump)
+        self._item_ready.connect(self._on_item_ready)
+        self._batch_done.connect(self._on_batch_done)
+
+    def configure(self, settings: PrefetchSettings, ai_client: Optional[AIClient]) -> None:
+        """更新设置与 AI 客户端（重新加载词频表与已知词表）"""
+        self.settings = settings
+        self._ai_client = ai_client
+        self.budget.requests_per_minute = settings.requests_per_minute
+        self.budget.tokens_per_chapter = settings.tokens_per_chapter
+        if settings.enabled:
+            self.ranker = WordRanker(
+                load_word_list(word_frequency_path()),
+                load_word_list(known_words_path()),
+            )
+        else:
+            self.stop()
+
+    def schedule(self) -> None:
+        """可见区域变化（滚动、翻页）后调用"""
+        if self.settings.enabled and self._ai_client is not None:
+            self._scan_timer.start()
+
+    def chapter_changed(self) -> None:
+        self._clear_queue()
+        self.budget.reset_chapter()
+        self.schedule()
+
+    def stop(self) -> None:
+        self._scan_timer.stop()
+        self._pump_timer.stop()
+        self._clear_queue()
+        if self._future is not None:
+            self._future.cancel()
+            self._future = None
+
+    def _clear_queue(self) -> None:
+        self._queue.clear()
+        self._queued_keys.clear()
+
+    def _scan(self) -> None:
+        start, end = self.text_edit.visible_range()
+        text = self.text_edit.sentence_index().text
+        for word, offset in self.ranker.rank(text[start:end], self.settings.words_per_page):
+            context = self.text_edit.lookup_word(word, start + offset, for_ai=True)
+            _, cache_key, language = self._build_request(word, context)
+            if cache_key in self._queued_keys or self.lookup_cache.contains(cache_key):
+                continue
+            self._queued_keys.add(cache_key)
+            self._queue.append({
+                "word": word,
+                "context": context,
+                "cache_key": cache_key,
+                "language": language,
+            })
+        self._pump()
+
+    def _pump(self) -> None:
+        if self._future is not None or not self._queue or self._ai_client is None:
+            return
+        if self._is_busy():
+            # 让位给用户的查词请求
+            self._pump_timer.start(1000)
+            return
+        batch = list(self._queue)[: self.settings.words_per_page]
+        prompt = self._build_batch_prompt([(request["word"], request["context"]) for request in batch])
+        if self.budget.chapter_exhausted(estimate_tokens(prompt) + ESTIMATED_OUTPUT_TOKENS * len(batch)):
+            print("本章预取额度已用完")
+            self._clear_queue()
+            return
+        wait = self.budget.seconds_until_slot()
+        if wait > 0:
+            self._pump_timer.start(int(wait * 1000) + 50)
+            return
+
+        for _ in batch:
+            self._queue.popleft()
+        self.budget.record_request()
+        self.requests += 1
+        self._future = shared_transport().submit(self._fetch(self._ai_client, batch, prompt))
+
+    async def _fetch(self, ai_client: AIClient, batch: List[Dict[str, str]], prompt: str) -> None:
+        output = []
+        error = None
+        try:
+            async for position, result, raw in stream_batch_lookup(
+                ai_client,
+                prompt,
+                [request["word"] for request in batch],
+                max_basic_meanings=3,
+            ):
+                output.append(raw)
+                self._item_ready.emit((batch[position], result, raw))
+        except Exception as exc:
+            error = str(exc)
+        tokens = estimate_tokens(prompt) + estimate_tokens("".join(output))
+        self._batch_done.emit((batch, tokens, error))
+
+    def _on_item_ready(self, payload) -> None:
+        request, result, raw = payload
+        self.lookup_cache.put(request["cache_key"], result, raw)
+        self.lookup_cache.put_basic_meaning((request["word"], result.word), request["language"], result.basic_meaning)
+
+    def _on_batch_done(self, payload) -> None:
+        batch, tokens, error = payload
+        self._future = None
+        self.budget.record_tokens(tokens)
+        missing = [request["word"] for request in batch if not self.lookup_cache.contains(request["cache_key"])]
+        for request in batch:
+            self._queued_keys.discard(request["cache_key"])
+        if error or missing:
+            self.failures += len(missing)
+            print(f"预取释义未完成 {', '.join(missing)}: {error or '未返回结果'}")
+        self._pump()
+
+    def stats(self) -> Dict[str, int]:
+        return {
+            "requests": self.requests,
+            "failures": self.failures,
+            "tokens_used": self.budget.tokens_used,
+            "queued": len(self._queue),
+        }
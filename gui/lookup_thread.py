@@ -1,21 +1,36 @@
 from __future__ import annotations
 
 import asyncio
+import json
 import time
-from typing import Dict, Optional
+from concurrent.futures import Future
+from typing import AsyncIterator, Callable, Dict, List, Optional, Sequence, Tuple
 
-from aqt.qt import QThread, pyqtSignal
+from aqt.qt import QObject, pyqtSignal
 
 from ..utils.ai_client import AIClient
+from ..utils.ai_transport import shared_transport
+from ..utils.json_stream import JsonStreamError, JsonStreamParser
 from ..utils.lookup_json import (
     LookupResult,
+    LookupStreamParser,
     build_json_repair_prompt,
+    lookup_result_from_batch_item,
     parse_lookup_result,
 )
 
+# 向界面发送进度事件的最短间隔（秒）
+PROGRESS_MIN_INTERVAL = 0.016
 
-class LookupThread(QThread):
-    partial = pyqtSignal(int, str)  # request_id, accumulated_text
+
+class LookupThread(QObject):
+    """一次流式查词请求
+
+    请求提交到共享的 AITransport 事件循环执行，不再为每次查词创建线程与事件循环；
+    保留 start/cancel/isRunning 接口。信号从传输线程发出，按队列连接送到界面线程。
+    """
+
+    progress = pyqtSignal(int, list)  # request_id, [LookupFieldEvent]（自上次发出以来的新事件）
     finished = pyqtSignal(int, object, str)  # request_id, result, raw_text
     failed = pyqtSignal(int, str)  # request_id, error_message
     cancelled = pyqtSignal(int)  # request_id
@@ -40,73 +55,71 @@ class LookupThread(QThread):
         self._repair_attempts = max(0, int(repair_attempts))
 
         self._cancelled = False
-        self._loop: Optional[asyncio.AbstractEventLoop] = None
-        self._main_task: Optional[asyncio.Task] = None
+        self._future: Optional[Future] = None
+
+    def start(self) -> None:
+        self._future = shared_transport().submit(self._run())
+
+    def isRunning(self) -> bool:
+        return self._future is not None and not self._future.done()
 
     def cancel(self) -> None:
         self._cancelled = True
-        loop = self._loop
-        task = self._main_task
-        if loop and task:
-            try:
-                loop.call_soon_threadsafe(task.cancel)
-            except Exception:
-                pass
+        future = self._future
+        if future is not None:
+            # 取消传输线程中的协程（正在读取的响应随之中断）
+            future.cancel()
 
     def _is_cancelled(self) -> bool:
         return self._cancelled
 
-    def run(self) -> None:
-        self._loop = asyncio.new_event_loop()
-        asyncio.set_event_loop(self._loop)
+    async def _run(self) -> None:
         try:
-            self._main_task = self._loop.create_task(self._run_async())
-            self._loop.run_until_complete(self._main_task)
+            await self._run_async()
         except asyncio.CancelledError:
             self.cancelled.emit(self._request_id)
+            raise
         except Exception as exc:
             self.failed.emit(self._request_id, str(exc))
-        finally:
-            try:
-                pending = asyncio.all_tasks(loop=self._loop)
-                for t in pending:
-                    t.cancel()
-                if pending:
-                    self._loop.run_until_complete(asyncio.gather(*pending, return_exceptions=True))
-            except Exception:
-                pass
-            try:
-                self._loop.close()
-            except Exception:
-                pass
-            self._loop = None
-            self._main_task = None
 
     async def _run_async(self) -> None:
-        raw = ""
+        # 每个片段到达时增量解析，只向界面发送新增的字段事件；
+        # 这里只合并同一帧内的零碎片段，实际刷新频率由界面按写入耗时调节
+        stream = LookupStreamParser(max_basic_meanings=self._max_basic_meanings)
+        chunks = []
+        pending = []
         last_emit = 0.0
 
         async for delta in self._ai_client.explain_stream(self._prompt, cancel_cb=self._is_cancelled):
             if self._cancelled:
                 raise asyncio.CancelledError()
-            raw += delta
+            chunks.append(delta)
+            pending.extend(stream.feed(delta))
 
             now = time.monotonic()
-            if now - last_emit >= 0.05:
+            if pending and now - last_emit >= PROGRESS_MIN_INTERVAL:
                 last_emit = now
-                self.partial.emit(self._request_id, raw)
+                self.progress.emit(self._request_id, pending)
+                pending = []
 
         if self._cancelled:
             raise asyncio.CancelledError()
 
-        self.partial.emit(self._request_id, raw)
+        if pending:
+            self.progress.emit(self._request_id, pending)
+        raw = "".join(chunks)
 
         try:
-            result = parse_lookup_result(raw, max_basic_meanings=self._max_basic_meanings)
+            result = stream.result()
+        except ValueError:
+            # 不完整或夹杂其它文字的输出：退回到整体提取第一个 JSON 对象
+            try:
+                result = parse_lookup_result(raw, max_basic_meanings=self._max_basic_meanings)
+            except Exception:
+                result = None
+        if result is not None:
             self.finished.emit(self._request_id, result, raw)
             return
-        except Exception:
-            pass
 
         invalid_output = raw
         for _ in range(self._repair_attempts):
@@ -126,3 +139,124 @@ class LookupThread(QThread):
                 continue
 
         raise Exception("模型输出无法解析为 JSON（已尝试修复/重试）")
+
+
+async def stream_batch_lookup(
+    ai_client: AIClient,
+    prompt: str,
+    words: Sequence[str],
+    *,
+    max_basic_meanings: int = 3,
+    cancel_cb: Optional[Callable[[], bool]] = None,
+) -> AsyncIterator[Tuple[int, LookupResult, str]]:
+    """流式执行批量查词请求，数组中每个对象完整到达时产出 (词汇下标, 结果, 对象 JSON)
+
+    优先按对象的 index 字段对应词汇，缺失或重复时按单词匹配，再按顺序补位；
+    无法解析的对象被跳过（调用方可对未返回的词汇单独查询）。
+    """
+    parser = JsonStreamParser()
+    failed = False
+    remaining = list(range(len(words)))
+    async for delta in ai_client.explain_stream(prompt, cancel_cb=cancel_cb):
+        # 读完整个响应（连接才能放回连接池），但出错后不再解析
+        if failed or parser.done:
+            continue
+        try:
+            events = parser.feed(delta)
+        except JsonStreamError as exc:
+            print(f"批量查词输出不是合法的 JSON: {str(exc)}")
+            failed = True
+            continue
+        for kind, path, value in events:
+            # 数组中的对象；只查一个词时模型也可能直接输出一个对象
+            if kind != "value" or len(path) > 1 or not isinstance(value, dict):
+                continue
+            try:
+                index, result = lookup_result_from_batch_item(value, max_basic_meanings=max_basic_meanings)
+            except Exception as exc:
+                print(f"批量查词结果解析失败: {str(exc)}")
+                continue
+            position = _match_batch_item(index, result.word, words, remaining)
+            if position is None:
+                continue
+            remaining.remove(position)
+            yield position, result, json.dumps(value, ensure_ascii=False)
+
+
+def _match_batch_item(index: Optional[int], word: str, words: Sequence[str], remaining: List[int]) -> Optional[int]:
+    if index is not None and index - 1 in remaining:
+        return index - 1
+    folded = word.casefold()
+    for position in remaining:
+        if words[position].casefold() == folded:
+            return position
+    return remaining[0] if remaining else None
+
+
+class BatchLookupThread(QObject):
+    """一次请求查询多个词汇，每个词的结果到达后立即发出 item_ready"""
+
+    item_ready = pyqtSignal(int, int, object, str)  # request_id, 词汇下标, result, raw_text
+    finished = pyqtSignal(int, list)  # request_id, 未返回结果的词汇下标
+    failed = pyqtSignal(int, str)  # request_id, error_message
+    cancelled = pyqtSignal(int)  # request_id
+
+    def __init__(
+        self,
+        *,
+        request_id: int,
+        ai_client: AIClient,
+        prompt: str,
+        words: Sequence[str],
+        max_basic_meanings: int = 3,
+        parent=None,
+    ):
+        super().__init__(parent)
+        self._request_id = request_id
+        self._ai_client = ai_client
+        self._prompt = prompt
+        self._words = list(words)
+        self._max_basic_meanings = max_basic_meanings
+
+        self._cancelled = False
+        self._future: Optional[Future] = None
+
+    def start(self) -> None:
+        self._future = shared_transport().submit(self._run())
+
+    def isRunning(self) -> bool:
+        return self._future is not None and not self._future.done()
+
+    def cancel(self) -> None:
+        self._cancelled = True
+        future = self._future
+        if future is not None:
+            future.cancel()
+
+    def _is_cancelled(self) -> bool:
+        return self._cancelled
+
+    async def _run(self) -> None:
+        missing = set(range(len(self._words)))
+        try:
+            async for position, result, raw in stream_batch_lookup(
+                self._ai_client,
+                self._prompt,
+                self._words,
+                max_basic_meanings=self._max_basic_meanings,
+                cancel_cb=self._is_cancelled,
+            ):
+                if self._cancelled:
+                    raise asyncio.CancelledError()
+                missing.discard(position)
+                self.item_ready.emit(self._request_id, position, result, raw)
+        except asyncio.CancelledError:
+            self.cancelled.emit(self._request_id)
+            raise
+        except Exception as exc:
+            self.failed.emit(self._request_id, str(exc))
+            return
+        if self._cancelled:
+            self.cancelled.emit(self._request_id)
+            return
+        self.finished.emit(self._request_id, sorted(missing))
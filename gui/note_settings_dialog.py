@@ -2,6 +2,7 @@ from aqt.qt import *
 from ..utils.anki_handler import AnkiHandler
 import json
 import os
+from ..utils.config_service import config_service
 from ..utils.paths import note_config_path
 from .dialog_styles import COMMON_DIALOG_QSS
 
@@ -134,39 +135,37 @@ class NoteSettingsDialog(QDialog):
     def load_settings(self):
         """Load settings"""
         try:
-            if os.path.exists(self.config_path):
-                with open(self.config_path, 'r', encoding='utf-8') as f:
-                    config = json.load(f)
-                    
-                    # Set deck
-                    deck_index = self.deck_combo.findText(config.get("deck_name", "Default"))
-                    if deck_index >= 0:
-                        self.deck_combo.setCurrentIndex(deck_index)
-                    
-                    # Set note type
-                    model_index = self.model_combo.findText(config.get("model_name", "Basic"))
-                    if model_index >= 0:
-                        self.model_combo.setCurrentIndex(model_index)
-                    
-                    # Set field mapping
-                    field_mapping = config.get("field_mapping", {})
-                    if "word" in field_mapping:
-                        index = self.word_field_combo.findText(field_mapping["word"])
-                        if index >= 0:
-                            self.word_field_combo.setCurrentIndex(index)
-                    
-                    if "meaning" in field_mapping:
-                        index = self.meaning_field_combo.findText(field_mapping["meaning"])
-                        if index >= 0:
-                            self.meaning_field_combo.setCurrentIndex(index)
-                    
-                    if "context" in field_mapping:
-                        index = self.context_field_combo.findText(field_mapping["context"])
-                        if index >= 0:
-                            self.context_field_combo.setCurrentIndex(index)
-                    
-                    # Set tags
-                    self.tag_edit.setText(" ".join(config.get("tags", [])))
+            config = config_service().get(self.config_path)
+            if config:
+                # Set deck
+                deck_index = self.deck_combo.findText(config.get("deck_name", "Default"))
+                if deck_index >= 0:
+                    self.deck_combo.setCurrentIndex(deck_index)
+                
+                # Set note type
+                model_index = self.model_combo.findText(config.get("model_name", "Basic"))
+                if model_index >= 0:
+                    self.model_combo.setCurrentIndex(model_index)
+                
+                # Set field mapping
+                field_mapping = config.get("field_mapping", {})
+                if "word" in field_mapping:
+                    index = self.word_field_combo.findText(field_mapping["word"])
+                    if index >= 0:
+                        self.word_field_combo.setCurrentIndex(index)
+                
+                if "meaning" in field_mapping:
+                    index = self.meaning_field_combo.findText(field_mapping["meaning"])
+                    if index >= 0:
+                        self.meaning_field_combo.setCurrentIndex(index)
+                
+                if "context" in field_mapping:
+                    index = self.context_field_combo.findText(field_mapping["context"])
+                    if index >= 0:
+                        self.context_field_combo.setCurrentIndex(index)
+                
+                # Set tags
+                self.tag_edit.setText(" ".join(config.get("tags", [])))
         except Exception as e:
             print(f"Failed to load note settings: {str(e)}")
     
@@ -184,12 +183,8 @@ class NoteSettingsDialog(QDialog):
                 "tags": [tag.strip() for tag in self.tag_edit.text().split() if tag.strip()]
             }
             
-            # Ensure config directory exists
-            os.makedirs(os.path.dirname(self.config_path), exist_ok=True)
-            
-            # Save config
-            with open(self.config_path, 'w', encoding='utf-8') as f:
-                json.dump(config, f, indent=4, ensure_ascii=False)
+            # Save config (also updates the in-memory snapshot)
+            config_service().save(self.config_path, config)
             
             self.accept()
         except Exception as e:
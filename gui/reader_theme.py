@@ -54,3 +54,43 @@ def word_label_font_size_compact(word: str) -> int:
     if word_length <= 10:
         return 18
     return 16
+
+
+# 章节正文的文档默认样式表（在 setHtml 解析时生效）。
+# 这里只放与主题、字号无关的规则：文字颜色来自控件调色板，字号来自文档默认字体，
+# 行高、段落间距与对齐方式在解析后直接写入段落格式，调整这些设置时无需重新解析正文。
+READER_CONTENT_CSS = """
+    h1, h2, h3, h4, h5, h6 {
+        margin-top: 1.5em;
+        margin-bottom: 0.8em;
+        font-weight: 500;
+    }
+    a {
+        color: #007AFF;
+        text-decoration: none;
+    }
+    blockquote {
+        margin: 1.5em 0;
+        padding: 0.8em 1.2em;
+        border-left: 3px solid #007AFF;
+        background-color: rgba(0, 122, 255, 0.08);
+    }
+    code {
+        font-family: "SF Mono", Menlo, Monaco, Consolas, monospace;
+        background-color: rgba(0, 0, 0, 0.06);
+        font-size: 0.9em;
+    }
+    pre {
+        background-color: rgba(0, 0, 0, 0.04);
+        padding: 1em;
+    }
+    pre code {
+        background-color: transparent;
+    }
+    ul, ol {
+        margin: 1em 0;
+    }
+    li {
+        margin: 0.5em 0;
+    }
+"""
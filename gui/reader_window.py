@@ -4,32 +4,53 @@ from anki.notes import Note
 import json
 import os
 import urllib.parse
+from collections.abc import Mapping
 from PyQt6.QtCore import QTimer, Qt, QSettings
 from PyQt6.QtWidgets import QSplitter
 from ..utils.ai_factory import AIFactory
 from ..utils.ai_client import AIClient, AIResponse
+from ..utils.epub_chapter import CHAPTER_STYLE
 from ..utils.epub_handler import EPUBHandler
+from ..utils.html_segments import body_start_tag, needs_windowing, split_chapter_html
+from ..utils.html_parser_backend import AUTO_BACKEND
 from ..utils.db_handler import DBHandler
+from ..utils.lookup_cache import DEFAULT_MAX_ENTRIES, DEFAULT_TTL_DAYS, LookupCache, lookup_cache_key
 from ..utils.template_manager import TemplateManager
 from ..utils.anki_handler import AnkiHandler
 from ..utils.image_handler import ImageHandler
 from .note_settings_dialog import NoteSettingsDialog
 from .template_dialog import TemplateDialog
-from .settings_dialog import AIServiceSettingsDialog, ContextSettingsDialog
+from .settings_dialog import AIServiceSettingsDialog, ContextSettingsDialog, ImportSettingsDialog
 from .ui_reader_window import Ui_ReaderWindow
 from .word_clickable_text_edit import WordClickableTextEdit
 from .epub_manager_dialog import EPUBManagerDialog
-from .reader_theme import get_reader_palette, word_label_font_size, word_label_font_size_compact
-from ..utils.async_utils import run_async
-from ..utils.paths import config_json_path, config_dir, reader_style_path
-from .lookup_thread import LookupThread
+from .chapter_window import ChapterWindow
+from .reader_theme import (
+    READER_CONTENT_CSS,
+    get_reader_palette,
+    word_label_font_size,
+    word_label_font_size_compact,
+)
+from ..utils.ai_transport import TransportLimits, configure_transport
+from ..utils.config_service import app_config, config_service
+from ..utils.paths import reader_style_path
+from .lookup_thread import BatchLookupThread, LookupThread
+from .lookup_prefetcher import LookupPrefetcher, PrefetchSettings
+from .streaming_meaning_view import StreamingMeaningView
+from .import_thread import EPUBImportThread
 from ..utils.lookup_json import (
+    build_batch_lookup_prompt,
     build_lookup_prompt,
     lookup_template_for_preferences,
+    render_batch_lookup_html,
+    render_batch_pending_html,
     render_lookup_result_html,
-    render_streaming_html,
 )
 
+# 批量查词一次请求的最大单词数
+MAX_BATCH_LOOKUP_WORDS = 20
+
+
 class ReaderWindow(QMainWindow):
     def __init__(self, parent=None):
         super().__init__(parent)
@@ -46,8 +67,11 @@ class ReaderWindow(QMainWindow):
         self.reader_container = self.ui.reader_container
         self.reader_layout = self.ui.reader_layout
         self.textEdit = WordClickableTextEdit()
+        self.textEdit.document().setDefaultStyleSheet(READER_CONTENT_CSS)
         self.reader_layout.replaceWidget(self.ui.textEdit, self.textEdit)
         self.ui.textEdit.deleteLater()
+        # 超长章节只把当前位置附近的几段放入文档
+        self.chapter_window = ChapterWindow(self.textEdit, self._show_chapter_html, self)
         
         # 初始化其他组件
         self.current_book_id = None
@@ -61,6 +85,17 @@ class ReaderWindow(QMainWindow):
         self._progress_save_timer.setSingleShot(True)
         self._progress_save_timer.setInterval(800)
         self._progress_save_timer.timeout.connect(self.save_current_position)
+
+        # 样式调整防抖：连续调整字号等设置时只应用最后一次；写盘合并得更久一些
+        self._applied_theme = None
+        self._style_apply_timer = QTimer(self)
+        self._style_apply_timer.setSingleShot(True)
+        self._style_apply_timer.setInterval(80)
+        self._style_apply_timer.timeout.connect(self._apply_text_style)
+        self._style_save_timer = QTimer(self)
+        self._style_save_timer.setSingleShot(True)
+        self._style_save_timer.setInterval(800)
+        self._style_save_timer.timeout.connect(self.save_style_settings)
         self._suppress_progress_save = False
         
         # 初始化图片相关变量
@@ -69,6 +104,16 @@ class ReaderWindow(QMainWindow):
         self._image_thread = None
         self._lookup_thread = None
         self._lookup_request_id = 0
+        # (request_id, 缓存键, 单词, 释义语言)：请求完成后把结果写入查词缓存
+        self._pending_lookup = None
+        # 单词缓存中已有的基本义：流式生成语境义时先行显示
+        self._cached_basic_meaning = None
+        # 批量查词：[{word, context, cache_key, language, result}]，与 _lookup_request_id 对应
+        self._batch_entries = []
+        self._batch_pending = []
+        self._import_thread = None
+        self._import_book_id = None
+        self._import_title = ""
         
         # 初始化处理器
         self.anki_handler = AnkiHandler()
@@ -76,6 +121,18 @@ class ReaderWindow(QMainWindow):
         self.epub_handler = EPUBHandler()
         self.db_handler = DBHandler()
         self.image_handler = ImageHandler()
+        self.lookup_cache = self._create_lookup_cache()
+        # 流式查词时以追加方式更新释义面板
+        self.meaning_view = StreamingMeaningView(self.ui.meaningText, self)
+        # 可选：后台预先查询可见页面中的生僻词
+        self.lookup_prefetcher = LookupPrefetcher(
+            self.textEdit,
+            self.lookup_cache,
+            self._build_lookup_request,
+            self._build_batch_lookup_prompt,
+            self._is_lookup_running,
+            self,
+        )
         
         # 创建动作和菜单
         self.create_actions()
@@ -83,6 +140,7 @@ class ReaderWindow(QMainWindow):
         
         # 设置工具栏
         self.setup_toolbar()
+        self.setup_statusbar()
         
         # 连接信号和槽
         self.setup_connections()
@@ -122,6 +180,7 @@ class ReaderWindow(QMainWindow):
         self.ui.actionContextSettings = QAction("上下文设置(&C)", self)
         self.ui.actionNoteSettings = QAction("笔记设置(&N)", self)
         self.ui.actionTemplateSettings = QAction("模板设置(&T)", self)
+        self.ui.actionImportSettings = QAction("导入设置(&I)", self)
     
     def setup_toolbar(self):
         """设置工具栏"""
@@ -221,12 +280,22 @@ class ReaderWindow(QMainWindow):
         self.image_count_label = QLabel("0/0")
         self.ui.toolbar.addWidget(self.image_count_label)
     
+    def setup_statusbar(self):
+        """设置状态栏（导入进度与取消按钮）"""
+        self.cancel_import_btn = QPushButton("取消导入")
+        self.cancel_import_btn.clicked.connect(self.cancel_import)
+        self.cancel_import_btn.setVisible(False)
+        self.ui.statusbar.addPermanentWidget(self.cancel_import_btn)
+    
     def setup_connections(self):
         """设置信号连接"""
         # 文本选择变化时的处理
         self.textEdit.wordClicked.connect(self.on_word_clicked)
+        self.textEdit.batchLookupRequested.connect(self.on_batch_lookup_requested)
         if hasattr(self.ui, "cancelLookupButton"):
             self.ui.cancelLookupButton.clicked.connect(self.cancel_current_lookup)
+        if hasattr(self.ui, "refreshLookupButton"):
+            self.ui.refreshLookupButton.clicked.connect(self.refresh_current_lookup)
         
         # 添加到Anki按钮事件
         self.ui.addToAnkiButton.clicked.connect(self.add_to_anki)
@@ -242,6 +311,7 @@ class ReaderWindow(QMainWindow):
         self.ui.actionContextSettings.triggered.connect(self.show_context_settings)
         self.ui.actionNoteSettings.triggered.connect(self.show_note_settings)
         self.ui.actionTemplateSettings.triggered.connect(self.show_template_settings)
+        self.ui.actionImportSettings.triggered.connect(self.show_import_settings)
 
         # 章节导航按钮连接
         self.ui.prev_chapter_btn.clicked.connect(self.on_prev_chapter)
@@ -252,6 +322,7 @@ class ReaderWindow(QMainWindow):
         self.textEdit.verticalScrollBar().valueChanged.connect(self._on_reader_scrolled)
 
     def _on_reader_scrolled(self, value: int) -> None:
+        self.lookup_prefetcher.schedule()
         if self._suppress_progress_save:
             return
         if not self.current_book_id:
@@ -261,21 +332,35 @@ class ReaderWindow(QMainWindow):
     def load_ai_client(self):
         """加载AI客户端"""
         try:
-            path = config_json_path()
-            if os.path.exists(path):
-                with open(path, "r", encoding="utf-8") as f:
-                    config = json.load(f)
-                    service_type = config["service_type"].lower().replace(" ", "")
-                    if service_type == "openai":
-                        client_config = config["openai"]
-                    else:
-                        client_config = config["custom"]
-                    
-                    self.ai_client = AIFactory.create_client(service_type, client_config)
+            config = app_config()
+            configure_transport(TransportLimits.from_config(config))
+            if config:
+                service_type = config["service_type"].lower().replace(" ", "")
+                if service_type == "openai":
+                    client_config = config["openai"]
+                else:
+                    client_config = config["custom"]
+                
+                self.ai_client = AIFactory.create_client(service_type, client_config)
+            self.lookup_prefetcher.configure(PrefetchSettings.from_config(config), self.ai_client)
         except Exception as e:
             QMessageBox.warning(self, "错误", f"载AI客户端失败：{str(e)}")
     
-    def on_word_clicked(self, word: str, context: str):
+    def _create_lookup_cache(self) -> LookupCache:
+        config = app_config()
+        try:
+            ttl_days = float(config.get("lookup_cache_ttl_days", DEFAULT_TTL_DAYS))
+            max_entries = int(config.get("lookup_cache_max_entries", DEFAULT_MAX_ENTRIES))
+        except (TypeError, ValueError):
+            ttl_days, max_entries = DEFAULT_TTL_DAYS, DEFAULT_MAX_ENTRIES
+        return LookupCache(ttl_days=ttl_days, max_entries=max_entries)
+
+    def refresh_current_lookup(self) -> None:
+        """忽略缓存，重新查询当前单词"""
+        if self.current_word:
+            self.on_word_clicked(self.current_word, self.current_context or "", force_refresh=True)
+
+    def on_word_clicked(self, word: str, context: str, force_refresh: bool = False):
         """处理单词点击事件"""
         if not self.ai_client:
             QMessageBox.warning(self, "错误", "请先在设置中配置AI服务")
@@ -293,6 +378,8 @@ class ReaderWindow(QMainWindow):
             self.ui.addToAnkiButton.setEnabled(False)
             if hasattr(self.ui, "cancelLookupButton"):
                 self.ui.cancelLookupButton.setEnabled(True)
+            if hasattr(self.ui, "refreshLookupButton"):
+                self.ui.refreshLookupButton.setEnabled(True)
 
             font_size = word_label_font_size(word)
 
@@ -323,50 +410,80 @@ class ReaderWindow(QMainWindow):
             self.open_bing_image()
             
             # 异步获取释义（流式 + JSON）
-            self.start_lookup(request_id, word, context)
+            self.start_lookup(request_id, word, context, force_refresh=force_refresh)
             
         except Exception as e:
             QMessageBox.warning(self, "错误", f"处理文本失败：{str(e)}")
 
     def _load_lookup_optional_fields(self) -> dict:
-        path = config_json_path()
-        if os.path.exists(path):
-            try:
-                with open(path, "r", encoding="utf-8") as f:
-                    config = json.load(f)
-                raw = config.get("lookup_optional_fields", {})
-                if isinstance(raw, dict):
-                    return {str(k): bool(v) for k, v in raw.items()}
-            except Exception:
-                pass
+        raw = app_config().get("lookup_optional_fields")
+        if isinstance(raw, Mapping):
+            return {str(k): bool(v) for k, v in raw.items()}
         return {"pos": False, "ipa": False, "examples": False}
 
     def _load_lookup_style_and_language(self) -> tuple[str, str]:
-        path = config_json_path()
-        if os.path.exists(path):
-            try:
-                with open(path, "r", encoding="utf-8") as f:
-                    config = json.load(f)
-                style = str(config.get("lookup_style", "friendly"))
-                language = str(config.get("lookup_language", "zh"))
-                return style, language
-            except Exception:
-                pass
-        return "friendly", "zh"
+        config = app_config()
+        style = str(config.get("lookup_style", "friendly"))
+        language = str(config.get("lookup_language", "zh"))
+        return style, language
 
-    def start_lookup(self, request_id: int, word: str, context: str) -> None:
+    def _build_lookup_request(self, word: str, context: str) -> tuple[str, str, str]:
+        """按当前设置生成查词请求：(提示词, 缓存键, 释义语言)"""
         style, language = self._load_lookup_style_and_language()
         template_text = lookup_template_for_preferences(style=style, language=language)
-
-        enabled_optional_fields = self._load_lookup_optional_fields()
         prompt = build_lookup_prompt(
             template_text=template_text,
             word=word,
             context=context or "",
-            enabled_optional_fields=enabled_optional_fields,
+            enabled_optional_fields=self._load_lookup_optional_fields(),
+            max_basic_meanings=3,
+        )
+        cache_key = lookup_cache_key(
+            word,
+            context or "",
+            prompt,
+            getattr(self.ai_client, "model", ""),
+            getattr(self.ai_client, "api_base", ""),
+        )
+        return prompt, cache_key, language
+
+    def _build_batch_lookup_prompt(self, items: list) -> str:
+        """按当前设置生成批量查词的提示词；items 为 (单词, 上下文)"""
+        style, language = self._load_lookup_style_and_language()
+        return build_batch_lookup_prompt(
+            template_text=lookup_template_for_preferences(style=style, language=language),
+            items=items,
+            enabled_optional_fields=self._load_lookup_optional_fields(),
             max_basic_meanings=3,
         )
 
+    def _is_lookup_running(self) -> bool:
+        return bool(self._lookup_thread and self._lookup_thread.isRunning())
+
+    def start_lookup(self, request_id: int, word: str, context: str, force_refresh: bool = False) -> None:
+        prompt, cache_key, language = self._build_lookup_request(word, context)
+        enabled_optional_fields = self._load_lookup_optional_fields()
+        if force_refresh:
+            self.lookup_cache.invalidate(cache_key)
+        else:
+            cached = self.lookup_cache.get(cache_key)
+            if cached is not None:
+                result, raw = cached
+                self._on_lookup_finished(request_id, result, raw)
+                hit_rate = self.lookup_cache.hit_rate()
+                self.ui.statusbar.showMessage(f"已使用缓存的释义（命中率 {hit_rate:.0%}）", 3000)
+                return
+        self._pending_lookup = (request_id, cache_key, word, language)
+
+        # 单词层：之前查过这个词时，基本义立即显示，语境义随后流式生成
+        self._cached_basic_meaning = None
+        if not force_refresh:
+            self._cached_basic_meaning = self.lookup_cache.get_basic_meaning(word, language)
+        self.meaning_view.begin(
+            enabled_optional_fields=enabled_optional_fields,
+            basic_meaning=self._cached_basic_meaning,
+        )
+
         self._lookup_thread = LookupThread(
             request_id=request_id,
             ai_client=self.ai_client,
@@ -374,14 +491,107 @@ class ReaderWindow(QMainWindow):
             enabled_optional_fields=enabled_optional_fields,
             max_basic_meanings=3,
             repair_attempts=1,
+            parent=self,
         )
 
-        self._lookup_thread.partial.connect(self._on_lookup_partial)
+        self._lookup_thread.progress.connect(self._on_lookup_progress)
         self._lookup_thread.finished.connect(self._on_lookup_finished)
         self._lookup_thread.failed.connect(self._on_lookup_failed)
         self._lookup_thread.cancelled.connect(self._on_lookup_cancelled)
+        self._delete_when_done(self._lookup_thread)
         self._lookup_thread.start()
 
+    def on_batch_lookup_requested(self, items: list) -> None:
+        """一次请求查询选区中的多个单词，每个词的结果到达后立即显示并写入缓存"""
+        if not self.ai_client:
+            QMessageBox.warning(self, "错误", "请先在设置中配置AI服务")
+            return
+        if len(items) > MAX_BATCH_LOOKUP_WORDS:
+            self.ui.statusbar.showMessage(f"一次最多批量查询 {MAX_BATCH_LOOKUP_WORDS} 个单词，其余已忽略", 5000)
+            items = items[:MAX_BATCH_LOOKUP_WORDS]
+
+        self._cancel_active_lookup()
+        self._lookup_request_id += 1
+        request_id = self._lookup_request_id
+        self._pending_lookup = None
+        self.current_meaning = None
+        self.current_word = None
+        self.current_context = None
+        self.ui.addToAnkiButton.setEnabled(False)
+        if hasattr(self.ui, "refreshLookupButton"):
+            self.ui.refreshLookupButton.setEnabled(False)
+        self.ui.wordLabel.setText(f"批量查词（{len(items)} 个）")
+
+        # 每个词使用与单独点击时相同的缓存键：已缓存的直接显示，之后点击这些词也能命中
+        self._batch_entries = []
+        for word, context in items:
+            _, cache_key, language = self._build_lookup_request(word, context)
+            cached = self.lookup_cache.get(cache_key)
+            self._batch_entries.append({
+                "word": word,
+                "context": context,
+                "cache_key": cache_key,
+                "language": language,
+                "result": cached[0] if cached else None,
+            })
+        self._batch_pending = [i for i, entry in enumerate(self._batch_entries) if entry["result"] is None]
+        if not self._batch_pending:
+            self._render_batch_lookup(pending=False)
+            return
+        # 先显示已缓存的词条；其余词的结果到达后依次追加，完成时再按原顺序完整渲染一次
+        cached = [(entry["word"], entry["result"]) for entry in self._batch_entries if entry["result"] is not None]
+        self.meaning_view.begin_batch(
+            (render_batch_lookup_html(cached) if cached else "") + render_batch_pending_html(len(self._batch_pending))
+        )
+
+        pending_items = [(self._batch_entries[i]["word"], self._batch_entries[i]["context"]) for i in self._batch_pending]
+        self._lookup_thread = BatchLookupThread(
+            request_id=request_id,
+            ai_client=self.ai_client,
+            prompt=self._build_batch_lookup_prompt(pending_items),
+            words=[word for word, _ in pending_items],
+            max_basic_meanings=3,
+            parent=self,
+        )
+        self._lookup_thread.item_ready.connect(self._on_batch_item_ready)
+        self._lookup_thread.finished.connect(self._on_batch_lookup_finished)
+        self._lookup_thread.failed.connect(self._on_lookup_failed)
+        self._lookup_thread.cancelled.connect(self._on_lookup_cancelled)
+        self._delete_when_done(self._lookup_thread)
+        if hasattr(self.ui, "cancelLookupButton"):
+            self.ui.cancelLookupButton.setEnabled(True)
+        self._lookup_thread.start()
+
+    @staticmethod
+    def _delete_when_done(thread) -> None:
+        """查词对象归窗口所有（信号从传输线程发出，不能在那里被回收），
+        请求结束（完成、失败或取消）后在界面线程中删除"""
+        thread.finished.connect(thread.deleteLater)
+        thread.failed.connect(thread.deleteLater)
+        thread.cancelled.connect(thread.deleteLater)
+
+    def _render_batch_lookup(self, pending: bool) -> None:
+        entries = [(entry["word"], entry["result"]) for entry in self._batch_entries]
+        self.ui.meaningText.setHtml(render_batch_lookup_html(entries, pending=pending))
+
+    def _on_batch_item_ready(self, request_id: int, position: int, result_obj, raw_text: str) -> None:
+        if request_id != self._lookup_request_id:
+            return
+        entry = self._batch_entries[self._batch_pending[position]]
+        entry["result"] = result_obj
+        self.lookup_cache.put(entry["cache_key"], result_obj, raw_text)
+        self.lookup_cache.put_basic_meaning((entry["word"], result_obj.word), entry["language"], result_obj.basic_meaning)
+        self.meaning_view.append_html(render_batch_lookup_html([(entry["word"], result_obj)]))
+
+    def _on_batch_lookup_finished(self, request_id: int, missing: list) -> None:
+        if request_id != self._lookup_request_id:
+            return
+        self._render_batch_lookup(pending=False)
+        if missing:
+            self.ui.statusbar.showMessage(f"批量查词完成，{len(missing)} 个单词未返回结果", 5000)
+        if hasattr(self.ui, "cancelLookupButton"):
+            self.ui.cancelLookupButton.setEnabled(False)
+
     def _cancel_active_lookup(self) -> None:
         t = self._lookup_thread
         if t and t.isRunning():
@@ -390,6 +600,7 @@ class ReaderWindow(QMainWindow):
             except Exception:
                 pass
         self._lookup_thread = None
+        self.meaning_view.stop()
         if hasattr(self.ui, "cancelLookupButton"):
             self.ui.cancelLookupButton.setEnabled(False)
 
@@ -398,14 +609,20 @@ class ReaderWindow(QMainWindow):
         self.ui.meaningText.setHtml("<p style='color:#86868B;'>已取消。</p>")
         self.ui.addToAnkiButton.setEnabled(False)
 
-    def _on_lookup_partial(self, request_id: int, raw_text: str) -> None:
+    def _on_lookup_progress(self, request_id: int, events: list) -> None:
         if request_id != self._lookup_request_id:
             return
-        self.ui.meaningText.setHtml(render_streaming_html(raw_text))
+        self.meaning_view.push(events)
 
     def _on_lookup_finished(self, request_id: int, result_obj, raw_text: str) -> None:
         if request_id != self._lookup_request_id:
             return
+        if self._pending_lookup and self._pending_lookup[0] == request_id:
+            _, cache_key, word, language = self._pending_lookup
+            self.lookup_cache.put(cache_key, result_obj, raw_text)
+            self.lookup_cache.put_basic_meaning((word, result_obj.word), language, result_obj.basic_meaning)
+            self._pending_lookup = None
+        self.meaning_view.stop()
         enabled_optional_fields = self._load_lookup_optional_fields()
         html = render_lookup_result_html(result_obj, enabled_optional_fields=enabled_optional_fields)
         self.current_meaning = html
@@ -417,6 +634,7 @@ class ReaderWindow(QMainWindow):
     def _on_lookup_failed(self, request_id: int, error_message: str) -> None:
         if request_id != self._lookup_request_id:
             return
+        self.meaning_view.stop()
         self.ui.meaningText.setHtml(f"<p style='color:#B00020;'>获取释义失败：{error_message}</p>")
         self.ui.addToAnkiButton.setEnabled(False)
         if hasattr(self.ui, "cancelLookupButton"):
@@ -425,6 +643,7 @@ class ReaderWindow(QMainWindow):
     def _on_lookup_cancelled(self, request_id: int) -> None:
         if request_id != self._lookup_request_id:
             return
+        self.meaning_view.stop()
         self.ui.addToAnkiButton.setEnabled(False)
         if hasattr(self.ui, "cancelLookupButton"):
             self.ui.cancelLookupButton.setEnabled(False)
@@ -465,10 +684,31 @@ class ReaderWindow(QMainWindow):
         """显示上下文设置对话框"""
         dialog = ContextSettingsDialog(self)
         dialog.exec()
+
+    def show_import_settings(self):
+        """显示导入设置对话框"""
+        dialog = ImportSettingsDialog(self)
+        dialog.exec()
+
+    def _load_import_parser(self) -> str:
+        return str(app_config().get("html_parser", AUTO_BACKEND))
     
     def update_text_style(self):
-        """更新本样式"""
-        palette = get_reader_palette(self._get_theme_id())
+        """样式控件变化：合并短时间内的连续调整后再应用，设置也合并后再写盘"""
+        self._style_apply_timer.start()
+        self._style_save_timer.start()
+
+    def _apply_text_style(self):
+        """应用当前样式：主题变化时更新界面样式表，其余只调整文档格式，不重新解析正文"""
+        theme = self._get_theme_id()
+        if theme != self._applied_theme:
+            self._apply_theme(theme)
+            self._applied_theme = theme
+        self._apply_document_style()
+
+    def _apply_theme(self, theme: str):
+        """更新阅读器界面的主题样式表（正文文字颜色也由此处的调色板决定）"""
+        palette = get_reader_palette(theme)
         bg_color = palette["bg_color"]
         text_color = palette["text_color"]
         selection_color = palette["selection_color"]
@@ -596,7 +836,7 @@ class ReaderWindow(QMainWindow):
         """)
         self.ui.wordLabel.setText(label_text)
         
-        # 设置文本编辑器的样式
+        # 设置文本编辑器的样式（字号由文档默认字体控制，见 _apply_document_style）
         self.textEdit.setStyleSheet(f"""
             QTextEdit {{
                 background-color: {bg_color};
@@ -604,119 +844,76 @@ class ReaderWindow(QMainWindow):
                 border: none;
                 padding: 20px 40px;
                 font-family: "SF Pro Text", "PingFang SC", -apple-system, "Helvetica Neue", sans-serif;
-                font-size: {self.font_size_spin.value()}px;
-                line-height: {self.line_spacing_spin.value()};
             }}
         """)
+
+    def _apply_document_style(self):
+        """把字号、行高、段落间距与对齐方式直接写入已解析的文档
         
-        # 如果当前有内容，重新应用样式
-        if self.current_book_id:
-            content = self.db_handler.get_chapter_content(
-                self.current_book_id,
-                self.current_chapter_index
+        只修改默认字体与段落格式，文档随后重新排版，不会重新解析 HTML。
+        """
+        document = self.textEdit.document()
+        # 控件样式表变化会重置文档默认字体，每次都以控件字体为基础重新设置字号
+        font = QFont(self.textEdit.font())
+        font.setPixelSize(self.font_size_spin.value())
+        document.setDefaultFont(font)
+
+        line_height = self.line_spacing_spin.value() * 100
+        paragraph_spacing = self.paragraph_spacing_spin.value()
+        if self.get_current_text_align() == "justify":
+            alignment = Qt.AlignmentFlag.AlignJustify
+        else:
+            alignment = Qt.AlignmentFlag.AlignLeft
+
+        # 样式调整不应进入撤销栈
+        undo_enabled = document.isUndoRedoEnabled()
+        document.setUndoRedoEnabled(False)
+        cursor = QTextCursor(document)
+        cursor.beginEditBlock()
+        block = document.begin()
+        while block.isValid():
+            block_format = block.blockFormat()
+            block_format.setLineHeight(
+                line_height,
+                QTextBlockFormat.LineHeightTypes.ProportionalHeight.value,
             )
-            if content:
-                html_content = f"""
-                    <html>
-                    <head>
-                        <style>
-                            body {{
-                                font-family: "SF Pro Text", "PingFang SC", -apple-system, "Helvetica Neue", sans-serif;
-                                font-size: {self.font_size_spin.value()}px;
-                                line-height: {self.line_spacing_spin.value()};
-                                color: {text_color};
-                                background-color: {bg_color};
-                                text-rendering: optimizeLegibility;
-                                -webkit-font-smoothing: antialiased;
-                                -moz-osx-font-smoothing: grayscale;
-                                max-width: 800px;
-                                margin: 0 auto;
-                            }}
-                            p {{
-                                margin-bottom: {self.paragraph_spacing_spin.value()}px;
-                                text-align: {self.get_current_text_align()};
-                                letter-spacing: 0.01em;
-                                word-spacing: 0.05em;
-                            }}
-                            img {{
-                                max-width: 100%;
-                                height: auto;
-                                display: block;
-                                margin: 2em auto;
-                                border-radius: 4px;
-                                box-shadow: 0 2px 8px rgba(0, 0, 0, 0.1);
-                            }}
-                            h1, h2, h3, h4, h5, h6 {{
-                                font-family: "SF Pro Display", "PingFang SC", -apple-system, "Helvetica Neue", sans-serif;
-                                color: {text_color};
-                                margin: 1.5em 0 0.8em;
-                                line-height: 1.3;
-                                font-weight: 500;
-                                letter-spacing: -0.02em;
-                            }}
-                            h1 {{ font-size: 2em; }}
-                            h2 {{ font-size: 1.7em; }}
-                            h3 {{ font-size: 1.4em; }}
-                            h4 {{ font-size: 1.2em; }}
-                            h5, h6 {{ font-size: 1.1em; }}
-                            a {{
-                                color: #007AFF;
-                                text-decoration: none;
-                                transition: color 0.2s ease;
-                            }}
-                            a:hover {{
-                                color: #0056b3;
-                            }}
-                            blockquote {{
-                                margin: 1.5em 0;
-                                padding: 0.8em 1.2em;
-                                border-left: 3px solid #007AFF;
-                                background-color: rgba(0, 122, 255, 0.08);
-                                border-radius: 4px;
-                            }}
-                            code {{
-                                font-family: "SF Mono", Menlo, Monaco, Consolas, monospace;
-                                background-color: rgba(0, 0, 0, 0.06);
-                                padding: 0.2em 0.4em;
-                                border-radius: 3px;
-                                font-size: 0.9em;
-                            }}
-                            pre {{
-                                background-color: rgba(0, 0, 0, 0.04);
-                                padding: 1em;
-                                border-radius: 4px;
-                                overflow-x: auto;
-                            }}
-                            pre code {{
-                                background-color: transparent;
-                                padding: 0;
-                            }}
-                            ul, ol {{
-                                padding-left: 1.5em;
-                                margin: 1em 0;
-                            }}
-                            li {{
-                                margin: 0.5em 0;
-                            }}
-                            hr {{
-                                border: none;
-                                border-top: 1px solid {selection_color};
-                                margin: 2em 0;
-                            }}
-                            ::selection {{
-                                background-color: {selection_color};
-                            }}
-                        </style>
-                    </head>
-                    <body>
-                        {content}
-                    </body>
-                    </html>
-                """
-                self.textEdit.setHtml(html_content)
-    
-        # 保存样式设置
-        self.save_style_settings()
+            # 与原先的 CSS 一致：段落间距与对齐只作用于普通段落，不影响标题与列表项
+            if block_format.headingLevel() == 0 and block.textList() is None:
+                block_format.setBottomMargin(paragraph_spacing)
+                block_format.setAlignment(alignment)
+            cursor.setPosition(block.position())
+            cursor.setBlockFormat(block_format)
+            block = block.next()
+        cursor.endEditBlock()
+        document.setUndoRedoEnabled(undo_enabled)
+
+    def _render_chapter(self, content: str, segment_index: int = 0):
+        """解析章节 HTML 并套用当前样式
+        
+        超长章节切分为若干段，只显示 segment_index 所在段附近的窗口。
+        """
+        # 导入时注入的基础样式带有固定的颜色与行高，会覆盖主题与阅读设置，显示前去掉
+        content = content.replace(f"<style>{CHAPTER_STYLE}</style>", "", 1)
+        if needs_windowing(content):
+            segments = split_chapter_html(content)
+            if len(segments) > 1:
+                print(f"章节较长，分 {len(segments)} 段显示")
+                self.chapter_window.load(segments, segment_index, body_tag=body_start_tag(content))
+                return
+        self.chapter_window.clear()
+        self._show_chapter_html(content)
+
+    def _show_chapter_html(self, html: str):
+        self.textEdit.setHtml(html)
+        self._apply_document_style()
+        # 章节加载时建好句子索引，查词时只需二分查找
+        self.textEdit.sentence_index()
+
+    def _current_position(self) -> tuple[int, int]:
+        """当前阅读位置：(段索引, 滚动位置)；普通章节的段索引为 0"""
+        if self.chapter_window.is_active():
+            return self.chapter_window.position()
+        return 0, self.textEdit.verticalScrollBar().value()
     
     def show_epub_manager(self):
         """显示EPUB管理对话框"""
@@ -742,14 +939,15 @@ class ReaderWindow(QMainWindow):
             QMessageBox.warning(self, "提示", "请先打开一本书。")
             return
             
-        # 获取当前垂直滚动条位置
-        position = self.textEdit.verticalScrollBar().value()
+        # 获取当前阅读位置（分段显示时为段索引与段内偏移）
+        segment_index, position = self._current_position()
         
         # 保存到数据库
         if self.db_handler.update_bookmark(
             self.current_book_id,
             self.current_chapter_index,
-            position
+            position,
+            segment_index
         ):
             QMessageBox.information(self, "成功", "已标记当前阅读位置。")
         else:
@@ -760,14 +958,15 @@ class ReaderWindow(QMainWindow):
         if not self.current_book_id:
             return False
             
-        # 获取当前垂直滚动条位置
-        position = self.textEdit.verticalScrollBar().value()
+        # 获取当前阅读位置（分段显示时为段索引与段内偏移）
+        segment_index, position = self._current_position()
         
         # 保存到数据库
         return self.db_handler.update_bookmark(
             self.current_book_id,
             self.current_chapter_index,
-            position
+            position,
+            segment_index
         )
     
     def save_style_settings(self):
@@ -781,44 +980,40 @@ class ReaderWindow(QMainWindow):
                 "theme": self._get_theme_id()
             }
 
-            os.makedirs(config_dir(), exist_ok=True)
-            path = reader_style_path()
+            # 保存配置（同时更新内存中的配置快照）
+            config_service().save(reader_style_path(), config)
 
-            with open(path, "w", encoding="utf-8") as f:
-                json.dump(config, f, indent=4, ensure_ascii=False)
-                
         except Exception as e:
             print(f"保存样式设置失败: {str(e)}")
 
     def load_style_settings(self):
         """加载样式设置"""
         try:
-            path = reader_style_path()
-            if os.path.exists(path):
-                with open(path, "r", encoding="utf-8") as f:
-                    config = json.load(f)
-                    
-                    # 设置字体大小
-                    self.font_size_spin.setValue(config.get("font_size", 18))
-                    
-                    # 设置行间距
-                    self.line_spacing_spin.setValue(config.get("line_spacing", 1.8))
-                    
-                    # 设置段落间距
-                    self.paragraph_spacing_spin.setValue(config.get("paragraph_spacing", 20))
-                    
-                    # 设置对齐方式
-                    self._set_align_from_config(config.get("text_align", "left"))
-                    
-                    # 设置主题
-                    self._set_theme_from_config(config.get("theme", "Default"))
-                    
-                    # 立即应用样式
-                    self.update_text_style()
+            config = config_service().get(reader_style_path())
+            if config:
+                # 设置字体大小
+                self.font_size_spin.setValue(config.get("font_size", 18))
+                
+                # 设置行间距
+                self.line_spacing_spin.setValue(config.get("line_spacing", 1.8))
+                
+                # 设置段落间距
+                self.paragraph_spacing_spin.setValue(config.get("paragraph_spacing", 20))
+                
+                # 设置对齐方式
+                self._set_align_from_config(config.get("text_align", "left"))
+                
+                # 设置主题
+                self._set_theme_from_config(config.get("theme", "Default"))
                     
         except Exception as e:
             print(f"加载样式设置失败: {str(e)}")
 
+        # 立即应用样式；刚读取的设置无需写回
+        self._style_apply_timer.stop()
+        self._style_save_timer.stop()
+        self._apply_text_style()
+
     def _set_align_from_config(self, value: str) -> None:
         value = (value or "").strip()
         legacy_map = {
@@ -900,7 +1095,24 @@ class ReaderWindow(QMainWindow):
 
     def closeEvent(self, event):
         self._cancel_active_lookup()
+        if self._import_thread:
+            # 等导入线程真正退出后再删除未完成的书籍、关闭数据库：
+            # 线程在章节之间检查取消标记，最多再解析完当前这一章；
+            # 之后仍在队列中的信号会因 _finish_import 清空状态而被忽略
+            self._import_thread.cancel()
+            self._import_thread.wait()
+            self._discard_imported_book()
+            self._finish_import()
         self.save_current_position()
+        if self._style_save_timer.isActive():
+            self._style_save_timer.stop()
+            self.save_style_settings()
+        self.db_handler.close()
+        self.lookup_prefetcher.stop()
+        print(f"预取统计: {self.lookup_prefetcher.stats()}")
+        print(f"释义面板刷新统计: {self.meaning_view.stats()}")
+        print(f"查词缓存统计: {self.lookup_cache.stats()}")
+        self.lookup_cache.close()
         self._save_ui_state()
         super().closeEvent(event)
 
@@ -918,6 +1130,7 @@ class ReaderWindow(QMainWindow):
                     self.open_epub(file_name)
                 else:
                     with open(file_name, 'r', encoding='utf-8') as f:
+                        self.chapter_window.clear()
                         self.textEdit.setText(f.read())
             except Exception as e:
                 QMessageBox.critical(self, "错误", f"无法打开文件：{str(e)}")
@@ -942,45 +1155,134 @@ class ReaderWindow(QMainWindow):
                 self.load_chapter()
                 return
 
-            # 加载EPUB
-            if not self.epub_handler.load_book(file_path):
-                raise Exception("无法加载EPUB文件")
-                
-            # 获取元数据
-            metadata = self.epub_handler.get_metadata()
-            
-            # 保存到数据库
-            book_id = self.db_handler.add_book(metadata, file_path)
-            if not book_id:
-                raise Exception("无法保存书籍信息")
-
-            # 保存章节（首次导入）
-            if not self.db_handler.add_chapters(book_id, self.epub_handler.chapters):
-                raise Exception("无法保存章节信息")
+            if self._import_thread and self._import_thread.isRunning():
+                QMessageBox.warning(self, "提示", "已有图书正在导入，请稍候。")
+                return
+
+            # 后台导入：解析在工作线程中进行，章节分批写入数据库，首章写入后即可阅读
+            self._start_import(file_path)
                 
-            # 设置为当前书籍
+        except Exception as e:
+            QMessageBox.critical(self, "错误", f"无法打开EPUB文件：{str(e)}")
+
+    def _start_import(self, file_path: str) -> None:
+        # 首批章节写入后会切换到新书，先保存当前书的阅读位置
+        self.save_current_position()
+        self._import_book_id = None
+        self._import_title = os.path.basename(file_path)
+
+        thread = EPUBImportThread(
+            file_path=file_path,
+            parser=self._load_import_parser(),
+            parent=self,
+        )
+        thread.loaded.connect(self._on_import_loaded)
+        thread.progress.connect(self._on_import_progress)
+        thread.chapters_ready.connect(self._on_import_chapters_ready)
+        thread.completed.connect(self._on_import_completed)
+        thread.failed.connect(self._on_import_failed)
+        thread.cancelled.connect(self._on_import_cancelled)
+        thread.finished.connect(thread.deleteLater)
+        self._import_thread = thread
+
+        self.cancel_import_btn.setVisible(True)
+        self.ui.statusbar.showMessage(f"正在读取《{self._import_title}》…")
+        thread.start()
+
+    def cancel_import(self) -> None:
+        """取消正在进行的导入"""
+        if self._import_thread:
+            self._import_thread.cancel()
+            self.ui.statusbar.showMessage("正在取消导入…")
+
+    def _finish_import(self) -> None:
+        self._import_thread = None
+        self._import_book_id = None
+        self.cancel_import_btn.setVisible(False)
+
+    def _discard_imported_book(self) -> None:
+        """删除未完成导入的书籍"""
+        book_id = self._import_book_id
+        if not book_id:
+            return
+        self.db_handler.delete_book(book_id)
+        if self.current_book_id == book_id:
+            self.current_book_id = None
+            self.current_chapter_index = 0
+            self.chapter_window.clear()
+            self.textEdit.clear()
+            self.ui.chapter_combo.clear()
+
+    def _abort_import(self, message: str) -> None:
+        if self._import_thread:
+            self._import_thread.cancel()
+        self._discard_imported_book()
+        self._finish_import()
+        self.ui.statusbar.clearMessage()
+        QMessageBox.critical(self, "错误", f"无法打开EPUB文件：{message}")
+
+    def _on_import_loaded(self, metadata: dict, total: int) -> None:
+        thread = self._import_thread
+        if not thread:
+            return
+        book_id = self.db_handler.add_book(metadata, thread.file_path)
+        if not book_id:
+            self._abort_import("无法保存书籍信息")
+            return
+        self._import_book_id = book_id
+        self._import_title = metadata.get('title') or self._import_title
+
+    def _on_import_progress(self, done: int, total: int, title: str) -> None:
+        if not self._import_book_id:
+            return
+        self.ui.statusbar.showMessage(f"正在导入《{self._import_title}》：{done}/{total}  {title}")
+
+    def _on_import_chapters_ready(self, start_index: int, chapters: list) -> None:
+        book_id = self._import_book_id
+        if not book_id:
+            return
+        if not self.db_handler.append_chapters(book_id, start_index, chapters):
+            self._abort_import("无法保存章节信息")
+            return
+
+        if start_index == 0:
+            # 首批章节已提交：立即打开，后续章节继续在后台写入
+            # （导入期间可能仍在阅读原来的书，切换前再保存一次位置）
+            self.save_current_position()
             self.current_book_id = book_id
-            
-            # 获取阅读进度
-            progress = self.db_handler.get_book_progress(book_id)
-            if progress:
-                self.current_chapter_index = progress['chapter_index']
-            else:
-                self.current_chapter_index = 0
-            
-            # 刷新章��列表
+            self.current_chapter_index = 0
             self.refresh_chapter_list(book_id)
             self.ui.chapter_combo.blockSignals(True)
-            self.ui.chapter_combo.setCurrentIndex(self.current_chapter_index)
+            self.ui.chapter_combo.setCurrentIndex(0)
             self.ui.chapter_combo.blockSignals(False)
-            
-            # 加载章节
             self.load_chapter()
-            
-            QMessageBox.information(self, "成功", "图书导入成功！")
-                
-        except Exception as e:
-            QMessageBox.critical(self, "错误", f"无法打开EPUB文件：{str(e)}")
+        elif self.current_book_id == book_id:
+            self.ui.chapter_combo.blockSignals(True)
+            for offset, chapter in enumerate(chapters):
+                self.ui.chapter_combo.addItem(chapter['name'], start_index + offset)
+            self.ui.chapter_combo.blockSignals(False)
+
+    def _on_import_completed(self, chapter_count: int) -> None:
+        if not self._import_book_id:
+            return
+        if chapter_count == 0:
+            self._abort_import("未找到可用的章节内容")
+            return
+        title = self._import_title
+        self._finish_import()
+        self.ui.statusbar.showMessage(f"《{title}》导入成功，共 {chapter_count} 章", 5000)
+
+    def _on_import_failed(self, message: str) -> None:
+        if not self._import_thread:
+            return
+        self._abort_import(message)
+
+    def _on_import_cancelled(self) -> None:
+        if not self._import_thread:
+            return
+        self._discard_imported_book()
+        self._finish_import()
+        self.ui.statusbar.showMessage("已取消导入", 5000)
     
     def refresh_chapter_list(self, book_id: int):
         """刷新章节列表"""
@@ -1023,30 +1325,49 @@ class ReaderWindow(QMainWindow):
         if content:
             print(f"成功获取章节内容，长度: {len(content)}")
             self._suppress_progress_save = True
-            # 使用当前样式设置应用内容
-            self.update_text_style()
-            
             # 获取上次阅读位置
             progress = self.db_handler.get_book_progress(self.current_book_id)
-            if progress and progress['chapter_index'] == self.current_chapter_index:
+            if progress and progress['chapter_index'] != self.current_chapter_index:
+                progress = None
+
+            # 使用当前样式设置应用内容
+            self._render_chapter(content, progress['segment_index'] if progress else 0)
+            self.lookup_prefetcher.chapter_changed()
+
+            # 后台预取前后相邻的章节，翻页时直接命中缓存
+            neighbours = [
+                index for index in (self.current_chapter_index - 1, self.current_chapter_index + 1)
+                if 0 <= index < self.ui.chapter_combo.count()
+            ]
+            self.db_handler.prefetch_chapters(self.current_book_id, neighbours)
+            
+            if progress:
                 print(f"找到阅读进度，章节: {progress['chapter_index']}, 位置: {progress['position']}")
                 # 使用更长的延时确保内容完全载
-                QTimer.singleShot(500, lambda pos=progress['position']: self._restore_position(pos))
+                QTimer.singleShot(
+                    500,
+                    lambda pos=progress['position'], segment=progress['segment_index']:
+                        self._restore_position(pos, segment),
+                )
             else:
                 print("未找到当前章节的阅读进度，从头开始阅读")
                 QTimer.singleShot(0, self._clear_suppress_progress_save)
         else:
             print("未获取到章节内容")
+            self.chapter_window.clear()
             self.textEdit.setPlainText("无法加载章节内容")
     
-    def _restore_position(self, position: int):
+    def _restore_position(self, position: int, segment_index: int = 0):
         """恢复阅读位置"""
         print(f"正在恢复阅读位置: {position}")
         scrollbar = self.textEdit.verticalScrollBar()
         current_pos = scrollbar.value()
         print(f"当前位置: {current_pos}, 目��位置: {position}")
         self._suppress_progress_save = True
-        scrollbar.setValue(position)
+        if self.chapter_window.is_active():
+            self.chapter_window.restore(segment_index, position)
+        else:
+            scrollbar.setValue(position)
         QTimer.singleShot(0, self._clear_suppress_progress_save)
         print(f"设置后的位置: {scrollbar.value()}")
 
@@ -1078,6 +1399,7 @@ class ReaderWindow(QMainWindow):
         self.ui.menuSettings.addAction(self.ui.actionContextSettings)
         self.ui.menuSettings.addAction(self.ui.actionNoteSettings)
         self.ui.menuSettings.addAction(self.ui.actionTemplateSettings)
+        self.ui.menuSettings.addAction(self.ui.actionImportSettings)
 
     def on_prev_chapter(self):
         """处理上一章按钮点击事件"""
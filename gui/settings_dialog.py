@@ -1,11 +1,12 @@
 from aqt.qt import *
 from typing import Dict, Any, Optional
-import json
 from ..utils.ai_factory import AIFactory
 from ..utils.ai_client import AIClient
 from ..utils.template_manager import TemplateManager
-from ..utils.async_utils import run_async
+from ..utils.ai_transport import shared_transport
+from ..utils.config_service import config_service
 from ..utils.paths import config_json_path
+from ..utils.html_parser_backend import AUTO_BACKEND, DEFAULT_BACKEND, PARSER_BACKENDS, available_backends
 from .dialog_styles import COMMON_DIALOG_QSS
 
 CONFIG_PATH = config_json_path()
@@ -81,29 +82,27 @@ class ContextSettingsDialog(QDialog):
     def load_config(self):
         """加载配置"""
         try:
-            if os.path.exists(CONFIG_PATH):
-                with open(CONFIG_PATH, 'r', encoding='utf-8') as f:
-                    config = json.load(f)
-                    
-                    # 设置AI上下文类型
-                    ai_context_type = config.get("ai_context_type", "Current Sentence Only")
-                    for i in range(self.ai_context_type_combo.count()):
-                        if self.ai_context_type_combo.itemData(i) == ai_context_type:
-                            self.ai_context_type_combo.setCurrentIndex(i)
-                            break
-                        
-                    # 设置Anki上下文类型
-                    anki_context_type = config.get("anki_context_type", "Current Sentence Only")
-                    for i in range(self.anki_context_type_combo.count()):
-                        if self.anki_context_type_combo.itemData(i) == anki_context_type:
-                            self.anki_context_type_combo.setCurrentIndex(i)
-                            break
+            config = config_service().copy(CONFIG_PATH)
 
-                    lookup_optional = config.get("lookup_optional_fields", {})
-                    if isinstance(lookup_optional, dict):
-                        self.lookup_pos_checkbox.setChecked(bool(lookup_optional.get("pos", False)))
-                        self.lookup_ipa_checkbox.setChecked(bool(lookup_optional.get("ipa", False)))
-                        self.lookup_examples_checkbox.setChecked(bool(lookup_optional.get("examples", False)))
+            # 设置AI上下文类型
+            ai_context_type = config.get("ai_context_type", "Current Sentence Only")
+            for i in range(self.ai_context_type_combo.count()):
+                if self.ai_context_type_combo.itemData(i) == ai_context_type:
+                    self.ai_context_type_combo.setCurrentIndex(i)
+                    break
+
+            # 设置Anki上下文类型
+            anki_context_type = config.get("anki_context_type", "Current Sentence Only")
+            for i in range(self.anki_context_type_combo.count()):
+                if self.anki_context_type_combo.itemData(i) == anki_context_type:
+                    self.anki_context_type_combo.setCurrentIndex(i)
+                    break
+
+            lookup_optional = config.get("lookup_optional_fields", {})
+            if isinstance(lookup_optional, dict):
+                self.lookup_pos_checkbox.setChecked(bool(lookup_optional.get("pos", False)))
+                self.lookup_ipa_checkbox.setChecked(bool(lookup_optional.get("ipa", False)))
+                self.lookup_examples_checkbox.setChecked(bool(lookup_optional.get("examples", False)))
         except Exception as e:
             QMessageBox.warning(self, "错误", f"加载配置失败：{str(e)}")
     
@@ -111,10 +110,7 @@ class ContextSettingsDialog(QDialog):
         """保存设置"""
         try:
             # 读取现有配置
-            config = {}
-            if os.path.exists(CONFIG_PATH):
-                with open(CONFIG_PATH, 'r', encoding='utf-8') as f:
-                    config = json.load(f)
+            config = config_service().copy(CONFIG_PATH)
             
             # 更新上下文设置
             config["ai_context_type"] = self.ai_context_type_combo.currentData()
@@ -125,9 +121,8 @@ class ContextSettingsDialog(QDialog):
                 "examples": self.lookup_examples_checkbox.isChecked(),
             }
             
-            # 保存配置
-            with open(CONFIG_PATH, 'w', encoding='utf-8') as f:
-                json.dump(config, f, indent=4, ensure_ascii=False)
+            # 保存配置（同时更新内存中的配置快照）
+            config_service().save(CONFIG_PATH, config)
             
             super().accept()
         except Exception as e:
@@ -229,40 +224,38 @@ class AIServiceSettingsDialog(QDialog):
     def load_config(self):
         """加载配置"""
         try:
-            if os.path.exists(CONFIG_PATH):
-                with open(CONFIG_PATH, 'r', encoding='utf-8') as f:
-                    config = json.load(f)
-                    
-                    # 设置服务类型
-                    service_type_raw = str(config.get("service_type", "openai"))
-                    service_type_norm = service_type_raw.lower().replace(" ", "")
-                    if "openai" in service_type_norm:
-                        service_type = "openai"
-                    elif "custom" in service_type_norm:
-                        service_type = "custom"
-                    else:
-                        service_type = "openai"
+            config = config_service().copy(CONFIG_PATH)
+
+            # 设置服务类型
+            service_type_raw = str(config.get("service_type", "openai"))
+            service_type_norm = service_type_raw.lower().replace(" ", "")
+            if "openai" in service_type_norm:
+                service_type = "openai"
+            elif "custom" in service_type_norm:
+                service_type = "custom"
+            else:
+                service_type = "openai"
 
-                    for i in range(self.service_type_combo.count()):
-                        if self.service_type_combo.itemData(i) == service_type:
-                            self.service_type_combo.setCurrentIndex(i)
-                            break
-                    
-                    # OpenAI设置
-                    openai_config = config.get("openai", {})
-                    self.api_key_edit.setText(openai_config.get("api_key", ""))
-                    self.api_base_edit.setText(openai_config.get("api_base", ""))
-                    model = openai_config.get("model", "gpt-3.5-turbo")
-                    index = self.model_combo.findText(model)
-                    if index >= 0:
-                        self.model_combo.setCurrentIndex(index)
-                    
-                    # 自定义API设置
-                    custom_config = config.get("custom", {})
-                    self.custom_api_key_edit.setText(custom_config.get("api_key", ""))
-                    self.custom_base_edit.setText(custom_config.get("api_base", ""))
-                    model = custom_config.get("model", "gpt-3.5-turbo")
-                    self.custom_model_combo.setCurrentText(model)
+            for i in range(self.service_type_combo.count()):
+                if self.service_type_combo.itemData(i) == service_type:
+                    self.service_type_combo.setCurrentIndex(i)
+                    break
+
+            # OpenAI设置
+            openai_config = config.get("openai", {})
+            self.api_key_edit.setText(openai_config.get("api_key", ""))
+            self.api_base_edit.setText(openai_config.get("api_base", ""))
+            model = openai_config.get("model", "gpt-3.5-turbo")
+            index = self.model_combo.findText(model)
+            if index >= 0:
+                self.model_combo.setCurrentIndex(index)
+
+            # 自定义API设置
+            custom_config = config.get("custom", {})
+            self.custom_api_key_edit.setText(custom_config.get("api_key", ""))
+            self.custom_base_edit.setText(custom_config.get("api_base", ""))
+            model = custom_config.get("model", "gpt-3.5-turbo")
+            self.custom_model_combo.setCurrentText(model)
         except Exception as e:
             QMessageBox.warning(self, "错误", f"加载配置失败：{str(e)}")
     
@@ -308,10 +301,7 @@ class AIServiceSettingsDialog(QDialog):
             
         try:
             # 读取现有配置
-            config = {}
-            if os.path.exists(CONFIG_PATH):
-                with open(CONFIG_PATH, 'r', encoding='utf-8') as f:
-                    config = json.load(f)
+            config = config_service().copy(CONFIG_PATH)
             
             # 更新AI服务设置
             config["service_type"] = self.service_type_combo.currentData()
@@ -326,9 +316,8 @@ class AIServiceSettingsDialog(QDialog):
                 "model": self.custom_model_combo.currentText()
             }
             
-            # 保存配置
-            with open(CONFIG_PATH, 'w', encoding='utf-8') as f:
-                json.dump(config, f, indent=4, ensure_ascii=False)
+            # 保存配置（同时更新内存中的配置快照）
+            config_service().save(CONFIG_PATH, config)
             
             super().accept()
         except Exception as e:
@@ -352,7 +341,7 @@ class AIServiceSettingsDialog(QDialog):
                 return
             
             try:
-                response = run_async(client.explain("测试连接"))
+                response = shared_transport().run(client.explain("测试连接"))
                 if response.error:
                     raise Exception(response.error)
                 QMessageBox.information(self, "成功", "连接测试成功！")
@@ -362,6 +351,69 @@ class AIServiceSettingsDialog(QDialog):
             self.test_button.setEnabled(True)
             self.test_button.setText("测试连接")
 
+class ImportSettingsDialog(QDialog):
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.setWindowTitle("导入设置")
+        self.setMinimumWidth(400)
+        self.setStyleSheet(DIALOG_QSS)
+        
+        # 创建主布局
+        self.main_layout = QVBoxLayout()
+        self.setLayout(self.main_layout)
+        
+        # EPUB导入设置组
+        self.import_group = QGroupBox("EPUB 导入")
+        import_layout = QFormLayout()
+        
+        self.parser_combo = QComboBox()
+        self.parser_combo.addItem(f"自动（当前：{DEFAULT_BACKEND}）", AUTO_BACKEND)
+        for name in available_backends():
+            self.parser_combo.addItem(PARSER_BACKENDS[name], name)
+        import_layout.addRow("HTML 解析器：", self.parser_combo)
+        self.import_group.setLayout(import_layout)
+        
+        self.main_layout.addWidget(self.import_group)
+        self.main_layout.addStretch()
+        
+        # 添加按钮
+        button_box = QDialogButtonBox(
+            QDialogButtonBox.StandardButton.Ok | 
+            QDialogButtonBox.StandardButton.Cancel
+        )
+        button_box.accepted.connect(self.accept)
+        button_box.rejected.connect(self.reject)
+        self.main_layout.addWidget(button_box)
+        
+        # 加载配置
+        self.load_config()
+        
+    def load_config(self):
+        """加载配置"""
+        parser = AUTO_BACKEND
+        try:
+            config = config_service().copy(CONFIG_PATH)
+            parser = str(config.get("html_parser", parser))
+        except Exception as e:
+            QMessageBox.warning(self, "错误", f"加载配置失败：{str(e)}")
+        index = self.parser_combo.findData(parser)
+        self.parser_combo.setCurrentIndex(index if index >= 0 else 0)
+    
+    def accept(self):
+        """保存设置"""
+        try:
+            # 读取现有配置
+            config = config_service().copy(CONFIG_PATH)
+            
+            config["html_parser"] = self.parser_combo.currentData()
+            
+            # 保存配置（同时更新内存中的配置快照）
+            config_service().save(CONFIG_PATH, config)
+            
+            super().accept()
+        except Exception as e:
+            QMessageBox.critical(self, "错误", f"保存设置失败：{str(e)}")
+
 class SettingsDialog(QDialog):
     def __init__(self, parent=None):
         super().__init__(parent)
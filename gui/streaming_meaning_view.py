@@ -0,0 +1,165 @@
+from __future__ import annotations
+
+import time
+from typing import Dict, List, Optional
+
+from aqt.qt import *
+
+from ..utils.lookup_json import (
+    LookupFieldEvent,
+    render_basic_meaning_html,
+    render_optional_fields_html,
+)
+
+# 两次写入之间的间隔（毫秒）：按写入耗时在此范围内自适应
+MIN_FLUSH_INTERVAL_MS = 16
+MAX_FLUSH_INTERVAL_MS = 250
+# 写入耗时约占刷新间隔的 1/4，其余时间留给事件循环（滚动、点击等）
+_FLUSH_BUDGET_RATIO = 4
+
+
+class StreamingMeaningView(QObject):
+    """流式查词时以追加方式更新释义面板
+
+    字段事件先缓存，按帧批量写入：每次只通过 QTextCursor 在文档末尾追加新内容，
+    不再对整个面板 setHtml 并重新排版。刷新间隔随实际写入耗时调整，
+    写入越慢刷新越少；完成后仍由调用方用完整结果渲染一次。
+    """
+
+    def __init__(self, text_edit: QTextEdit, parent=None):
+        super().__init__(parent)
+        self.text_edit = text_edit
+        self._pending: List[LookupFieldEvent] = []
+        self._enabled_optional_fields: Dict[str, bool] = {}
+        self._has_cached_basic = False
+        self._section: Optional[str] = None
+        self._streamed_contextual = False
+        self._interval_ms = MIN_FLUSH_INTERVAL_MS
+        self.flushes = 0
+        self.flush_seconds = 0.0
+
+        self._timer = QTimer(self)
+        self._timer.setSingleShot(True)
+        self._timer.timeout.connect(self._flush)
+
+        self._heading_block = QTextBlockFormat()
+        self._heading_block.setHeadingLevel(3)
+        self._heading_block.setBottomMargin(8)
+        self._heading_char = QTextCharFormat()
+        self._heading_char.setFontWeight(QFont.Weight.Bold.value)
+        self._heading_char.setProperty(QTextFormat.Property.FontSizeAdjustment, 1)
+        self._body_block = QTextBlockFormat()
+        self._body_block.setBottomMargin(12)
+        self._body_char = QTextCharFormat()
+        self._item_block = QTextBlockFormat()
+        self._item_block.setBottomMargin(4)
+
+    def begin(self, *, enabled_optional_fields: Dict[str, bool], basic_meaning: Optional[List[str]] = None) -> None:
+        """开始一次流式查词；basic_meaning 为单词缓存中已有的基本义，先行显示"""
+        self.stop()
+        self._enabled_optional_fields = dict(enabled_optional_fields)
+        self._has_cached_basic = bool(basic_meaning)
+        self._section = None
+        self._streamed_contextual = False
+
+        status = "语境义正在生成（流式）…" if basic_meaning else "正在生成（流式）…"
+        cached = render_basic_meaning_html(basic_meaning) if basic_meaning else ""
+        self.text_edit.setHtml(f"<div>{cached}<p style='margin:0 0 8px 0; color:#86868B;'>{status}</p></div>")
+        # 追加的内容不需要撤销记录
+        self.text_edit.document().setUndoRedoEnabled(False)
+
+    def begin_batch(self, html: str) -> None:
+        """开始一次批量查词：html 为已缓存的词条与状态行，之后各词的结果用 append_html 追加"""
+        self.stop()
+        self.text_edit.setHtml(html)
+        self.text_edit.document().setUndoRedoEnabled(False)
+
+    def append_html(self, html: str) -> None:
+        """在文档末尾追加一段 HTML，已有内容不重新排版"""
+        cursor = QTextCursor(self.text_edit.document())
+        cursor.movePosition(QTextCursor.MoveOperation.End)
+        cursor.beginEditBlock()
+        cursor.insertBlock(self._body_block, self._body_char)
+        cursor.insertHtml(html)
+        cursor.endEditBlock()
+
+    def push(self, events: List[LookupFieldEvent]) -> None:
+        """缓存新的字段事件，在下一帧写入"""
+        self._pending.extend(events)
+        if self._pending and not self._timer.isActive():
+            self._timer.start(self._interval_ms)
+
+    def stop(self) -> None:
+        """丢弃尚未写入的事件（请求结束、取消或被新的查词替代时调用）"""
+        self._timer.stop()
+        self._pending = []
+
+    def stats(self) -> Dict[str, float]:
+        return {
+            "flushes": self.flushes,
+            "avg_flush_ms": self.flush_seconds * 1000 / self.flushes if self.flushes else 0.0,
+            "interval_ms": self._interval_ms,
+        }
+
+    def _flush(self) -> None:
+        events, self._pending = self._pending, []
+        if not events:
+            return
+        started = time.perf_counter()
+        cursor = QTextCursor(self.text_edit.document())
+        cursor.movePosition(QTextCursor.MoveOperation.End)
+        cursor.beginEditBlock()
+        for event in events:
+            self._append(cursor, event)
+        cursor.endEditBlock()
+        elapsed = time.perf_counter() - started
+
+        self.flushes += 1
+        self.flush_seconds += elapsed
+        target = elapsed * 1000 * _FLUSH_BUDGET_RATIO
+        smoothed = 0.7 * self._interval_ms + 0.3 * target
+        self._interval_ms = int(min(MAX_FLUSH_INTERVAL_MS, max(MIN_FLUSH_INTERVAL_MS, smoothed)))
+
+    def _append(self, cursor: QTextCursor, event: LookupFieldEvent) -> None:
+        field = event.field
+        if field == "word":
+            return
+        if field == "basic_meaning":
+            # 已先行显示缓存的基本义时不再重复；完成后的完整结果会使用新的基本义
+            if self._has_cached_basic:
+                return
+            if self._section != "basic_meaning":
+                self._insert_heading(cursor, "基本义")
+                cursor.insertBlock(self._item_block, self._body_char)
+                list_format = QTextListFormat()
+                list_format.setStyle(QTextListFormat.Style.ListDisc)
+                cursor.createList(list_format)
+            else:
+                cursor.insertBlock()
+            cursor.insertText(event.text, self._body_char)
+        elif field == "contextual_meaning":
+            if event.complete and self._streamed_contextual:
+                self._section = None
+                return
+            if not event.text:
+                return
+            if self._section != field:
+                self._insert_heading(cursor, "语境义")
+                cursor.insertBlock(self._body_block, self._body_char)
+            self._streamed_contextual = True
+            cursor.insertText(event.text, self._body_char)
+        elif field == "raw":
+            if self._section != field:
+                cursor.insertBlock(self._body_block, self._body_char)
+            cursor.insertText(event.text, self._body_char)
+        else:
+            html = render_optional_fields_html({field: event.value}, self._enabled_optional_fields)
+            if not html:
+                return
+            cursor.insertBlock(self._body_block, self._body_char)
+            cursor.insertHtml(html)
+        self._section = field
+
+    def _insert_heading(self, cursor: QTextCursor, title: str) -> None:
+        cursor.insertBlock(self._heading_block, self._heading_char)
+        cursor.insertText(title, self._heading_char)
@@ -1,12 +1,11 @@
 from __future__ import annotations
 
-import json
-import os
 from typing import Dict
 
 from aqt.qt import *
 
-from ..utils.paths import config_json_path, addon_data_root
+from ..utils.config_service import config_service
+from ..utils.paths import config_json_path
 from .dialog_styles import COMMON_DIALOG_QSS
 
 
@@ -95,21 +94,10 @@ class TemplateDialog(QDialog):
         layout.addWidget(buttons)
 
     def _load_config(self) -> Dict:
-        path = config_json_path()
-        if os.path.exists(path):
-            try:
-                with open(path, "r", encoding="utf-8") as f:
-                    cfg = json.load(f)
-                if isinstance(cfg, dict):
-                    return cfg
-            except Exception:
-                pass
-        return {}
+        return config_service().copy(config_json_path())
 
     def _save_config(self, cfg: Dict) -> None:
-        os.makedirs(addon_data_root(), exist_ok=True)
-        with open(config_json_path(), "w", encoding="utf-8") as f:
-            json.dump(cfg, f, indent=4, ensure_ascii=False)
+        config_service().save(config_json_path(), cfg)
 
     def _load_config_into_ui(self) -> None:
         cfg = self._load_config()
@@ -297,7 +297,7 @@ class Ui_ReaderWindow(object):
         self.meaningScroll.setWidget(self.meaningContainer)
         self.word_main_layout.addWidget(self.meaningScroll, 1)
         
-        # 操作按钮（取消 / 添加到 Anki）
+        # 操作按钮（取消 / 重新生成 / 添加到 Anki）
         self.actionButtonsContainer = QWidget()
         self.actionButtonsLayout = QHBoxLayout(self.actionButtonsContainer)
         self.actionButtonsLayout.setContentsMargins(0, 0, 0, 0)
@@ -328,6 +328,11 @@ class Ui_ReaderWindow(object):
             }
         """)
 
+        # 忽略缓存，重新请求当前单词的释义
+        self.refreshLookupButton = QPushButton("重新生成")
+        self.refreshLookupButton.setStyleSheet(self.cancelLookupButton.styleSheet())
+        self.refreshLookupButton.setEnabled(False)
+
         self.addToAnkiButton = QPushButton("添加到 Anki")
         self.addToAnkiButton.setStyleSheet("""
             QPushButton {
@@ -354,6 +359,7 @@ class Ui_ReaderWindow(object):
         """)
 
         self.actionButtonsLayout.addWidget(self.cancelLookupButton)
+        self.actionButtonsLayout.addWidget(self.refreshLookupButton)
         self.actionButtonsLayout.addWidget(self.addToAnkiButton, 1)
         self.word_main_layout.addWidget(self.actionButtonsContainer)
         
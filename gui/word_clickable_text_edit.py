@@ -1,24 +1,26 @@
-import json
-import os
-
-from PyQt6.QtCore import pyqtSignal, QTimer, Qt
+from PyQt6.QtCore import pyqtSignal, QPoint, QTimer, Qt
 from PyQt6.QtWidgets import QTextEdit
 from PyQt6.QtGui import QTextCursor
 
-from .settings_dialog import CONFIG_PATH
-from ..utils.text_utils import TextContextExtractor
+from ..utils.config_service import app_config
+from ..utils.text_utils import SentenceIndex, TextContextExtractor
+from ..utils.word_rarity import distinct_words
 
 
 class WordClickableTextEdit(QTextEdit):
     """支持单词点击的文本编辑器"""
 
     wordClicked = pyqtSignal(str, str)  # 单词和上下文
+    batchLookupRequested = pyqtSignal(list)  # [(单词, 上下文)]
 
     def __init__(self, parent=None):
         super().__init__(parent)
         self.setMouseTracking(True)
         self.viewport().setCursor(Qt.CursorShape.IBeamCursor)
         self.context_extractor = TextContextExtractor()
+        # 句子边界索引：文档内容变化后失效，下次查词时重建
+        self._sentence_index = None
+        self.textChanged.connect(self._invalidate_sentence_index)
         self.setContextMenuPolicy(Qt.ContextMenuPolicy.CustomContextMenu)
         self.customContextMenuRequested.connect(self.show_context_menu)
 
@@ -28,6 +30,22 @@ class WordClickableTextEdit(QTextEdit):
         self.click_timer.setSingleShot(True)
         self.click_timer.timeout.connect(self.handle_click)
 
+    def _invalidate_sentence_index(self):
+        self._sentence_index = None
+
+    def sentence_index(self) -> SentenceIndex:
+        """当前文档的句子索引（每次内容变化后只构建一次）"""
+        if self._sentence_index is None:
+            self._sentence_index = SentenceIndex(self.toPlainText())
+        return self._sentence_index
+
+    def visible_range(self) -> tuple[int, int]:
+        """视口中可见文字的起止位置"""
+        viewport = self.viewport()
+        start = self.cursorForPosition(QPoint(0, 0)).position()
+        end = self.cursorForPosition(QPoint(viewport.width() - 1, viewport.height() - 1)).position()
+        return start, max(start, end)
+
     def mousePressEvent(self, event):
         if event.button() == Qt.MouseButton.LeftButton:
             self.last_click_pos = event.pos()
@@ -80,6 +98,14 @@ class WordClickableTextEdit(QTextEdit):
             menu.insertSeparator(menu.actions()[1])
             lookup_action.triggered.connect(lambda: self.lookup_and_emit(selected_text, cursor.position()))
 
+            # 选中一段文字或一组单词时，可以一次请求查询其中全部单词
+            words = distinct_words(cursor.selectedText())
+            if len(words) > 1:
+                batch_action = menu.addAction(f"批量查词（{len(words)} 个）")
+                menu.insertAction(menu.actions()[1], batch_action)
+                selection_start = cursor.selectionStart()
+                batch_action.triggered.connect(lambda: self.batch_lookup_and_emit(words, selection_start))
+
         menu.exec(self.viewport().mapToGlobal(position))
 
     def lookup_and_emit(self, word: str, cursor_pos: int):
@@ -87,6 +113,14 @@ class WordClickableTextEdit(QTextEdit):
         context = self.lookup_word(word, cursor_pos, for_ai=True)
         self.wordClicked.emit(word, context)
 
+    def batch_lookup_and_emit(self, words: list, selection_start: int):
+        """为选区中的每个单词取上下文（与单独点击时相同）并发送批量查词信号"""
+        items = [
+            (word, self.lookup_word(word, selection_start + offset, for_ai=True))
+            for word, offset in words
+        ]
+        self.batchLookupRequested.emit(items)
+
     def lookup_word(self, word: str, cursor_pos: int, for_ai: bool = True):
         """处理查词请求
 
@@ -98,16 +132,14 @@ class WordClickableTextEdit(QTextEdit):
         Returns:
             str: 上下文文本
         """
+        config = app_config()
         include_adjacent = True
-        if os.path.exists(CONFIG_PATH):
-            with open(CONFIG_PATH, "r", encoding="utf-8") as file:
-                config = json.load(file)
-                context_type = config.get(
-                    "ai_context_type" if for_ai else "anki_context_type",
-                    "Current Sentence Only",
-                )
-                include_adjacent = context_type == "Current Sentence with Adjacent (1 Sentence)"
-
-        text = self.toPlainText()
-        return self.context_extractor.get_context(text, cursor_pos, include_adjacent)
+        if config:
+            context_type = config.get(
+                "ai_context_type" if for_ai else "anki_context_type",
+                "Current Sentence Only",
+            )
+            include_adjacent = context_type == "Current Sentence with Adjacent (1 Sentence)"
+
+        return self.sentence_index().get_context(cursor_pos, include_adjacent)
 
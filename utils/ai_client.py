@@ -1,10 +1,11 @@
 from __future__ import annotations
 
 import asyncio
-import json
 from dataclasses import dataclass
 from typing import Any, AsyncIterator, Callable, Dict, Optional
 
+from .ai_transport import shared_transport
+from .sse_stream import SSEDecoder, extract_delta_content
 from .vendor_path import vendored_sys_path
 
 with vendored_sys_path():
@@ -65,33 +66,18 @@ async def _sse_stream_chat_completions(
         if response.status != 200:
             raise Exception(f"API调用失败: {await response.text()}")
 
-        buffer = b""
-        async for chunk in response.content.iter_chunked(1024):
+        decoder = SSEDecoder()
+        read_size = shared_transport().limits.stream_read_size
+        async for chunk in response.content.iter_chunked(read_size):
             if _should_cancel(cancel_cb):
                 raise asyncio.CancelledError()
 
-            buffer += chunk
-            while b"\n" in buffer:
-                line, buffer = buffer.split(b"\n", 1)
-                line = line.strip()
-                if not line:
-                    continue
-                if not line.startswith(b"data:"):
-                    continue
-                data = line[len(b"data:") :].strip()
+            for data in decoder.feed(chunk):
                 if data == b"[DONE]":
                     return
-                try:
-                    obj = json.loads(data.decode("utf-8", errors="replace"))
-                except Exception:
-                    continue
-                try:
-                    delta = obj["choices"][0].get("delta", {})
-                    text = delta.get("content")
-                except Exception:
-                    text = None
+                text = extract_delta_content(data)
                 if text:
-                    yield str(text)
+                    yield text
 
 class OpenAIClient(AIClient):
     """OpenAI客户端"""
@@ -115,17 +101,14 @@ class OpenAIClient(AIClient):
                 "messages": [{"role": "user", "content": prompt}],
             }
 
-            async with aiohttp.ClientSession() as session:
-                async with session.post(
-                    _chat_completions_url(self.api_base),
-                    headers=headers,
-                    json=data,
-                ) as response:
-                    if response.status == 200:
-                        result = await response.json()
-                        return AIResponse(explanation=result["choices"][0]["message"]["content"])
-                    error_msg = await response.text()
-                    return AIResponse(error=f"API调用失败: {error_msg}")
+            api_url = _chat_completions_url(self.api_base)
+            session = await shared_transport().session(api_url)
+            async with session.post(api_url, headers=headers, json=data) as response:
+                if response.status == 200:
+                    result = await response.json()
+                    return AIResponse(explanation=result["choices"][0]["message"]["content"])
+                error_msg = await response.text()
+                return AIResponse(error=f"API调用失败: {error_msg}")
                         
         except Exception as e:
             return AIResponse(error=f"请求失败: {str(e)}")
@@ -149,16 +132,17 @@ class OpenAIClient(AIClient):
             "messages": [{"role": "user", "content": prompt}],
         }
 
-        timeout = aiohttp.ClientTimeout(total=120, connect=15)
-        async with aiohttp.ClientSession(timeout=timeout) as session:
-            async for delta in _sse_stream_chat_completions(
-                session=session,
-                url=_chat_completions_url(self.api_base),
-                headers=headers,
-                payload=data,
-                cancel_cb=cancel_cb,
-            ):
-                yield delta
+        api_url = _chat_completions_url(self.api_base)
+        # 共享会话的超时由 AITransport 的 TransportLimits 决定
+        session = await shared_transport().session(api_url)
+        async for delta in _sse_stream_chat_completions(
+            session=session,
+            url=api_url,
+            headers=headers,
+            payload=data,
+            cancel_cb=cancel_cb,
+        ):
+            yield delta
 
 class CustomAIClient(AIClient):
     """自定义AI服务客户端"""
@@ -185,20 +169,20 @@ class CustomAIClient(AIClient):
             
             api_url = _chat_completions_url(self.api_base)
             
-            async with aiohttp.ClientSession() as session:
-                async with session.post(
-                    api_url,
-                    headers=headers,
-                    json=data
-                ) as response:
-                    if response.status == 200:
-                        result = await response.json()
-                        return AIResponse(
-                            explanation=result["choices"][0]["message"]["content"]
-                        )
-                    else:
-                        error_msg = await response.text()
-                        return AIResponse(error=f"API调用失败: {error_msg}")
+            session = await shared_transport().session(api_url)
+            async with session.post(
+                api_url,
+                headers=headers,
+                json=data
+            ) as response:
+                if response.status == 200:
+                    result = await response.json()
+                    return AIResponse(
+                        explanation=result["choices"][0]["message"]["content"]
+                    )
+                else:
+                    error_msg = await response.text()
+                    return AIResponse(error=f"API调用失败: {error_msg}")
                         
         except Exception as e:
             return AIResponse(error=f"请求失败: {str(e)}")
@@ -222,13 +206,14 @@ class CustomAIClient(AIClient):
             "messages": [{"role": "user", "content": prompt}],
         }
 
-        timeout = aiohttp.ClientTimeout(total=120, connect=15)
-        async with aiohttp.ClientSession(timeout=timeout) as session:
-            async for delta in _sse_stream_chat_completions(
-                session=session,
-                url=_chat_completions_url(self.api_base),
-                headers=headers,
-                payload=data,
-                cancel_cb=cancel_cb,
-            ):
-                yield delta
+        api_url = _chat_completions_url(self.api_base)
+        # 共享会话的超时由 AITransport 的 TransportLimits 决定
+        session = await shared_transport().session(api_url)
+        async for delta in _sse_stream_chat_completions(
+            session=session,
+            url=api_url,
+            headers=headers,
+            payload=data,
+            cancel_cb=cancel_cb,
+        ):
+            yield delta
@@ -0,0 +1,215 @@
+"""AI 请求共用的网络传输层。
+
+所有 AI 请求都在同一个后台事件循环线程中执行，并按 API 地址（协议 + 主机 + 端口）
+复用 aiohttp 会话：连接保持存活，之后的查词不必重新进行 DNS 解析、TCP 与 TLS 握手。
+"""
+
+from __future__ import annotations
+
+import asyncio
+import threading
+import urllib.parse
+from concurrent.futures import Future
+from dataclasses import dataclass
+from typing import Any, Awaitable, Dict, List, Mapping, Optional, TypeVar
+
+from .sse_stream import DEFAULT_READ_SIZE
+from .vendor_path import vendored_sys_path
+
+with vendored_sys_path():
+    import aiohttp
+
+T = TypeVar("T")
+
+
+@dataclass(frozen=True)
+class TransportLimits:
+    """连接池、超时（秒）与流式响应每次读取的字节数"""
+
+    max_connections: int = 10
+    connections_per_host: int = 4
+    keepalive_timeout: float = 60.0
+    connect_timeout: float = 15.0
+    request_timeout: float = 120.0
+    stream_read_size: int = DEFAULT_READ_SIZE
+
+    @classmethod
+    def from_config(cls, config: Mapping[str, Any]) -> "TransportLimits":
+        """从 config.json 的 "ai_transport" 项读取，缺失或无效的字段使用默认值"""
+        raw = config.get("ai_transport")
+        if not isinstance(raw, Mapping):
+            return cls()
+        defaults = cls()
+        values = {}
+        for name in cls.__dataclass_fields__:
+            default = getattr(defaults, name)
+            try:
+                value = type(default)(raw.get(name, default))
+            except (TypeError, ValueError):
+                value = default
+            values[name] = value if value > 0 else default
+        return cls(**values)
+
+
+def _origin(url: str) -> str:
+    parts = urllib.parse.urlsplit(url)
+    return f"{parts.scheme}://{parts.netloc}".lower()
+
+
+class AITransport:
+    """后台事件循环线程与按 API 地址划分的 keep-alive 连接池
+
+    submit() 可在任意线程调用；session() 只能在本传输的事件循环中调用
+    （即由 submit/run 提交的协程内）。
+    """
+
+    def __init__(self, limits: Optional[TransportLimits] = None):
+        self.limits = limits or TransportLimits()
+        self._lock = threading.Lock()
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._thread: Optional[threading.Thread] = None
+        self._sessions: Dict[str, aiohttp.ClientSession] = {}
+        # 以下两项只在事件循环线程中读写
+        self._active = 0  # 进行中的请求数
+        self._retired: List[aiohttp.ClientSession] = []  # 设置变更前的会话，请求全部结束后关闭
+
+    def _ensure_loop(self) -> asyncio.AbstractEventLoop:
+        with self._lock:
+            if self._loop is None:
+                loop = asyncio.new_event_loop()
+                ready = threading.Event()
+
+                def run_loop() -> None:
+                    asyncio.set_event_loop(loop)
+                    loop.call_soon(ready.set)
+                    loop.run_forever()
+
+                thread = threading.Thread(target=run_loop, name="ai-transport", daemon=True)
+                thread.start()
+                ready.wait()
+                self._loop = loop
+                self._thread = thread
+            return self._loop
+
+    def submit(self, coro: Awaitable[T]) -> "Future[T]":
+        """把协程提交到后台事件循环；返回的 Future.cancel() 会取消该协程"""
+        return asyncio.run_coroutine_threadsafe(self._track(coro), self._ensure_loop())
+
+    async def _track(self, coro: Awaitable[T]) -> T:
+        self._active += 1
+        try:
+            return await coro
+        finally:
+            self._active -= 1
+            if not self._active and self._retired:
+                await self._close_retired()
+
+    def run(self, coro: Awaitable[T], timeout: Optional[float] = None) -> T:
+        """提交协程并阻塞等待结果（用于设置对话框中的连接测试等一次性请求）"""
+        return self.submit(coro).result(timeout)
+
+    async def session(self, url: str) -> aiohttp.ClientSession:
+        """url 所在 API 地址的共享会话"""
+        if asyncio.get_running_loop() is not self._loop:
+            raise RuntimeError("AI 请求必须通过 AITransport.submit 在传输线程中执行")
+        origin = _origin(url)
+        session = self._sessions.get(origin)
+        if session is None or session.closed:
+            limits = self.limits
+            connector = aiohttp.TCPConnector(
+                limit=limits.max_connections,
+                limit_per_host=limits.connections_per_host,
+                keepalive_timeout=limits.keepalive_timeout,
+                ttl_dns_cache=300,
+            )
+            timeout = aiohttp.ClientTimeout(
+                total=limits.request_timeout,
+                connect=limits.connect_timeout,
+            )
+            session = aiohttp.ClientSession(connector=connector, timeout=timeout)
+            self._sessions[origin] = session
+        return session
+
+    def reconfigure(self, limits: TransportLimits) -> None:
+        """更新连接池设置
+
+        进行中的请求（查词、预取）继续使用原有会话，不被中断；之后的请求按新设置建立会话，
+        原有会话在进行中的请求全部结束后关闭。
+        """
+        with self._lock:
+            loop = self._loop
+        if loop is None:
+            self.limits = limits
+            return
+        asyncio.run_coroutine_threadsafe(self._retire_sessions(limits), loop)
+
+    async def _retire_sessions(self, limits: TransportLimits) -> None:
+        self.limits = limits
+        self._retired.extend(self._sessions.values())
+        self._sessions = {}
+        if not self._active:
+            await self._close_retired()
+
+    async def _close_retired(self) -> None:
+        sessions, self._retired = self._retired, []
+        await self._close_all(sessions)
+
+    async def _close_sessions(self) -> None:
+        sessions, self._sessions = list(self._sessions.values()), {}
+        sessions, self._retired = sessions + self._retired, []
+        await self._close_all(sessions)
+
+    @staticmethod
+    async def _close_all(sessions: List[aiohttp.ClientSession]) -> None:
+        for session in sessions:
+            try:
+                await session.close()
+            except Exception:
+                pass
+
+    def close(self, timeout: float = 3.0) -> None:
+        """关闭全部连接并停止后台线程（之后再提交请求会重新启动）"""
+        with self._lock:
+            loop, thread = self._loop, self._thread
+            self._loop = None
+            self._thread = None
+        if loop is None:
+            return
+        try:
+            asyncio.run_coroutine_threadsafe(self._close_sessions(), loop).result(timeout)
+        except Exception as e:
+            print(f"关闭 AI 连接失败: {str(e)}")
+        loop.call_soon_threadsafe(loop.stop)
+        if thread is not None:
+            thread.join(timeout)
+        if not loop.is_running():
+            loop.close()
+
+
+_transport: Optional[AITransport] = None
+_transport_lock = threading.Lock()
+
+
+def shared_transport() -> AITransport:
+    """全局共用的 AI 传输层"""
+    global _transport
+    with _transport_lock:
+        if _transport is None:
+            _transport = AITransport()
+        return _transport
+
+
+def configure_transport(limits: TransportLimits) -> None:
+    """更新连接池设置；设置变化时之后的请求按新设置建立连接（见 AITransport.reconfigure）"""
+    transport = shared_transport()
+    if transport.limits == limits:
+        return
+    transport.reconfigure(limits)
+
+
+def close_shared_transport() -> None:
+    """关闭全局传输层（插件退出时调用；各阅读器窗口共用，窗口关闭时不关闭）"""
+    with _transport_lock:
+        transport = _transport
+    if transport is not None:
+        transport.close()
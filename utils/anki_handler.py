@@ -5,6 +5,7 @@ from aqt.qt import QMessageBox
 import os
 import json
 
+from .config_service import config_service
 from .paths import note_config_path
 
 class AnkiHandler:
@@ -14,12 +15,10 @@ class AnkiHandler:
     
     def get_note_config(self) -> Dict[str, Any]:
         """获取笔记配置"""
-        try:
-            if os.path.exists(self.config_path):
-                with open(self.config_path, 'r', encoding='utf-8') as f:
-                    return json.load(f)
-        except Exception:
-            pass
+        # 来自内存中的配置快照（见 config_service），不必每次添加笔记都读取文件
+        config = config_service().copy(self.config_path)
+        if config:
+            return config
         return {
             "deck_name": "Default",
             "model_name": "Basic",
@@ -0,0 +1,151 @@
+"""书籍数据（书籍、章节、阅读进度）的存储后端。
+
+DBHandler 只通过这里的接口执行 SQL，接口与 Anki 的 mw.col.db 一致
+（execute/executemany/scalar/first/all），因此同一套表结构与迁移可用于：
+
+- SidecarStore：插件数据目录下独立的 SQLite 文件（默认）。书籍内容不再撑大
+  collection.anki2，也不会随 Anki 的检查、备份与同步一起传输。
+- CollectionStore：Anki 集合数据库（旧版本的存储位置，仅用于迁移）。
+"""
+
+from __future__ import annotations
+
+import os
+import sqlite3
+import threading
+from abc import ABC, abstractmethod
+from typing import Any, Iterable, List, Optional, Sequence
+
+
+class BookStore(ABC):
+    """存储后端接口（方法签名与 mw.col.db 相同）"""
+
+    # 能否直接保存 bytes（决定章节内容的编码方式，见 chapter_codec）
+    supports_blobs = False
+    # 能否在后台线程中读取（如预取章节）
+    thread_safe = False
+
+    @abstractmethod
+    def execute(self, sql: str, *args: Any) -> List[List[Any]]:
+        ...
+
+    @abstractmethod
+    def executemany(self, sql: str, args: Iterable[Sequence[Any]]) -> None:
+        ...
+
+    @abstractmethod
+    def scalar(self, sql: str, *args: Any) -> Any:
+        ...
+
+    @abstractmethod
+    def first(self, sql: str, *args: Any) -> Optional[List[Any]]:
+        ...
+
+    @abstractmethod
+    def all(self, sql: str, *args: Any) -> List[List[Any]]:
+        ...
+
+    def has_table(self, name: str) -> bool:
+        return bool(self.scalar(
+            "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = ?",
+            name,
+        ))
+
+    def close(self) -> None:
+        pass
+
+
+class CollectionStore(BookStore):
+    """Anki 集合数据库（mw.col.db），只能在主线程中使用"""
+
+    supports_blobs = False
+    thread_safe = False
+
+    @property
+    def _db(self):
+        # 用到时才导入 aqt：其它存储与 chapter_insert 的基准测试可脱离 Anki 运行
+        from aqt import mw
+
+        return mw.col.db
+
+    def execute(self, sql: str, *args: Any) -> List[List[Any]]:
+        return self._db.execute(sql, *args)
+
+    def executemany(self, sql: str, args: Iterable[Sequence[Any]]) -> None:
+        self._db.executemany(sql, args)
+
+    def scalar(self, sql: str, *args: Any) -> Any:
+        return self._db.scalar(sql, *args)
+
+    def first(self, sql: str, *args: Any) -> Optional[List[Any]]:
+        return self._db.first(sql, *args)
+
+    def all(self, sql: str, *args: Any) -> List[List[Any]]:
+        return self._db.all(sql, *args)
+
+
+class SidecarStore(BookStore):
+    """插件数据目录下的独立 SQLite 文件
+
+    使用 WAL 模式：读取（如后台预取章节）不会被写入阻塞。
+    sqlite3 连接不能跨线程共享，每个线程使用各自的连接；
+    事务与 mw.col.db 一样由调用方显式 BEGIN/COMMIT，其余语句自动提交。
+    """
+
+    supports_blobs = True
+    thread_safe = True
+
+    def __init__(self, path: str):
+        self.path = path
+        # ":memory:" 等没有目录部分的路径不需要创建目录
+        if os.path.dirname(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+        self._local = threading.local()
+        self._connections: List[sqlite3.Connection] = []
+        self._lock = threading.Lock()
+        self._connection().execute("PRAGMA journal_mode = WAL")
+
+    def _connection(self) -> sqlite3.Connection:
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, isolation_level=None, check_same_thread=False)
+            conn.execute("PRAGMA synchronous = NORMAL")
+            conn.execute("PRAGMA busy_timeout = 5000")
+            self._local.conn = conn
+            with self._lock:
+                self._connections.append(conn)
+        return conn
+
+    def execute(self, sql: str, *args: Any) -> List[List[Any]]:
+        return [list(row) for row in self._connection().execute(sql, args)]
+
+    def executemany(self, sql: str, args: Iterable[Sequence[Any]]) -> None:
+        self._connection().executemany(sql, args)
+
+    def scalar(self, sql: str, *args: Any) -> Any:
+        row = self._connection().execute(sql, args).fetchone()
+        return row[0] if row else None
+
+    def first(self, sql: str, *args: Any) -> Optional[List[Any]]:
+        row = self._connection().execute(sql, args).fetchone()
+        return list(row) if row else None
+
+    def all(self, sql: str, *args: Any) -> List[List[Any]]:
+        return [list(row) for row in self._connection().execute(sql, args)]
+
+    def close(self) -> None:
+        with self._lock:
+            connections, self._connections = self._connections, []
+        for conn in connections:
+            try:
+                conn.close()
+            except Exception:
+                pass
+        self._local = threading.local()
+
+
+def default_store() -> BookStore:
+    """当前 Anki 配置文件对应的默认存储"""
+    from .paths import library_db_path
+
+    return SidecarStore(library_db_path())
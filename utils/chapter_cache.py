@@ -0,0 +1,174 @@
+"""解码后章节 HTML 的内存缓存。
+
+按占用字节数限制大小的 LRU；阅读器加载一章后，在后台线程中预取前后相邻的章节，
+翻页时即可直接命中缓存，不必再查询数据库与解压。
+"""
+
+from __future__ import annotations
+
+import sys
+import threading
+from collections import OrderedDict
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Callable, Dict, Iterable, Optional, Tuple
+
+# 默认容量：普通章节（压缩前几十到几百 KB）可缓存数十章
+DEFAULT_MAX_BYTES = 32 * 1024 * 1024
+
+ChapterKey = Tuple[int, int]  # (book_id, chapter_index)
+
+
+class ChapterCache:
+    """线程安全的章节内容 LRU 缓存
+
+    loader 负责从存储中读取章节（找不到时返回 None，失败时抛出异常）；
+    后台预取时 loader 在工作线程中调用，存储需支持跨线程读取。
+    """
+
+    def __init__(
+        self,
+        loader: Callable[[int, int], Optional[str]],
+        max_bytes: int = DEFAULT_MAX_BYTES,
+        prefetch: bool = True,
+    ):
+        self._loader = loader
+        self.max_bytes = max_bytes
+        self._entries: "OrderedDict[ChapterKey, str]" = OrderedDict()
+        self._sizes: Dict[ChapterKey, int] = {}
+        self._bytes = 0
+        # 可重入：已完成的预取任务会在 prefetch() 持锁时同步执行完成回调
+        self._lock = threading.RLock()
+        # 正在预取的章节：(任务, 发起时的代数)
+        self._pending: Dict[ChapterKey, Tuple[Future, int]] = {}
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self._prefetch_enabled = prefetch
+        # 递增的代数：失效后丢弃之前发起的预取结果，避免写回过期内容
+        self._generation = 0
+
+        self.hits = 0
+        self.misses = 0
+        self.prefetched = 0
+        self.evictions = 0
+
+    def get(self, book_id: int, chapter_index: int) -> Optional[str]:
+        """读取章节内容，未命中时同步加载并放入缓存"""
+        key = (book_id, chapter_index)
+        with self._lock:
+            content = self._entries.get(key)
+            if content is not None:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return content
+            pending = self._pending.get(key)
+            generation = self._generation
+
+        # 正在预取：等待后台结果，而不是重复读取；
+        # 失效（invalidate_book/clear）之前发起的预取可能读到旧内容，忽略
+        if pending is not None and pending[1] == generation:
+            try:
+                content = pending[0].result()
+            except Exception:
+                content = None
+            if content is not None:
+                with self._lock:
+                    current = generation == self._generation
+                    if current:
+                        self.hits += 1
+                if current:
+                    return content
+
+        with self._lock:
+            self.misses += 1
+            generation = self._generation
+        content = self._loader(book_id, chapter_index)
+        if content is not None:
+            self._store(key, content, generation)
+        return content
+
+    def prefetch(self, book_id: int, chapter_indexes: Iterable[int]) -> None:
+        """在后台线程中预取指定章节（已缓存或正在预取的跳过）"""
+        if not self._prefetch_enabled:
+            return
+        with self._lock:
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="chapter-prefetch")
+            generation = self._generation
+            for chapter_index in chapter_indexes:
+                key = (book_id, chapter_index)
+                if chapter_index < 0 or key in self._entries:
+                    continue
+                pending = self._pending.get(key)
+                if pending is not None and pending[1] == generation:
+                    continue
+                future = self._executor.submit(self._prefetch_one, key, generation)
+                self._pending[key] = (future, generation)
+                future.add_done_callback(lambda f, key=key: self._forget_pending(key, f))
+
+    def _prefetch_one(self, key: ChapterKey, generation: int) -> Optional[str]:
+        try:
+            content = self._loader(*key)
+        except Exception as e:
+            print(f"预取章节失败 {key}: {str(e)}")
+            return None
+        if content is not None and self._store(key, content, generation):
+            with self._lock:
+                self.prefetched += 1
+        return content
+
+    def _forget_pending(self, key: ChapterKey, future: Future) -> None:
+        with self._lock:
+            # 同一章节失效后可能已重新发起预取，只移除本任务
+            pending = self._pending.get(key)
+            if pending is not None and pending[0] is future:
+                del self._pending[key]
+
+    def _store(self, key: ChapterKey, content: str, generation: int) -> bool:
+        size = sys.getsizeof(content)
+        with self._lock:
+            if generation != self._generation or size > self.max_bytes:
+                return False
+            if key in self._entries:
+                self._entries.move_to_end(key)
+                return True
+            self._entries[key] = content
+            self._sizes[key] = size
+            self._bytes += size
+            while self._bytes > self.max_bytes:
+                old_key, _ = self._entries.popitem(last=False)
+                self._bytes -= self._sizes.pop(old_key)
+                self.evictions += 1
+            return True
+
+    def invalidate_book(self, book_id: int) -> None:
+        """丢弃某本书的全部缓存（章节被重写或书籍被删除后调用）"""
+        with self._lock:
+            self._generation += 1
+            for key in [key for key in self._entries if key[0] == book_id]:
+                del self._entries[key]
+                self._bytes -= self._sizes.pop(key)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._generation += 1
+            self._entries.clear()
+            self._sizes.clear()
+            self._bytes = 0
+
+    def shutdown(self) -> None:
+        """停止预取线程（未开始的预取任务直接取消）"""
+        with self._lock:
+            executor, self._executor = self._executor, None
+        if executor is not None:
+            executor.shutdown(wait=False, cancel_futures=True)
+
+    def stats(self) -> Dict[str, int]:
+        """命中统计（诊断用）"""
+        with self._lock:
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "prefetched": self.prefetched,
+                "evictions": self.evictions,
+                "entries": len(self._entries),
+                "bytes": self._bytes,
+            }
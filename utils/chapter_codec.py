@@ -0,0 +1,44 @@
+"""章节正文的存储编码。
+
+清理后的章节 HTML 标记冗余、重复度高，用 zlib 压缩后通常只剩原来的三分之一以下。
+Anki 集合的数据库接口（mw.col.db）只能传递 str/int/float/None，
+因此写入集合时把压缩结果再做 base64 编码后以 TEXT 保存。
+"""
+
+from __future__ import annotations
+
+import base64
+import zlib
+from typing import Union
+
+CODEC_PLAIN = "plain"  # 未压缩的 TEXT（旧数据）
+CODEC_ZLIB = "zlib"  # zlib 压缩后的 BLOB
+CODEC_ZLIB_BASE64 = "zlib+base64"  # zlib 压缩后再 base64 编码的 TEXT
+
+# 压缩等级：6 为 zlib 默认值，再往上体积几乎不变、耗时明显增加
+COMPRESS_LEVEL = 6
+
+
+def encode_content(content: str, codec: str) -> Union[str, bytes]:
+    """按 codec 编码章节内容"""
+    if codec == CODEC_PLAIN:
+        return content
+    data = zlib.compress(content.encode("utf-8"), COMPRESS_LEVEL)
+    if codec == CODEC_ZLIB:
+        return data
+    if codec == CODEC_ZLIB_BASE64:
+        return base64.b64encode(data).decode("ascii")
+    raise ValueError(f"未知的章节编码: {codec}")
+
+
+def decode_content(data: Union[str, bytes, None], codec: str) -> str:
+    """把数据库中的章节内容还原为 HTML"""
+    if data is None:
+        return ""
+    if not codec or codec == CODEC_PLAIN:
+        return data.decode("utf-8") if isinstance(data, bytes) else data
+    if codec == CODEC_ZLIB:
+        return zlib.decompress(data).decode("utf-8")
+    if codec == CODEC_ZLIB_BASE64:
+        return zlib.decompress(base64.b64decode(data)).decode("utf-8")
+    raise ValueError(f"未知的章节编码: {codec}")
@@ -0,0 +1,161 @@
+"""JSON 配置文件的内存缓存。
+
+每个配置文件只在首次使用或文件变化后读取一次，之后直接返回内存中的只读快照：
+查词等高频路径不再访问磁盘。文件变化通过 QFileSystemWatcher 得知
+（同时监视所在目录，以覆盖“写临时文件再替换”的保存方式与文件首次创建）。
+通过本模块保存的配置会立即更新快照；保存本身引起的文件变化通知按
+修改时间与大小识别后忽略，不会丢弃刚写入的快照。
+"""
+
+from __future__ import annotations
+
+import copy
+import json
+import os
+import threading
+from types import MappingProxyType
+from typing import Any, Dict, Mapping, Optional, Tuple
+
+from aqt.qt import QFileSystemWatcher, QObject
+
+from .config_utils import write_json
+from .paths import config_json_path
+
+_EMPTY: Mapping[str, Any] = MappingProxyType({})
+
+# 文件的 (修改时间, 大小)；文件不存在时为 None
+FileSignature = Optional[Tuple[int, int]]
+
+
+def _signature(path: str) -> FileSignature:
+    try:
+        stat = os.stat(path)
+    except OSError:
+        return None
+    return stat.st_mtime_ns, stat.st_size
+
+
+def freeze(value: Any) -> Any:
+    """把 JSON 数据转换为只读结构（dict -> MappingProxyType，list -> tuple）"""
+    if isinstance(value, dict):
+        return MappingProxyType({key: freeze(item) for key, item in value.items()})
+    if isinstance(value, list):
+        return tuple(freeze(item) for item in value)
+    return value
+
+
+def thaw(value: Any) -> Any:
+    """freeze 的逆过程：得到可修改的普通 dict/list"""
+    if isinstance(value, Mapping):
+        return {key: thaw(item) for key, item in value.items()}
+    if isinstance(value, tuple):
+        return [thaw(item) for item in value]
+    return value
+
+
+class ConfigService(QObject):
+    """按路径缓存 JSON 配置的只读快照"""
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self._lock = threading.Lock()
+        self._snapshots: Dict[str, Mapping[str, Any]] = {}
+        # 各快照对应的文件状态：变化通知到来时状态未变（如本服务自己的保存）则保留快照
+        self._signatures: Dict[str, FileSignature] = {}
+        self._watcher = QFileSystemWatcher(self)
+        self._watcher.fileChanged.connect(self._on_file_changed)
+        self._watcher.directoryChanged.connect(self._on_directory_changed)
+
+    def get(self, path: str) -> Mapping[str, Any]:
+        """配置文件的只读快照；文件不存在或无法解析时为空映射"""
+        path = os.path.abspath(path)
+        with self._lock:
+            snapshot = self._snapshots.get(path)
+        if snapshot is not None:
+            return snapshot
+
+        # 先取状态再读取：读取期间文件若被修改，之后的通知会因状态不同而重新读取
+        signature = _signature(path)
+        snapshot = freeze(self._read(path))
+        with self._lock:
+            self._snapshots[path] = snapshot
+            self._signatures[path] = signature
+        self._watch(path)
+        return snapshot
+
+    def copy(self, path: str) -> Dict[str, Any]:
+        """配置的可修改副本（修改后用 save 写回）"""
+        return thaw(self.get(path))
+
+    def save(self, path: str, data: Dict[str, Any]) -> None:
+        """写入配置文件并立即更新快照"""
+        path = os.path.abspath(path)
+        write_json(path, data)
+        snapshot = freeze(copy.deepcopy(data))
+        with self._lock:
+            self._snapshots[path] = snapshot
+            self._signatures[path] = _signature(path)
+        self._watch(path)
+
+    def invalidate(self, path: Optional[str] = None) -> None:
+        """丢弃快照，下次访问时重新读取（不指定路径时丢弃全部）"""
+        with self._lock:
+            if path is None:
+                self._snapshots.clear()
+                self._signatures.clear()
+            else:
+                path = os.path.abspath(path)
+                self._snapshots.pop(path, None)
+                self._signatures.pop(path, None)
+
+    @staticmethod
+    def _read(path: str) -> Dict[str, Any]:
+        if not os.path.exists(path):
+            return {}
+        try:
+            with open(path, "r", encoding="utf-8") as file:
+                data = json.load(file)
+        except Exception as e:
+            print(f"读取配置失败 {path}: {str(e)}")
+            return {}
+        return data if isinstance(data, dict) else {}
+
+    def _watch(self, path: str) -> None:
+        directory = os.path.dirname(path)
+        if os.path.isdir(directory) and directory not in self._watcher.directories():
+            self._watcher.addPath(directory)
+        if os.path.exists(path) and path not in self._watcher.files():
+            self._watcher.addPath(path)
+
+    def _on_file_changed(self, path: str) -> None:
+        path = os.path.abspath(path)
+        with self._lock:
+            unchanged = path in self._signatures and self._signatures[path] == _signature(path)
+        if not unchanged:
+            self.invalidate(path)
+        # 文件被替换后监视会失效，存在时重新加入
+        if os.path.exists(path) and path not in self._watcher.files():
+            self._watcher.addPath(path)
+
+    def _on_directory_changed(self, directory: str) -> None:
+        directory = os.path.abspath(directory)
+        with self._lock:
+            paths = [path for path in self._snapshots if os.path.dirname(path) == directory]
+        for path in paths:
+            self._on_file_changed(path)
+
+
+_service: Optional[ConfigService] = None
+
+
+def config_service() -> ConfigService:
+    """全局配置服务（首次调用时在主线程中创建）"""
+    global _service
+    if _service is None:
+        _service = ConfigService()
+    return _service
+
+
+def app_config() -> Mapping[str, Any]:
+    """config.json 的只读快照"""
+    return config_service().get(config_json_path())
@@ -1,12 +1,40 @@
-from typing import Dict, List, Optional
-from aqt import mw
+from typing import Dict, Iterable, List, Optional
 from aqt.utils import showWarning
 
+from .book_store import BookStore, CollectionStore, default_store
+from .chapter_cache import ChapterCache
+from .chapter_codec import CODEC_PLAIN, CODEC_ZLIB, CODEC_ZLIB_BASE64, decode_content, encode_content
+from .chapter_insert import CHAPTER_INSERT_BATCH_SIZE, insert_chapters
+
+# 当前表结构版本，新增迁移时递增并在 DBHandler._migrations 中登记
+SCHEMA_VERSION = 4
+
+# 书库列表可用的排序字段（键名 -> SQL 表达式；进度按已读章节占比排序）
+LIBRARY_SORT_KEYS = {
+    "title": "b.title COLLATE NOCASE",
+    "author": "b.author COLLATE NOCASE",
+    "language": "b.language",
+    "chapter_count": "b.chapter_count",
+    "progress": "COALESCE((m.chapter_index + 1.0) / MAX(b.chapter_count, 1), 0)",
+    "last_read": "m.created_at",
+    "created_at": "b.created_at",
+}
+
+# 旧版本保存在 Anki 集合中的表（迁移到独立存储后删除）
+_LEGACY_COLLECTION_TABLES = ("epub_bookmarks", "epub_chapters", "epub_books", "epub_schema")
+
+
 class DBHandler:
     """数据库处理类"""
     
-    def __init__(self):
+    def __init__(self, store: Optional[BookStore] = None):
+        self.store = store or default_store()
+        # 新写入章节使用的编码：集合数据库不能保存 bytes，见 chapter_codec
+        self.chapter_codec = CODEC_ZLIB if self.store.supports_blobs else CODEC_ZLIB_BASE64
+        self.chapter_cache = ChapterCache(self.load_chapter_content, prefetch=self.store.thread_safe)
         self._init_tables()
+        if not isinstance(self.store, CollectionStore):
+            self._migrate_from_collection()
         
     def _init_tables(self):
         """初始化数据库表"""
@@ -45,13 +73,274 @@ class DBHandler:
         );
         """
         
+        sql_create_schema = """
+        CREATE TABLE IF NOT EXISTS epub_schema (
+            version INTEGER NOT NULL
+        );
+        """
+        
         try:
-            mw.col.db.execute(sql_create_books)
-            mw.col.db.execute(sql_create_chapters)
-            mw.col.db.execute(sql_create_bookmarks)
+            self.store.execute(sql_create_books)
+            self.store.execute(sql_create_chapters)
+            self.store.execute(sql_create_bookmarks)
+            self.store.execute(sql_create_schema)
+            self._migrate()
         except Exception as e:
             showWarning(f"初始化数据库失败: {str(e)}")
             
+    def close(self) -> None:
+        """关闭存储连接（之后再访问会自动重新连接）"""
+        self.chapter_cache.shutdown()
+        print(f"章节缓存统计: {self.chapter_cache.stats()}")
+        self.store.close()
+            
+    def _schema_version(self) -> int:
+        return self.store.scalar("SELECT MAX(version) FROM epub_schema") or 0
+        
+    def _migrations(self):
+        """按版本排列的迁移步骤"""
+        return [
+            (1, self._migrate_v1_indexes),
+            (2, self._migrate_v2_compress_chapters),
+            (3, self._migrate_v3_chapter_count),
+            (4, self._migrate_v4_bookmark_segment),
+        ]
+        
+    def _migrate(self) -> None:
+        """把已有的表结构逐版本升级到 SCHEMA_VERSION，每一步在单独的事务中完成"""
+        version = self._schema_version()
+        for target, migration in self._migrations():
+            if version >= target:
+                continue
+            print(f"升级数据库结构: v{version} -> v{target}")
+            self.store.execute("BEGIN")
+            try:
+                migration()
+                self.store.execute("DELETE FROM epub_schema")
+                self.store.execute("INSERT INTO epub_schema (version) VALUES (?)", target)
+                self.store.execute("COMMIT")
+            except Exception:
+                self.store.execute("ROLLBACK")
+                raise
+            version = target
+            
+    def _migrate_v1_indexes(self) -> None:
+        """v1：为按书籍/章节的查询建立索引
+        
+        旧版本没有唯一约束，建唯一索引前先清理重复数据：
+        同一路径的书只保留最早导入的一本，同一章节与书签只保留最后写入的一条。
+        """
+        self.store.execute(
+            """
+            DELETE FROM epub_chapters WHERE book_id IN (
+                SELECT id FROM epub_books
+                WHERE id NOT IN (SELECT MIN(id) FROM epub_books GROUP BY file_path)
+            )
+            """
+        )
+        self.store.execute(
+            """
+            DELETE FROM epub_bookmarks WHERE book_id IN (
+                SELECT id FROM epub_books
+                WHERE id NOT IN (SELECT MIN(id) FROM epub_books GROUP BY file_path)
+            )
+            """
+        )
+        self.store.execute(
+            "DELETE FROM epub_books WHERE id NOT IN (SELECT MIN(id) FROM epub_books GROUP BY file_path)"
+        )
+        self.store.execute(
+            """
+            DELETE FROM epub_chapters WHERE id NOT IN (
+                SELECT MAX(id) FROM epub_chapters GROUP BY book_id, chapter_index
+            )
+            """
+        )
+        self.store.execute(
+            "DELETE FROM epub_bookmarks WHERE id NOT IN (SELECT MAX(id) FROM epub_bookmarks GROUP BY book_id)"
+        )
+        
+        self.store.execute(
+            """
+            CREATE UNIQUE INDEX IF NOT EXISTS idx_epub_chapters_book_chapter
+            ON epub_chapters (book_id, chapter_index)
+            """
+        )
+        self.store.execute(
+            """
+            CREATE UNIQUE INDEX IF NOT EXISTS idx_epub_bookmarks_book
+            ON epub_bookmarks (book_id)
+            """
+        )
+        self.store.execute(
+            """
+            CREATE UNIQUE INDEX IF NOT EXISTS idx_epub_books_file_path
+            ON epub_books (file_path)
+            """
+        )
+            
+    def _migrate_v2_compress_chapters(self) -> None:
+        """v2：章节正文改为压缩存储，并压缩已有的章节
+        
+        集合数据库的空间要在 Anki“检查数据库”（VACUUM）之后才会真正释放。
+        """
+        self.store.execute(
+            f"ALTER TABLE epub_chapters ADD COLUMN codec TEXT NOT NULL DEFAULT '{CODEC_PLAIN}'"
+        )
+        last_id = 0
+        while True:
+            rows = self.store.all(
+                """
+                SELECT id, content FROM epub_chapters
+                WHERE codec = ? AND id > ?
+                ORDER BY id
+                LIMIT ?
+                """,
+                CODEC_PLAIN,
+                last_id,
+                CHAPTER_INSERT_BATCH_SIZE,
+            )
+            if not rows:
+                break
+            self.store.executemany(
+                "UPDATE epub_chapters SET content = ?, codec = ? WHERE id = ?",
+                [(encode_content(content, self.chapter_codec), self.chapter_codec, row_id) for row_id, content in rows],
+            )
+            last_id = rows[-1][0]
+            
+    def _migrate_v3_chapter_count(self) -> None:
+        """v3：在书籍表中维护章节数，书库列表不必再逐本统计章节；按添加时间排序的索引"""
+        self.store.execute(
+            "ALTER TABLE epub_books ADD COLUMN chapter_count INTEGER NOT NULL DEFAULT 0"
+        )
+        self.store.execute(
+            """
+            UPDATE epub_books SET chapter_count = (
+                SELECT COUNT(*) FROM epub_chapters WHERE epub_chapters.book_id = epub_books.id
+            )
+            """
+        )
+        self.store.execute(
+            "CREATE INDEX IF NOT EXISTS idx_epub_books_created_at ON epub_books (created_at)"
+        )
+            
+    def _migrate_v4_bookmark_segment(self) -> None:
+        """v4：进度中记录分段索引；分段显示的长章节中，position 是相对该段开头的偏移"""
+        self.store.execute(
+            "ALTER TABLE epub_bookmarks ADD COLUMN segment_index INTEGER NOT NULL DEFAULT 0"
+        )
+            
+    def _migrate_from_collection(self) -> None:
+        """把旧版本保存在 Anki 集合中的书籍、章节与进度搬到当前存储，然后删除集合中的表
+        
+        全部数据在一个事务中写入当前存储，提交后才删除集合中的表；
+        中途失败时集合中的数据保持不变，下次启动会重新迁移（已迁移的行按主键忽略）。
+        """
+        legacy = CollectionStore()
+        try:
+            if not legacy.has_table("epub_books"):
+                return
+        except Exception as e:
+            print(f"检查集合中的旧书籍数据失败: {str(e)}")
+            return
+        
+        print("迁移集合中的书籍数据到独立存储...")
+        try:
+            self.store.execute("BEGIN")
+            # 同一路径的书只保留最早导入的一本（与 v1 迁移一致）
+            for row in legacy.all(
+                """
+                SELECT id, title, author, file_path, language, identifier, description, created_at
+                FROM epub_books ORDER BY id
+                """
+            ):
+                self.store.execute(
+                    """
+                    INSERT OR IGNORE INTO epub_books
+                        (id, title, author, file_path, language, identifier, description, created_at)
+                    VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+                    """,
+                    *row,
+                )
+            book_ids = {row[0] for row in self.store.all("SELECT id FROM epub_books")}
+
+            # 同一章节与书签只保留最后写入的一条：按 id 倒序插入，先到者保留
+            has_codec = any(
+                column[1] == "codec" for column in legacy.all("PRAGMA table_info(epub_chapters)")
+            )
+            codec_column = "codec" if has_codec else f"'{CODEC_PLAIN}'"
+            last_id = None
+            while True:
+                rows = legacy.all(
+                    f"""
+                    SELECT id, book_id, chapter_index, title, content, {codec_column}
+                    FROM epub_chapters
+                    WHERE ? IS NULL OR id < ?
+                    ORDER BY id DESC
+                    LIMIT ?
+                    """,
+                    last_id,
+                    last_id,
+                    CHAPTER_INSERT_BATCH_SIZE,
+                )
+                if not rows:
+                    break
+                self.store.executemany(
+                    """
+                    INSERT OR IGNORE INTO epub_chapters (book_id, chapter_index, title, content, codec)
+                    VALUES (?, ?, ?, ?, ?)
+                    """,
+                    [
+                        (
+                            book_id,
+                            chapter_index,
+                            title,
+                            encode_content(decode_content(content, codec), self.chapter_codec),
+                            self.chapter_codec,
+                        )
+                        for _, book_id, chapter_index, title, content, codec in rows
+                        if book_id in book_ids
+                    ],
+                )
+                last_id = rows[-1][0]
+            self.store.execute(
+                """
+                UPDATE epub_books SET chapter_count = (
+                    SELECT COUNT(*) FROM epub_chapters WHERE epub_chapters.book_id = epub_books.id
+                )
+                """
+            )
+
+            for book_id, chapter_index, position, created_at in legacy.all(
+                "SELECT book_id, chapter_index, position, created_at FROM epub_bookmarks ORDER BY id DESC"
+            ):
+                if book_id in book_ids:
+                    self.store.execute(
+                        """
+                        INSERT OR IGNORE INTO epub_bookmarks (book_id, chapter_index, position, created_at)
+                        VALUES (?, ?, ?, ?)
+                        """,
+                        book_id,
+                        chapter_index,
+                        position,
+                        created_at,
+                    )
+            self.store.execute("COMMIT")
+        except Exception as e:
+            self.store.execute("ROLLBACK")
+            showWarning(f"迁移集合中的书籍数据失败: {str(e)}")
+            return
+
+        try:
+            legacy.execute("BEGIN")
+            for table in _LEGACY_COLLECTION_TABLES:
+                legacy.execute(f"DROP TABLE IF EXISTS {table}")
+            legacy.execute("COMMIT")
+            print(f"书籍数据迁移完成，共 {len(book_ids)} 本书")
+        except Exception as e:
+            legacy.execute("ROLLBACK")
+            print(f"删除集合中的旧书籍表失败: {str(e)}")
+
     def add_book(self, metadata: Dict, file_path: str) -> Optional[int]:
         """添加书籍
         
@@ -64,19 +353,19 @@ class DBHandler:
         """
         try:
             # 开始事务
-            mw.col.db.execute("BEGIN")
+            self.store.execute("BEGIN")
             
             # 检查文件是否已存在
-            existing = mw.col.db.scalar(
+            existing = self.store.scalar(
                 "SELECT id FROM epub_books WHERE file_path = ?",
                 file_path
             )
             if existing:
-                mw.col.db.execute("ROLLBACK")
+                self.store.execute("ROLLBACK")
                 return existing
             
             # 添加新书籍
-            book_id = mw.col.db.scalar(
+            book_id = self.store.scalar(
                 """
                 INSERT INTO epub_books (title, author, file_path, language, identifier, description)
                 VALUES (?, ?, ?, ?, ?, ?)
@@ -91,19 +380,19 @@ class DBHandler:
             )
             
             # 提交事务
-            mw.col.db.execute("COMMIT")
+            self.store.execute("COMMIT")
             return book_id
             
         except Exception as e:
             # 回滚事务
-            mw.col.db.execute("ROLLBACK")
+            self.store.execute("ROLLBACK")
             showWarning(f"添加书籍失败: {str(e)}")
             return None
 
     def get_book_id_by_path(self, file_path: str) -> Optional[int]:
         """根据文件路径获取书籍ID"""
         try:
-            return mw.col.db.scalar(
+            return self.store.scalar(
                 "SELECT id FROM epub_books WHERE file_path = ?",
                 file_path,
             )
@@ -111,84 +400,112 @@ class DBHandler:
             showWarning(f"获取书籍ID失败: {str(e)}")
             return None
             
-    def add_chapters(self, book_id: int, chapters: List[Dict]) -> bool:
+    def add_chapters(self, book_id: int, chapters: Iterable[Dict]) -> bool:
         """添加章节
         
         Args:
             book_id: 书籍ID
-            chapters: 章节列表
+            chapters: 章节列表或生成器（如 EPUBHandler.iter_chapters()）
             
         Returns:
             bool: 是否成功
         """
         try:
-            print(f"开始保存章节，书籍ID: {book_id}, 章节数量: {len(chapters)}")
-            mw.col.db.execute("BEGIN")
+            print(f"开始保存章节，书籍ID: {book_id}")
+            self.store.execute("BEGIN")
             
             # 先删除已存在的章节
-            mw.col.db.execute(
+            self.store.execute(
                 "DELETE FROM epub_chapters WHERE book_id = ?",
                 book_id
             )
             
-            # 添加新章节
-            for index, chapter in enumerate(chapters):
-                print(f"保存章节 {index}: {chapter['name']}, 内容长度: {len(chapter['content'])}")
-                mw.col.db.execute(
-                    """
-                    INSERT INTO epub_chapters (book_id, chapter_index, title, content)
-                    VALUES (?, ?, ?, ?)
-                    """,
-                    book_id,
-                    index,
-                    chapter['name'],
-                    chapter['content']
-                )
+            # 批量添加新章节
+            count = self._insert_chapters(book_id, 0, chapters)
+            self.store.execute(
+                "UPDATE epub_books SET chapter_count = ? WHERE id = ?",
+                count,
+                book_id,
+            )
             
-            mw.col.db.execute("COMMIT")
-            print(f"章节保存完成，共保存 {len(chapters)} 个章节")
+            self.store.execute("COMMIT")
+            self.chapter_cache.invalidate_book(book_id)
+            print(f"章节保存完成，共保存 {count} 个章节")
             return True
             
         except Exception as e:
-            mw.col.db.execute("ROLLBACK")
+            self.store.execute("ROLLBACK")
             print(f"添加章节失败: {str(e)}")
             return False
             
-    def update_bookmark(self, book_id: int, chapter_index: int, position: int) -> bool:
+    def _insert_chapters(
+        self,
+        book_id: int,
+        start_index: int,
+        chapters: Iterable[Dict],
+        batch_size: int = CHAPTER_INSERT_BATCH_SIZE,
+    ) -> int:
+        """按批用 executemany 插入章节（调用方负责事务，见 chapter_insert.insert_chapters）"""
+        return insert_chapters(self.store, book_id, start_index, chapters, self.chapter_codec, batch_size)
+
+    def append_chapters(self, book_id: int, start_index: int, chapters: List[Dict]) -> bool:
+        """追加一批章节并立即提交（用于后台导入时边解析边写入）
+        
+        Args:
+            book_id: 书籍ID
+            start_index: 本批第一个章节的索引
+            chapters: 章节列表
+            
+        Returns:
+            bool: 是否成功
+        """
+        try:
+            self.store.execute("BEGIN")
+            count = self._insert_chapters(book_id, start_index, chapters)
+            self.store.execute(
+                "UPDATE epub_books SET chapter_count = MAX(chapter_count, ?) WHERE id = ?",
+                start_index + count,
+                book_id,
+            )
+            self.store.execute("COMMIT")
+            return True
+            
+        except Exception as e:
+            self.store.execute("ROLLBACK")
+            print(f"追加章节失败: {str(e)}")
+            return False
+            
+    def update_bookmark(self, book_id: int, chapter_index: int, position: int, segment_index: int = 0) -> bool:
         """更新阅读进度
         
         Args:
             book_id: 书籍ID
             chapter_index: 章节索引
             position: 阅读位置
+            segment_index: 分段显示的长章节中所在的段（position 相对该段开头）
             
         Returns:
             bool: 是否成功
         """
         try:
-            # 该表目前未定义唯一约束，直接 INSERT 会导致多条记录堆积。
-            # 这里保持“每本书仅保存一条最后进度”的语义。
-            mw.col.db.execute("BEGIN")
-            mw.col.db.execute(
-                "DELETE FROM epub_bookmarks WHERE book_id = ?",
-                book_id,
-            )
-            mw.col.db.execute(
+            # book_id 上有唯一索引，每本书仅保存一条最后进度
+            self.store.execute(
                 """
-                INSERT INTO epub_bookmarks (book_id, chapter_index, position)
-                VALUES (?, ?, ?)
+                INSERT INTO epub_bookmarks (book_id, chapter_index, position, segment_index)
+                VALUES (?, ?, ?, ?)
+                ON CONFLICT (book_id) DO UPDATE SET
+                    chapter_index = excluded.chapter_index,
+                    position = excluded.position,
+                    segment_index = excluded.segment_index,
+                    created_at = CURRENT_TIMESTAMP
                 """,
                 book_id,
                 chapter_index,
                 position,
+                segment_index,
             )
-            mw.col.db.execute("COMMIT")
             return True
         except Exception as e:
-            try:
-                mw.col.db.execute("ROLLBACK")
-            except Exception:
-                pass
             showWarning(f"更新阅读进度失败: {str(e)}")
             return False
             
@@ -199,7 +516,7 @@ class DBHandler:
             List[Dict]: 书籍列表
         """
         try:
-            return mw.col.db.all(
+            return self.store.all(
                 """
                 SELECT id, title, author, file_path, language, created_at
                 FROM epub_books
@@ -210,6 +527,83 @@ class DBHandler:
             showWarning(f"获取书籍列表失败: {str(e)}")
             return []
             
+    def get_library_summary(
+        self,
+        filter_text: str = "",
+        sort_key: str = "created_at",
+        descending: bool = True,
+        offset: int = 0,
+        limit: Optional[int] = None,
+    ) -> List[Dict]:
+        """一次查询取得书库列表所需的全部信息（可分页、排序与筛选）
+        
+        Args:
+            filter_text: 按书名或作者筛选（包含即匹配，不区分大小写）
+            sort_key: 排序字段，见 LIBRARY_SORT_KEYS
+            descending: 是否倒序
+            offset: 分页起点
+            limit: 分页大小，None 表示全部
+            
+        Returns:
+            List[Dict]: 书籍列表，每本包含 id、title、author、language、
+            chapter_count、progress（无进度时为None）、last_read 与 created_at
+        """
+        order = LIBRARY_SORT_KEYS.get(sort_key, LIBRARY_SORT_KEYS["created_at"])
+        direction = "DESC" if descending else "ASC"
+        where, args = self._library_filter(filter_text)
+        try:
+            rows = self.store.all(
+                f"""
+                SELECT b.id, b.title, b.author, b.language, b.chapter_count, b.created_at,
+                       m.chapter_index, m.position, m.created_at
+                FROM epub_books AS b
+                LEFT JOIN epub_bookmarks AS m ON m.book_id = b.id
+                {where}
+                ORDER BY {order} {direction}, b.id {direction}
+                LIMIT ? OFFSET ?
+                """,
+                *args,
+                -1 if limit is None else limit,
+                offset,
+            )
+        except Exception as e:
+            showWarning(f"获取书籍列表失败: {str(e)}")
+            return []
+        
+        books = []
+        for book_id, title, author, language, chapter_count, created_at, chapter_index, position, last_read in rows:
+            books.append({
+                'id': book_id,
+                'title': title,
+                'author': author,
+                'language': language,
+                'chapter_count': chapter_count,
+                'progress': None if chapter_index is None else {
+                    'chapter_index': chapter_index,
+                    'position': position,
+                },
+                'last_read': last_read,
+                'created_at': created_at,
+            })
+        return books
+        
+    def count_books(self, filter_text: str = "") -> int:
+        """书籍数量（筛选条件同 get_library_summary）"""
+        where, args = self._library_filter(filter_text)
+        try:
+            return self.store.scalar(f"SELECT COUNT(*) FROM epub_books AS b {where}", *args) or 0
+        except Exception as e:
+            showWarning(f"获取书籍数量失败: {str(e)}")
+            return 0
+            
+    @staticmethod
+    def _library_filter(filter_text: str):
+        filter_text = (filter_text or "").strip()
+        if not filter_text:
+            return "", []
+        pattern = "%" + filter_text.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_") + "%"
+        return "WHERE b.title LIKE ? ESCAPE '\\' OR b.author LIKE ? ESCAPE '\\'", [pattern, pattern]
+            
     def get_book_progress(self, book_id: int) -> Optional[Dict]:
         """获取阅读进度
         
@@ -220,20 +614,19 @@ class DBHandler:
             Optional[Dict]: 阅读进度
         """
         try:
-            result = mw.col.db.first(
+            result = self.store.first(
                 """
-                SELECT chapter_index, position
+                SELECT chapter_index, position, segment_index
                 FROM epub_bookmarks
                 WHERE book_id = ?
-                ORDER BY created_at DESC
-                LIMIT 1
                 """,
                 book_id
             )
             if result:
                 return {
                     'chapter_index': result[0],
-                    'position': result[1]
+                    'position': result[1],
+                    'segment_index': result[2]
                 }
             return None
         except Exception as e:
@@ -241,28 +634,35 @@ class DBHandler:
             return None
             
     def get_chapter_content(self, book_id: int, chapter_index: int) -> Optional[str]:
-        """获取章节内容"""
+        """获取章节内容（优先从章节缓存读取）"""
         try:
-            print(f"获取章节内容，书籍ID: {book_id}, 章节索引: {chapter_index}")
-            result = mw.col.db.first(
-                """
-                SELECT content, title
-                FROM epub_chapters
-                WHERE book_id = ? AND chapter_index = ?
-                """,
-                book_id,
-                chapter_index
-            )
-            if result:
-                print(f"找到章节: {result[1]}, 内容长度: {len(result[0])}")
-                return result[0]
-            else:
-                print("未找到章节内容")
-                return None
+            content = self.chapter_cache.get(book_id, chapter_index)
+            if content is None:
+                print(f"未找到章节内容，书籍ID: {book_id}, 章节索引: {chapter_index}")
+            return content
         except Exception as e:
             showWarning(f"获取章节内容失败: {str(e)}")
             return None
             
+    def load_chapter_content(self, book_id: int, chapter_index: int) -> Optional[str]:
+        """从存储中读取并解码章节内容（不经过缓存；可在后台线程中调用，失败时抛出异常）"""
+        result = self.store.first(
+            """
+            SELECT content, codec
+            FROM epub_chapters
+            WHERE book_id = ? AND chapter_index = ?
+            """,
+            book_id,
+            chapter_index
+        )
+        if not result:
+            return None
+        return decode_content(result[0], result[1])
+        
+    def prefetch_chapters(self, book_id: int, chapter_indexes: Iterable[int]) -> None:
+        """在后台预取章节到缓存（存储不支持跨线程读取时不预取）"""
+        self.chapter_cache.prefetch(book_id, chapter_indexes)
+            
     def get_chapter_list(self, book_id: int) -> List[Dict]:
         """获取章节列表
         
@@ -274,7 +674,7 @@ class DBHandler:
         """
         try:
             print(f"获取章节列表，书籍ID: {book_id}")
-            results = mw.col.db.all(
+            results = self.store.all(
                 """
                 SELECT chapter_index, title
                 FROM epub_chapters
@@ -309,31 +709,33 @@ class DBHandler:
         """
         try:
             print(f"删除书籍，ID: {book_id}")
-            mw.col.db.execute("BEGIN")
+            self.store.execute("BEGIN")
             
             # 删除书签
-            mw.col.db.execute(
+            self.store.execute(
                 "DELETE FROM epub_bookmarks WHERE book_id = ?",
                 book_id
             )
             
             # 删除章节
-            mw.col.db.execute(
+            self.store.execute(
                 "DELETE FROM epub_chapters WHERE book_id = ?",
                 book_id
             )
             
             # 删除书籍
-            mw.col.db.execute(
+            self.store.execute(
                 "DELETE FROM epub_books WHERE id = ?",
                 book_id
             )
             
-            mw.col.db.execute("COMMIT")
+            self.store.execute("COMMIT")
+            self.chapter_cache.invalidate_book(book_id)
             print("书籍删除成功")
             return True
             
         except Exception as e:
-            mw.col.db.execute("ROLLBACK")
+            self.store.execute("ROLLBACK")
             showWarning(f"删除书籍失败: {str(e)}")
             return False 
+
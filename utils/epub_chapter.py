@@ -0,0 +1,313 @@
+"""单个章节的解析与清理。
+
+本模块不依赖 aqt/mw，可在导入线程中调用，也可以脱离 Anki 单独运行（见文件末尾）。
+"""
+
+from __future__ import annotations
+
+import os
+import re
+from html import escape
+from typing import Dict, List, Optional
+
+from .html_parser_backend import DEFAULT_BACKEND, FALLBACK_BACKEND
+from .vendor_path import vendored_sys_path
+
+with vendored_sys_path():
+    from bs4 import BeautifulSoup
+
+_WORD_RE = re.compile(r"\w+(?:['’-]\w+)*")
+# XML 声明对显示无意义，且各后端处理方式不同（保留为指令 / 转成注释），解析前去掉
+_XML_DECL_RE = re.compile(r"^\s*<\?xml[^>]*\?>")
+# HTML5 的空元素：lxml（libxml2）不认识其中的 wbr/source/track 等，会把其后的兄弟节点包进去
+_VOID_ELEMENTS = (
+    'area', 'base', 'br', 'col', 'embed', 'hr', 'img', 'input',
+    'link', 'meta', 'param', 'source', 'track', 'wbr',
+)
+
+CHAPTER_STYLE = """
+                body {
+                    font-family: Arial, sans-serif;
+                    line-height: 1.6;
+                    margin: 1em;
+                    color: #333;
+                }
+                p {
+                    margin: 0.8em 0;
+                }
+                h1, h2, h3, h4, h5, h6 {
+                    margin: 1em 0 0.5em;
+                    color: #222;
+                }
+                img {
+                    max-width: 100%;
+                    height: auto;
+                }
+            """
+
+
+def title_from_href(href: str) -> str:
+    """根据文件名生成章节标题"""
+    chapter_title = os.path.splitext(os.path.basename(href))[0]
+    # 美化文件名（去除数字前缀等）
+    chapter_title = chapter_title.replace('_', ' ').replace('-', ' ')
+    return ' '.join(word.capitalize() for word in chapter_title.split())
+
+
+def _find_title(soup, href: str) -> str:
+    # 尝试从h1-h6标签获取标题
+    for h in soup.find_all(['h1', 'h2', 'h3', 'h4', 'h5', 'h6']):
+        if h.text.strip():
+            return h.text.strip()
+
+    # 如果没有找到标题，尝试从title标签获取
+    title_tag = soup.find('title')
+    if title_tag and title_tag.text.strip():
+        return title_tag.text.strip()
+
+    # 如果还是没有找到标题，使用文件名
+    return title_from_href(href)
+
+
+def _find_images(soup) -> List[str]:
+    images = []
+    for img in soup.find_all(['img', 'image']):
+        src = img.get('src') or img.get('xlink:href') or img.get('href')
+        if src:
+            images.append(src)
+    return images
+
+
+def _clean_soup(soup) -> None:
+    """在已解析的文档树上原地清理：只移除script/style（基本样式在输出时注入，见 _serialize）"""
+    for script in soup(["script", "style"]):
+        script.decompose()
+
+
+def _unnest_void_elements(soup) -> None:
+    """把被包进空元素的节点移回原处（排在空元素之后），使各后端得到相同的文档树"""
+    for tag in soup.find_all(_VOID_ELEMENTS):
+        for child in reversed(list(tag.contents)):
+            tag.insert_after(child.extract())
+
+
+def _start_tag(name: str, tag) -> str:
+    """name 的开始标签，带上原文档中该元素的属性（lang、dir、class 等）"""
+    parts = [name]
+    for key, value in (tag.attrs if tag is not None else {}).items():
+        if isinstance(value, list):  # class 等多值属性
+            value = " ".join(value)
+        parts.append(f'{key}="{escape(value)}"')
+    return f"<{' '.join(parts)}>"
+
+
+def _body_contents(soup) -> str:
+    body = soup.body or soup
+    return body.decode_contents().strip()
+
+
+def _serialize(soup, contents: str) -> str:
+    """输出清理后的章节
+
+    只保存 body 内的内容（contents），套上固定的 head（注入的样式）：各后端对 DOCTYPE、
+    html/head 之间的换行和空行的输出不同，body 之外的部分也不参与显示。
+    html 与 body 的属性保留，从右到左书写、标注语言的书籍才能正确显示。
+    """
+    return (
+        f"{_start_tag('html', soup.html)}<head><style>{CHAPTER_STYLE}</style></head>"
+        f"{_start_tag('body', soup.body)}{contents}</body></html>"
+    )
+
+
+def clean_html(html_content: str, parser: str = DEFAULT_BACKEND) -> str:
+    """清理HTML内容，保留格式
+
+    Args:
+        html_content: HTML内容
+        parser: BeautifulSoup 解析后端（见 html_parser_backend）
+
+    Returns:
+        str: 清理后的HTML
+    """
+    try:
+        soup = BeautifulSoup(html_content, parser)
+        _unnest_void_elements(soup)
+        _clean_soup(soup)
+        return _serialize(soup, _body_contents(soup))
+
+    except Exception as e:
+        print(f"清理HTML内容失败: {str(e)}")
+        return html_content  # 如果处理失败，返回原始内容
+
+
+def process_chapter(raw: bytes, href: str, parser: str = DEFAULT_BACKEND) -> Optional[Dict]:
+    """解析单个章节：一次解析得到标题、清理后的HTML及其它派生数据
+
+    Args:
+        raw: 章节文件的原始字节
+        href: 章节在 manifest 中的 href（用于生成后备标题）
+        parser: BeautifulSoup 解析后端（见 html_parser_backend）
+
+    Returns:
+        Optional[Dict]: name/content/word_count/images，内容为空时返回None
+    """
+    chapter_content = _XML_DECL_RE.sub("", raw.decode('utf-8'), count=1)
+    soup = BeautifulSoup(chapter_content, parser)
+    _unnest_void_elements(soup)
+
+    chapter_title = _find_title(soup, href)
+    images = _find_images(soup)
+
+    try:
+        _clean_soup(soup)
+        contents = _body_contents(soup)
+        # body 中什么都没有（只有图片的页面不算空）
+        if not contents:
+            return None
+        cleaned_content = _serialize(soup, contents)
+    except Exception as e:
+        print(f"清理HTML内容失败: {str(e)}")
+        return _process_unclean(chapter_content, chapter_title, images)
+
+    body = soup.body or soup
+    return {
+        'name': chapter_title,
+        'content': cleaned_content,
+        'word_count': len(_WORD_RE.findall(body.get_text(' '))),
+        'images': images,
+    }
+
+
+def _process_unclean(chapter_content: str, chapter_title: str, images: List[str]) -> Optional[Dict]:
+    # 与 clean_html 一致：清理失败时保留原始内容
+    if not chapter_content.strip():
+        return None
+    return {
+        'name': chapter_title,
+        'content': chapter_content,
+        'word_count': 0,
+        'images': images,
+    }
+
+
+def _read_chapters(paths: List[str]) -> List[tuple]:
+    """读取 EPUB 中的全部 (X)HTML 文件，或直接给出的 HTML 文件"""
+    import zipfile
+
+    chapters = []
+    for path in paths:
+        if zipfile.is_zipfile(path):
+            with zipfile.ZipFile(path) as book:
+                for name in book.namelist():
+                    if name.lower().endswith(('.xhtml', '.html', '.htm')):
+                        chapters.append((f"{path}:{name}", book.read(name)))
+        else:
+            with open(path, 'rb') as file:
+                chapters.append((path, file.read()))
+    return chapters
+
+
+def _parity_check(chapters: List[tuple], backends: List[str]) -> int:
+    """用各后端处理同一组章节，逐章对比输出；返回不一致的章节数"""
+    import difflib
+
+    reference, others = backends[0], backends[1:]
+    mismatches = 0
+    for name, raw in chapters:
+        expected = process_chapter(raw, name, reference)
+        for backend in others:
+            actual = process_chapter(raw, name, backend)
+            if actual == expected:
+                continue
+            mismatches += 1
+            print(f"不一致: {name}（{reference} / {backend}）")
+            if expected and actual:
+                for field in ('name', 'word_count', 'images'):
+                    if expected[field] != actual[field]:
+                        print(f"  {field}: {expected[field]!r} / {actual[field]!r}")
+                diff = difflib.unified_diff(
+                    expected['content'].splitlines(), actual['content'].splitlines(),
+                    reference, backend, lineterm="", n=0,
+                )
+                for line in list(diff)[:20]:
+                    print(f"  {line}")
+    print(f"{len(chapters)} 个章节，后端 {', '.join(backends)}：{mismatches} 处不一致")
+    return mismatches
+
+
+def _baseline_process_chapter(raw: bytes, href: str, parser: str) -> Optional[Dict]:
+    """原先的章节处理（取标题解析一次、清理时再解析一次），仅供基准对比"""
+    chapter_content = raw.decode('utf-8')
+    chapter_title = _find_title(BeautifulSoup(chapter_content, parser), href)
+    soup = BeautifulSoup(chapter_content, parser)
+    _clean_soup(soup)
+    return {'name': chapter_title, 'content': str(soup)}
+
+
+def _sample_chapters(count: int = 20) -> List[tuple]:
+    paragraph = (
+        "<p>It was the best of times, it was the <em>worst</em> of times, "
+        "it was the age of wisdom, it was the age of foolishness.</p>\n"
+    )
+    chapters = []
+    for index in range(count):
+        body = f"<h1>Chapter {index + 1}</h1>\n" + paragraph * 150 + '<p><img src="images/figure.png"/></p>'
+        html = (
+            '<?xml version="1.0" encoding="utf-8"?>\n<!DOCTYPE html>\n'
+            '<html xmlns="http://www.w3.org/1999/xhtml"><head><title>Sample</title>'
+            '<link rel="stylesheet" href="style.css"/></head>\n'
+            f"<body>\n{body}\n</body></html>"
+        )
+        chapters.append((f"chapter{index + 1}.xhtml", html.encode('utf-8')))
+    return chapters
+
+
+def _benchmark(chapters: List[tuple], backends: List[str], repeat: int = 3) -> None:
+    import time
+
+    def best_of(process, parser: str) -> float:
+        best = float("inf")
+        for _ in range(repeat):
+            started = time.perf_counter()
+            for name, raw in chapters:
+                process(raw, name, parser)
+            best = min(best, time.perf_counter() - started)
+        return best
+
+    for name, raw in chapters:
+        expected = _baseline_process_chapter(raw, name, FALLBACK_BACKEND)['name']
+        assert process_chapter(raw, name, FALLBACK_BACKEND)['name'] == expected, f"{name}: 标题与原实现不一致"
+
+    total = sum(len(raw) for _, raw in chapters)
+    print(f"{len(chapters)} 个章节，共 {total} 字节，每章平均耗时：")
+    baseline = best_of(_baseline_process_chapter, FALLBACK_BACKEND)
+    print(f"  原实现（{FALLBACK_BACKEND}，解析两次）: {baseline * 1000 / len(chapters):.2f} ms")
+    for backend in backends:
+        elapsed = best_of(process_chapter, backend)
+        print(f"  新实现（{backend}，解析一次）: {elapsed * 1000 / len(chapters):.2f} ms")
+
+
+if __name__ == "__main__":
+    # 需在插件目录下以模块方式运行：
+    #   python -m utils.epub_chapter [书.epub 章节.xhtml ...]             对比各后端的输出
+    #   python -m utils.epub_chapter --benchmark [书.epub 章节.xhtml ...] 对比新旧处理耗时
+    # 不指定文件时使用生成的示例章节。
+    import argparse
+    import sys
+
+    from .html_parser_backend import available_backends
+
+    arg_parser = argparse.ArgumentParser(description="对比各 HTML 解析后端处理章节的结果，或新旧处理方式的耗时")
+    arg_parser.add_argument("paths", nargs="*", help="EPUB 文件或 (X)HTML 章节文件")
+    arg_parser.add_argument("--benchmark", action="store_true", help="对比新旧章节处理的耗时")
+    arg_parser.add_argument("--repeat", type=int, default=3)
+    args = arg_parser.parse_args()
+
+    chapters = _read_chapters(args.paths) if args.paths else _sample_chapters()
+    backends = available_backends()
+    if args.benchmark:
+        _benchmark(chapters, backends, args.repeat)
+        sys.exit(0)
+    if len(backends) < 2:
+        sys.exit(f"只有一个可用的解析后端（{', '.join(backends)}），无法对比")
+    sys.exit(1 if _parity_check(chapters, backends) else 0)
@@ -0,0 +1,164 @@
+from __future__ import annotations
+
+import posixpath
+import urllib.parse
+import xml.etree.ElementTree as ET
+import zipfile
+from dataclasses import dataclass
+from typing import Dict, List, Optional
+
+CONTAINER_NS = "urn:oasis:names:tc:opendocument:xmlns:container"
+OPF_NS = "http://www.idpf.org/2007/opf"
+DC_NS = "http://purl.org/dc/elements/1.1/"
+NCX_NS = "http://www.daisy.org/z3986/2005/ncx/"
+XHTML_NS = "http://www.w3.org/1999/xhtml"
+OPS_NS = "http://www.idpf.org/2007/ops"
+
+DEFAULT_METADATA = {
+    "title": "未知标题",
+    "creator": "未知作者",
+    "language": "zh",
+    "identifier": "",
+    "description": "",
+}
+
+
+@dataclass(frozen=True)
+class ManifestItem:
+    id: str
+    href: str
+    path: str  # 在 zip 内的完整路径
+    media_type: str
+    properties: str
+
+
+def _normalize_path(base_dir: str, href: str) -> str:
+    href = urllib.parse.unquote(href.split("#", 1)[0]).replace("\\", "/")
+    return posixpath.normpath(posixpath.join(base_dir, href)).lstrip("/")
+
+
+class EPUBPackage:
+    """一次性解析 container.xml + OPF，供元数据、spine、目录与资源查找共用。
+
+    manifest 建立 id→item 与 path→item 两个字典，spine 解析为 O(n)。
+    """
+
+    def __init__(self, book: zipfile.ZipFile, opf_path: str, opf_root: ET.Element):
+        self._book = book
+        self.opf_path = opf_path
+        self.opf_dir = posixpath.dirname(opf_path)
+        self.metadata: Dict[str, str] = dict(DEFAULT_METADATA)
+        self.items_by_id: Dict[str, ManifestItem] = {}
+        self.items_by_path: Dict[str, ManifestItem] = {}
+        self.spine: List[ManifestItem] = []
+        self.toc_item: Optional[ManifestItem] = None
+        self._toc_titles: Optional[Dict[str, str]] = None
+
+        self._parse_metadata(opf_root)
+        self._parse_manifest(opf_root)
+        self._parse_spine(opf_root)
+
+    @classmethod
+    def from_zip(cls, book: zipfile.ZipFile) -> "EPUBPackage":
+        container = ET.fromstring(book.read("META-INF/container.xml"))
+        rootfile = container.find(f".//{{{CONTAINER_NS}}}rootfile")
+        if rootfile is None or not rootfile.get("full-path"):
+            raise ValueError("container.xml 中未找到 rootfile")
+        opf_path = rootfile.get("full-path")
+        return cls(book, opf_path, ET.fromstring(book.read(opf_path)))
+
+    def _parse_metadata(self, opf_root: ET.Element) -> None:
+        metadata = opf_root.find(f".//{{{OPF_NS}}}metadata")
+        if metadata is None:
+            print("未找到metadata元素")
+            return
+
+        for key, tag in (
+            ("title", "title"),
+            ("creator", "creator"),
+            ("language", "language"),
+            ("identifier", "identifier"),
+            ("description", "description"),
+        ):
+            elem = metadata.find(f".//{{{DC_NS}}}{tag}")
+            if elem is not None and elem.text:
+                self.metadata[key] = elem.text
+
+    def _parse_manifest(self, opf_root: ET.Element) -> None:
+        manifest = opf_root.find(f".//{{{OPF_NS}}}manifest")
+        if manifest is None:
+            print("未找到manifest元素")
+            return
+
+        for elem in manifest.iter(f"{{{OPF_NS}}}item"):
+            item_id = elem.get("id")
+            href = elem.get("href")
+            if not item_id or not href:
+                continue
+            item = ManifestItem(
+                id=item_id,
+                href=href,
+                path=_normalize_path(self.opf_dir, href),
+                media_type=elem.get("media-type", ""),
+                properties=elem.get("properties", ""),
+            )
+            self.items_by_id[item_id] = item
+            self.items_by_path[item.path] = item
+            if "nav" in item.properties.split():
+                self.toc_item = item
+
+    def _parse_spine(self, opf_root: ET.Element) -> None:
+        spine = opf_root.find(f".//{{{OPF_NS}}}spine")
+        if spine is None:
+            print("未找到spine元素")
+            return
+
+        if self.toc_item is None:
+            self.toc_item = self.items_by_id.get(spine.get("toc", ""))
+
+        for itemref in spine.iter(f"{{{OPF_NS}}}itemref"):
+            item = self.items_by_id.get(itemref.get("idref", ""))
+            if item is not None:
+                self.spine.append(item)
+
+    def item_by_id(self, item_id: str) -> Optional[ManifestItem]:
+        return self.items_by_id.get(item_id)
+
+    def resolve(self, href: str, base_path: Optional[str] = None) -> Optional[ManifestItem]:
+        """把（相对于 base_path 所在目录的）href 解析为 manifest 条目"""
+        base_dir = posixpath.dirname(base_path) if base_path else self.opf_dir
+        return self.items_by_path.get(_normalize_path(base_dir, href))
+
+    def toc_titles(self) -> Dict[str, str]:
+        """目录（EPUB3 nav 或 EPUB2 NCX）中的标题，键为章节的 zip 路径；首次调用时解析"""
+        if self._toc_titles is not None:
+            return self._toc_titles
+
+        titles: Dict[str, str] = {}
+        item = self.toc_item
+        if item is not None:
+            try:
+                root = ET.fromstring(self._book.read(item.path))
+                if root.tag == f"{{{NCX_NS}}}ncx":
+                    for nav_point in root.iter(f"{{{NCX_NS}}}navPoint"):
+                        text = nav_point.find(f"{{{NCX_NS}}}navLabel/{{{NCX_NS}}}text")
+                        content = nav_point.find(f"{{{NCX_NS}}}content")
+                        if text is None or content is None or not (text.text or "").strip():
+                            continue
+                        path = _normalize_path(posixpath.dirname(item.path), content.get("src", ""))
+                        titles.setdefault(path, text.text.strip())
+                else:
+                    for nav in root.iter(f"{{{XHTML_NS}}}nav"):
+                        if nav.get(f"{{{OPS_NS}}}type", "toc") != "toc":
+                            continue
+                        for link in nav.iter(f"{{{XHTML_NS}}}a"):
+                            label = "".join(link.itertext()).strip()
+                            if not label or not link.get("href"):
+                                continue
+                            path = _normalize_path(posixpath.dirname(item.path), link.get("href"))
+                            titles.setdefault(path, label)
+            except Exception as e:
+                print(f"解析目录失败: {str(e)}")
+
+        self._toc_titles = titles
+        return titles
@@ -0,0 +1,47 @@
+"""EPUB 章节解析所用的 HTML 解析后端。
+
+章节清理基于 BeautifulSoup 的文档树，后端即 BeautifulSoup 的 tree builder：
+有 lxml 时优先使用（C 实现，快数倍），否则退回纯 Python 的 html.parser。
+"""
+
+from __future__ import annotations
+
+from typing import Dict, List, Optional
+
+from .vendor_path import vendored_sys_path
+
+with vendored_sys_path():
+    from bs4.builder import builder_registry
+
+AUTO_BACKEND = "auto"
+FALLBACK_BACKEND = "html.parser"
+
+# 按优先级排列
+PARSER_BACKENDS: Dict[str, str] = {
+    "lxml": "lxml（C 实现，速度快）",
+    "html.parser": "html.parser（纯 Python，兼容性好）",
+}
+
+
+def available_backends() -> List[str]:
+    """当前环境中可用的后端（按优先级）"""
+    return [name for name in PARSER_BACKENDS if builder_registry.lookup(name) is not None]
+
+
+def _auto_backend() -> str:
+    backends = available_backends()
+    return backends[0] if backends else FALLBACK_BACKEND
+
+
+# 导入时自动选择
+DEFAULT_BACKEND = _auto_backend()
+
+
+def resolve_backend(name: Optional[str]) -> str:
+    """把配置中的后端名解析为可用的后端；未知或不可用时使用自动选择的结果"""
+    if not name or name == AUTO_BACKEND:
+        return DEFAULT_BACKEND
+    if name in PARSER_BACKENDS and builder_registry.lookup(name) is not None:
+        return name
+    print(f"HTML解析后端 {name} 不可用，改用 {DEFAULT_BACKEND}")
+    return DEFAULT_BACKEND
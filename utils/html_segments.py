@@ -0,0 +1,183 @@
+"""把很长的章节 HTML 按顶层块元素切分为若干段，供阅读器窗口化渲染。
+
+只扫描一遍标签记录元素位置，不构建文档树：导入时清理过的章节是结构完整的 HTML，
+按深度为 0 的边界切分即可保证每段的标签都是闭合的。过大的单个元素
+（如包住整章的 <div class="chapter">）会深入切分，并在每段外重新套上它的起止标签。
+"""
+
+from __future__ import annotations
+
+import re
+from typing import List, Optional
+
+# 超过该长度（字符数）的章节才使用窗口化渲染
+WINDOW_THRESHOLD_CHARS = 400_000
+# 每段的目标长度
+SEGMENT_CHARS = 40_000
+
+_BODY_OPEN_RE = re.compile(r"<body\b[^>]*>", re.IGNORECASE)
+_BODY_CLOSE_RE = re.compile(r"</body\s*>", re.IGNORECASE)
+# 导入时清理过的 HTML 中，属性值里的 "<" 与 ">" 已被转义，可以直接按 ">" 结束标签
+_TAG_RE = re.compile(
+    r"<(?:(/?)([a-zA-Z][^\s/>]*)[^>]*|!--.*?--|!\[CDATA\[.*?\]\]|![^>]*|\?.*?\?)>",
+    re.DOTALL,
+)
+_VOID_TAGS = frozenset({
+    "area", "base", "br", "col", "embed", "hr", "img", "input", "link",
+    "meta", "param", "source", "track", "wbr",
+})
+
+
+def chapter_body(html: str) -> str:
+    """取 <body> 内的 HTML（没有 body 时返回整个字符串）"""
+    open_match = _BODY_OPEN_RE.search(html)
+    if not open_match:
+        return html
+    close_match = None
+    for close_match in _BODY_CLOSE_RE.finditer(html, open_match.end()):
+        pass
+    end = close_match.start() if close_match else len(html)
+    return html[open_match.end():end]
+
+
+def body_start_tag(html: str) -> str:
+    """章节的 <body> 开始标签（含 dir、lang 等属性）；没有 body 时返回空字符串"""
+    match = _BODY_OPEN_RE.search(html)
+    return match.group(0) if match else ""
+
+
+class _Elements:
+    """一遍扫描得到的元素位置表（按起始标签顺序编号）
+
+    只保存整数，不为每个元素创建容器：长章节有十几万个标签，
+    逐个建树时大部分时间花在垃圾回收上。
+    skip[i] 是元素 i 的子树之后第一个元素的编号，用来在兄弟元素之间跳转。
+    """
+
+    def __init__(self):
+        self.starts: List[int] = []
+        self.open_ends: List[int] = []
+        self.close_starts: List[int] = []
+        self.ends: List[int] = []
+        self.skip: List[int] = []
+
+    def children(self, first: int, stop: int):
+        index = first
+        while index < stop:
+            yield index
+            index = self.skip[index]
+
+
+def _scan_elements(html: str) -> Optional[_Elements]:
+    """扫描一遍标签；标签不平衡时返回 None"""
+    elements = _Elements()
+    starts, open_ends, close_starts, ends, skip = (
+        elements.starts, elements.open_ends, elements.close_starts, elements.ends, elements.skip,
+    )
+    stack: List[int] = []
+    for match in _TAG_RE.finditer(html):
+        closing, name = match.group(1, 2)
+        if name is None:
+            continue
+        start, end = match.span()
+        void = name in _VOID_TAGS or name.lower() in _VOID_TAGS
+        if closing:
+            if void:
+                # 解析器有时会为 <wbr> 等补出结束标签，忽略即可
+                continue
+            if not stack:
+                return None
+            index = stack.pop()
+            close_starts[index] = start
+            ends[index] = end
+            skip[index] = len(starts)
+            continue
+        starts.append(start)
+        open_ends.append(end)
+        if void or html[end - 2] == "/":
+            close_starts.append(end)
+            ends.append(end)
+            skip.append(len(starts))
+        else:
+            close_starts.append(-1)
+            ends.append(-1)
+            skip.append(-1)
+            stack.append(len(starts) - 1)
+    if stack:
+        return None
+    return elements
+
+
+def _pieces(
+    html: str,
+    elements: _Elements,
+    start: int,
+    end: int,
+    first: int,
+    stop: int,
+    segment_chars: int,
+) -> List[str]:
+    """把 [start, end) 切成按顺序排列的片段：子元素之间的文本、完整子元素，
+    以及过大子元素（如包住整章的 <div>）深入切分后、重新套上其起止标签的各部分
+
+    first/stop 是该范围内子元素编号的区间。
+    """
+    pieces: List[str] = []
+    pos = start
+    for index in elements.children(first, stop):
+        child_start = elements.starts[index]
+        child_end = elements.ends[index]
+        if child_start > pos:
+            pieces.append(html[pos:child_start])
+        pos = child_end
+        if child_end - child_start > segment_chars and elements.skip[index] > index + 1:
+            open_end = elements.open_ends[index]
+            close_start = elements.close_starts[index]
+            parts = _group(
+                _pieces(html, elements, open_end, close_start, index + 1, elements.skip[index], segment_chars),
+                segment_chars,
+            )
+            if len(parts) > 1:
+                open_tag = html[child_start:open_end]
+                close_tag = html[close_start:child_end]
+                pieces.extend(open_tag + part + close_tag for part in parts)
+                continue
+        pieces.append(html[child_start:child_end])
+    if pos < end:
+        pieces.append(html[pos:end])
+    return pieces
+
+
+def _group(pieces: List[str], segment_chars: int) -> List[str]:
+    """把相邻片段合并为不超过 segment_chars 的段（单个片段超长时自成一段）"""
+    segments: List[str] = []
+    current: List[str] = []
+    size = 0
+    for piece in pieces:
+        if current and size + len(piece) > segment_chars:
+            segments.append("".join(current))
+            current = []
+            size = 0
+        current.append(piece)
+        size += len(piece)
+    if current:
+        segments.append("".join(current))
+    return segments
+
+
+def split_chapter_html(html: str, segment_chars: int = SEGMENT_CHARS) -> List[str]:
+    """把章节正文切分为若干段 body 片段（不含 <html>/<head>）
+
+    Returns:
+        List[str]: 各段的 HTML；无法切分时只有一段
+    """
+    body = chapter_body(html)
+    elements = _scan_elements(body)
+    if elements is None:
+        return [body]
+    pieces = _pieces(body, elements, 0, len(body), 0, len(elements.starts), segment_chars)
+    return _group(pieces, segment_chars) or [""]
+
+
+def needs_windowing(html: str) -> bool:
+    return len(html) > WINDOW_THRESHOLD_CHARS
@@ -0,0 +1,237 @@
+"""增量（推送式）JSON 解析器。
+
+流式输出的每个片段到达时调用 feed()，解析器只处理新片段，并返回期间发生的事件：
+- ("string", path, text)：路径 path 处的字符串值新增了 text（键名不产生该事件）
+- ("value", path, value)：路径 path 处的值已完整（字符串、数字、字面量、对象或数组）
+
+path 是从根开始的键与数组下标组成的元组，例如 ("basic_meaning", 0)；根值的 path 为 ()。
+根值之前的内容（如代码块标记、说明文字）被跳过，根值结束后的内容被忽略。
+"""
+
+from __future__ import annotations
+
+import json
+import re
+from typing import Any, List, Optional, Tuple
+
+JsonPath = Tuple[Any, ...]
+JsonEvent = Tuple[str, JsonPath, Any]
+
+_STRING_SPECIAL_RE = re.compile(r'["\\]')
+_ESCAPES = {'"': '"', "\\": "\\", "/": "/", "b": "\b", "f": "\f", "n": "\n", "r": "\r", "t": "\t"}
+_LITERAL_START = "-0123456789tfn"
+_LITERAL_END = ",}] \t\r\n"
+_WHITESPACE = " \t\r\n"
+
+# 解析状态
+_BEFORE_ROOT = 0
+_VALUE = 1  # 等待一个值
+_KEY = 2  # 等待键名或 "}"
+_COLON = 3
+_AFTER_VALUE = 4  # 等待 "," 或容器结束
+_FIRST_VALUE = 5  # "[" 之后：等待一个值或 "]"
+
+
+class JsonStreamError(ValueError):
+    """输出不是合法的 JSON"""
+
+
+class _Frame:
+    __slots__ = ("container", "key", "path")
+
+    def __init__(self, container, path: JsonPath):
+        self.container = container
+        self.key: Optional[str] = None
+        self.path = path
+
+    def child_path(self) -> JsonPath:
+        if isinstance(self.container, dict):
+            return self.path + (self.key,)
+        return self.path + (len(self.container),)
+
+
+class JsonStreamParser:
+    """增量 JSON 解析器：每次 feed 的工作量与片段长度成正比"""
+
+    def __init__(self) -> None:
+        self._stack: List[_Frame] = []
+        self._state = _BEFORE_ROOT
+        self._in_string = False
+        self._string_is_key = False
+        self._string_path: JsonPath = ()
+        self._string_parts: List[str] = []
+        self._escape: Optional[str] = None  # 反斜杠之后尚未读完的转义序列
+        self._high_surrogate = ""
+        self._literal: List[str] = []
+        self.done = False
+        self.value: Any = None
+
+    @property
+    def started(self) -> bool:
+        return self._state != _BEFORE_ROOT
+
+    def feed(self, text: str) -> List[JsonEvent]:
+        events: List[JsonEvent] = []
+        i = 0
+        n = len(text)
+        while i < n and not self.done:
+            if self._in_string:
+                i = self._feed_string(text, i, events)
+                continue
+            if self._literal:
+                j = i
+                while j < n and text[j] not in _LITERAL_END:
+                    j += 1
+                self._literal.append(text[i:j])
+                if j == n:
+                    break
+                self._finish_literal(events)
+                i = j
+                continue
+
+            ch = text[i]
+            i += 1
+            state = self._state
+            if state == _BEFORE_ROOT:
+                if ch == "{" or ch == "[":
+                    self._open(ch, ())
+                continue
+            if ch in _WHITESPACE:
+                continue
+            if state == _VALUE or state == _FIRST_VALUE:
+                if ch == "]" and state == _FIRST_VALUE:
+                    self._close(events)
+                elif ch == "{" or ch == "[":
+                    self._open(ch, self._stack[-1].child_path())
+                elif ch == '"':
+                    self._start_string(False, self._stack[-1].child_path())
+                elif ch in _LITERAL_START:
+                    self._literal.append(ch)
+                else:
+                    raise JsonStreamError(f"意外的字符 {ch!r}")
+            elif state == _KEY:
+                if ch == '"':
+                    self._start_string(True, self._stack[-1].path)
+                elif ch == "}" and not self._stack[-1].container:
+                    self._close(events)
+                else:
+                    raise JsonStreamError(f"需要键名，遇到 {ch!r}")
+            elif state == _COLON:
+                if ch != ":":
+                    raise JsonStreamError(f"需要 ':'，遇到 {ch!r}")
+                self._state = _VALUE
+            else:  # _AFTER_VALUE
+                frame = self._stack[-1]
+                if ch == ",":
+                    self._state = _KEY if isinstance(frame.container, dict) else _VALUE
+                elif ch == ("}" if isinstance(frame.container, dict) else "]"):
+                    self._close(events)
+                else:
+                    raise JsonStreamError(f"需要 ',' 或结束符，遇到 {ch!r}")
+        return events
+
+    def close(self) -> Any:
+        """输入结束：返回完整的根值；输出不完整时抛出 JsonStreamError"""
+        if self._literal and not self._in_string:
+            self._finish_literal([])
+        if not self.done:
+            raise JsonStreamError("JSON 不完整" if self.started else "未找到 JSON")
+        return self.value
+
+    def _open(self, ch: str, path: JsonPath) -> None:
+        self._stack.append(_Frame({} if ch == "{" else [], path))
+        self._state = _KEY if ch == "{" else _FIRST_VALUE
+
+    def _close(self, events: List[JsonEvent]) -> None:
+        frame = self._stack.pop()
+        self._add_value(frame.container, frame.path, events)
+
+    def _add_value(self, value: Any, path: JsonPath, events: List[JsonEvent]) -> None:
+        events.append(("value", path, value))
+        if not self._stack:
+            self.value = value
+            self.done = True
+            return
+        frame = self._stack[-1]
+        if isinstance(frame.container, dict):
+            frame.container[frame.key] = value
+        else:
+            frame.container.append(value)
+        self._state = _AFTER_VALUE
+
+    def _finish_literal(self, events: List[JsonEvent]) -> None:
+        literal = "".join(self._literal)
+        self._literal = []
+        try:
+            value = json.loads(literal)
+        except json.JSONDecodeError:
+            raise JsonStreamError(f"无效的值 {literal!r}") from None
+        self._add_value(value, self._stack[-1].child_path(), events)
+
+    def _start_string(self, is_key: bool, path: JsonPath) -> None:
+        self._in_string = True
+        self._string_is_key = is_key
+        self._string_path = path
+        self._string_parts = []
+
+    def _feed_string(self, text: str, i: int, events: List[JsonEvent]) -> int:
+        n = len(text)
+        parts: List[str] = []
+        closed = False
+        while i < n:
+            if self._escape is not None:
+                self._escape += text[i]
+                i += 1
+                if self._escape[0] == "u":
+                    if len(self._escape) < 5:
+                        continue
+                    try:
+                        decoded = chr(int(self._escape[1:], 16))
+                    except ValueError:
+                        raise JsonStreamError(f"无效的转义 \\{self._escape}") from None
+                else:
+                    decoded = _ESCAPES.get(self._escape, self._escape)
+                self._escape = None
+                parts.append(self._join_surrogates(decoded))
+                continue
+            match = _STRING_SPECIAL_RE.search(text, i)
+            if match is None:
+                parts.append(text[i:])
+                i = n
+                break
+            j = match.start()
+            if j > i:
+                parts.append(text[i:j])
+            i = j + 1
+            if text[j] == "\\":
+                self._escape = ""
+                continue
+            closed = True
+            break
+
+        chunk = "".join(parts)
+        if chunk:
+            self._string_parts.append(chunk)
+            if not self._string_is_key:
+                events.append(("string", self._string_path, chunk))
+        if closed:
+            self._in_string = False
+            value = "".join(self._string_parts)
+            self._string_parts = []
+            if self._string_is_key:
+                self._stack[-1].key = value
+                self._state = _COLON
+            else:
+                self._add_value(value, self._string_path, events)
+        return i
+
+    def _join_surrogates(self, ch: str) -> str:
+        """\\uD83D\\uDE00 这类代理对拆在两个转义中：等低位到达后合成一个字符"""
+        if "\ud800" <= ch <= "\udbff":
+            self._high_surrogate = ch
+            return ""
+        if self._high_surrogate:
+            high, self._high_surrogate = self._high_surrogate, ""
+            if "\udc00" <= ch <= "\udfff":
+                return (high + ch).encode("utf-16", "surrogatepass").decode("utf-16")
+        return ch
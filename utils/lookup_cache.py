@@ -0,0 +1,265 @@
+"""查词结果的持久缓存。
+
+分两层：
+- 完整结果：同一个词在同一句上下文中、以相同的提示词和模型查询时，直接返回上次
+  解析好的 LookupResult，不再发送流式请求。
+- 单词层：基本义只与单词本身（及释义语言）有关，换了句子也可以先显示，
+  语境义再由模型流式生成。
+
+缓存保存在插件数据目录下的独立 SQLite 文件中，按有效期与条数淘汰（最久未使用的先删除）。
+"""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import re
+import threading
+import time
+import unicodedata
+from dataclasses import asdict
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from .book_store import SidecarStore
+from .lookup_json import LookupResult
+from .paths import lookup_cache_path
+
+DEFAULT_TTL_DAYS = 30
+DEFAULT_MAX_ENTRIES = 5000
+# 每写入多少条检查一次是否超出条数上限
+_PRUNE_INTERVAL = 50
+
+_WHITESPACE_RE = re.compile(r"\s+")
+_WORD_STRIP_CHARS = " \t\"'“”‘’.,;:!?()[]{}<>«»。，；：！？（）【】《》"
+
+
+def _normalize(text: str) -> str:
+    text = unicodedata.normalize("NFKC", text or "")
+    return _WHITESPACE_RE.sub(" ", text).strip()
+
+
+def word_cache_key(word: str) -> str:
+    """单词层的键：规范化、去掉首尾标点与英文所有格，大小写不敏感"""
+    word = _normalize(word).casefold().strip(_WORD_STRIP_CHARS)
+    for suffix in ("'s", "’s"):
+        if word.endswith(suffix) and len(word) > len(suffix):
+            word = word[: -len(suffix)]
+    return word
+
+
+def lookup_cache_key(word: str, context: str, prompt: str, model: str, api_base: str) -> str:
+    """由规范化的单词与上下文、完整提示词、模型与 API 地址计算缓存键"""
+    payload = json.dumps(
+        [_normalize(word).casefold(), _normalize(context), prompt, model or "", (api_base or "").rstrip("/")],
+        ensure_ascii=False,
+    )
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+class LookupCache:
+    """查词结果缓存（SQLite）"""
+
+    def __init__(
+        self,
+        path: Optional[str] = None,
+        ttl_days: float = DEFAULT_TTL_DAYS,
+        max_entries: int = DEFAULT_MAX_ENTRIES,
+    ):
+        self.store = SidecarStore(path or lookup_cache_path())
+        self.ttl_seconds = ttl_days * 86400
+        self.max_entries = max_entries
+        self._lock = threading.Lock()
+        self._writes = 0
+        self.hits = 0
+        self.misses = 0
+        # 完整结果未命中、但单词层提供了基本义的次数
+        self.word_hits = 0
+        self.store.execute(
+            """
+            CREATE TABLE IF NOT EXISTS lookup_cache (
+                key TEXT PRIMARY KEY,
+                word TEXT NOT NULL,
+                result TEXT NOT NULL,
+                raw TEXT NOT NULL,
+                created_at REAL NOT NULL,
+                last_used REAL NOT NULL
+            )
+            """
+        )
+        self.store.execute(
+            "CREATE INDEX IF NOT EXISTS idx_lookup_cache_last_used ON lookup_cache (last_used)"
+        )
+        self.store.execute(
+            """
+            CREATE TABLE IF NOT EXISTS word_meanings (
+                word TEXT NOT NULL,
+                language TEXT NOT NULL,
+                basic_meaning TEXT NOT NULL,
+                updated_at REAL NOT NULL,
+                PRIMARY KEY (word, language)
+            )
+            """
+        )
+        self.store.execute(
+            "CREATE INDEX IF NOT EXISTS idx_word_meanings_updated_at ON word_meanings (updated_at)"
+        )
+        self.prune()
+
+    def get(self, key: str) -> Optional[Tuple[LookupResult, str]]:
+        """命中时返回 (结果, 原始输出)；过期或无法解析的条目视为未命中并删除"""
+        now = time.time()
+        row = None
+        try:
+            row = self.store.first(
+                "SELECT result, raw, created_at FROM lookup_cache WHERE key = ?",
+                key,
+            )
+            if row and now - row[2] <= self.ttl_seconds:
+                result = LookupResult(**json.loads(row[0]))
+                self.store.execute("UPDATE lookup_cache SET last_used = ? WHERE key = ?", now, key)
+                with self._lock:
+                    self.hits += 1
+                return result, row[1]
+        except Exception as e:
+            print(f"读取查词缓存失败: {str(e)}")
+        if row:
+            self.invalidate(key)
+        with self._lock:
+            self.misses += 1
+        return None
+
+    def contains(self, key: str) -> bool:
+        """是否已有未过期的结果（不计入命中统计）"""
+        try:
+            return bool(self.store.scalar(
+                "SELECT 1 FROM lookup_cache WHERE key = ? AND created_at >= ?",
+                key,
+                time.time() - self.ttl_seconds,
+            ))
+        except Exception:
+            return False
+
+    def put(self, key: str, result: LookupResult, raw: str) -> None:
+        now = time.time()
+        try:
+            self.store.execute(
+                """
+                INSERT OR REPLACE INTO lookup_cache (key, word, result, raw, created_at, last_used)
+                VALUES (?, ?, ?, ?, ?, ?)
+                """,
+                key,
+                result.word,
+                json.dumps(asdict(result), ensure_ascii=False),
+                raw,
+                now,
+                now,
+            )
+        except Exception as e:
+            print(f"写入查词缓存失败: {str(e)}")
+            return
+        with self._lock:
+            self._writes += 1
+            prune = self._writes % _PRUNE_INTERVAL == 0
+        if prune:
+            self.prune()
+
+    def get_basic_meaning(self, word: str, language: str) -> Optional[List[str]]:
+        """单词层：之前查询同一单词得到的基本义"""
+        key = word_cache_key(word)
+        if not key:
+            return None
+        try:
+            row = self.store.first(
+                "SELECT basic_meaning, updated_at FROM word_meanings WHERE word = ? AND language = ?",
+                key,
+                language,
+            )
+            if row and time.time() - row[1] <= self.ttl_seconds:
+                meanings = json.loads(row[0])
+                if isinstance(meanings, list) and meanings:
+                    with self._lock:
+                        self.word_hits += 1
+                    return [str(item) for item in meanings]
+        except Exception as e:
+            print(f"读取单词缓存失败: {str(e)}")
+        return None
+
+    def put_basic_meaning(self, words: Iterable[str], language: str, basic_meaning: List[str]) -> None:
+        """记录基本义；words 可同时包含点击的词形与模型返回的词（通常是原形）"""
+        if not basic_meaning:
+            return
+        keys = {key for key in (word_cache_key(word) for word in words) if key}
+        now = time.time()
+        payload = json.dumps(list(basic_meaning), ensure_ascii=False)
+        try:
+            self.store.executemany(
+                """
+                INSERT OR REPLACE INTO word_meanings (word, language, basic_meaning, updated_at)
+                VALUES (?, ?, ?, ?)
+                """,
+                [(key, language, payload, now) for key in keys],
+            )
+        except Exception as e:
+            print(f"写入单词缓存失败: {str(e)}")
+
+    def invalidate(self, key: str) -> None:
+        try:
+            self.store.execute("DELETE FROM lookup_cache WHERE key = ?", key)
+        except Exception as e:
+            print(f"删除查词缓存失败: {str(e)}")
+
+    def prune(self) -> None:
+        """删除过期条目，并只保留最近使用的 max_entries 条"""
+        try:
+            self.store.execute(
+                "DELETE FROM lookup_cache WHERE created_at < ?",
+                time.time() - self.ttl_seconds,
+            )
+            self.store.execute(
+                """
+                DELETE FROM lookup_cache WHERE key IN (
+                    SELECT key FROM lookup_cache ORDER BY last_used DESC LIMIT -1 OFFSET ?
+                )
+                """,
+                self.max_entries,
+            )
+            self.store.execute(
+                "DELETE FROM word_meanings WHERE updated_at < ?",
+                time.time() - self.ttl_seconds,
+            )
+            self.store.execute(
+                """
+                DELETE FROM word_meanings WHERE rowid IN (
+                    SELECT rowid FROM word_meanings ORDER BY updated_at DESC LIMIT -1 OFFSET ?
+                )
+                """,
+                self.max_entries,
+            )
+        except Exception as e:
+            print(f"清理查词缓存失败: {str(e)}")
+
+    def clear(self) -> None:
+        self.store.execute("DELETE FROM lookup_cache")
+        self.store.execute("DELETE FROM word_meanings")
+
+    def hit_rate(self) -> float:
+        """本次运行的命中率（只用内存中的计数，可在界面线程中频繁调用）"""
+        with self._lock:
+            total = self.hits + self.misses
+            return self.hits / total if total else 0.0
+
+    def stats(self) -> Dict[str, float]:
+        """命中统计（本次运行）与当前条数（条数需查询数据库，供诊断与关闭时输出）"""
+        with self._lock:
+            hits, misses, word_hits = self.hits, self.misses, self.word_hits
+        total = hits + misses
+        return {
+            "hits": hits,
+            "misses": misses,
+            "word_hits": word_hits,
+            "hit_rate": hits / total if total else 0.0,
+            "entries": self.store.scalar("SELECT COUNT(*) FROM lookup_cache") or 0,
+        }
+
+    def close(self) -> None:
+        self.store.close()
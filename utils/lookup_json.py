@@ -2,7 +2,9 @@ from __future__ import annotations
 
 import json
 from dataclasses import dataclass
-from typing import Any, Dict, List, Optional
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+from .json_stream import JsonStreamError, JsonStreamParser
 
 
 @dataclass(frozen=True)
@@ -79,6 +81,15 @@ def parse_lookup_result(text: str, *, max_basic_meanings: int = 3) -> LookupResu
     if not isinstance(data, dict):
         raise ValueError("JSON 根对象必须是 object")
 
+    return _lookup_result_from_dict(data, max_basic_meanings=max_basic_meanings)
+
+
+def _lookup_result_from_dict(
+    data: Dict[str, Any],
+    *,
+    max_basic_meanings: int,
+    reserved: Tuple[str, ...] = ("word", "basic_meaning", "contextual_meaning"),
+) -> LookupResult:
     word = str(data.get("word", "")).strip()
     contextual = str(data.get("contextual_meaning", "")).strip()
     basic = _coerce_str_list(data.get("basic_meaning"))
@@ -95,11 +106,94 @@ def parse_lookup_result(text: str, *, max_basic_meanings: int = 3) -> LookupResu
     optional: Dict[str, Any] = {
         k: v
         for k, v in data.items()
-        if k not in {"word", "basic_meaning", "contextual_meaning"}
+        if k not in reserved
     }
     return LookupResult(word=word, basic_meaning=basic, contextual_meaning=contextual, optional=optional)
 
 
+@dataclass(frozen=True)
+class LookupFieldEvent:
+    """流式查词中的字段级事件
+
+    - word / contextual_meaning：text 为新增的文字；complete 为 True 时 text 是完整值
+    - basic_meaning：第 index 条基本义已完整
+    - 其它（可选字段）：value 为完整值
+    - raw：输出无法按 JSON 增量解析时，text 为新增的原始文字
+    """
+
+    field: str
+    text: str = ""
+    index: Optional[int] = None
+    value: Any = None
+    complete: bool = False
+
+
+class LookupStreamParser:
+    """把流式输出的增量片段转换为字段级事件，每个片段只处理一次"""
+
+    def __init__(self, *, max_basic_meanings: int = 3):
+        self._parser = JsonStreamParser()
+        self._max_basic_meanings = max_basic_meanings
+        self._failed = False
+
+    def feed(self, delta: str) -> List[LookupFieldEvent]:
+        if self._failed:
+            return [LookupFieldEvent("raw", text=delta)]
+        try:
+            events = self._parser.feed(delta)
+        except JsonStreamError:
+            # 之后改为原样显示；结束时仍会尝试整体解析与修复
+            self._failed = True
+            return [LookupFieldEvent("raw", text=delta)]
+
+        fields: List[LookupFieldEvent] = []
+        for kind, path, value in events:
+            if not path:
+                continue
+            field = path[0]
+            if field == "basic_meaning":
+                if kind != "value" or not isinstance(value, str) or not value.strip():
+                    continue
+                index = path[1] if len(path) == 2 else 0
+                if isinstance(index, int) and index < self._max_basic_meanings:
+                    fields.append(LookupFieldEvent(field, text=value.strip(), index=index, complete=True))
+            elif len(path) != 1:
+                continue
+            elif field in ("word", "contextual_meaning"):
+                if kind == "string":
+                    fields.append(LookupFieldEvent(field, text=value))
+                elif isinstance(value, str):
+                    fields.append(LookupFieldEvent(field, text=value, complete=True))
+            elif kind == "value":
+                fields.append(LookupFieldEvent(str(field), value=value, complete=True))
+        return fields
+
+    def result(self) -> LookupResult:
+        """输出结束后的完整结果；不是合法的查词 JSON 时抛出 ValueError"""
+        data = self._parser.close()
+        if not isinstance(data, dict):
+            raise ValueError("JSON 根对象必须是 object")
+        return _lookup_result_from_dict(data, max_basic_meanings=self._max_basic_meanings)
+
+
+def lookup_result_from_batch_item(data: Any, *, max_basic_meanings: int = 3) -> Tuple[Optional[int], LookupResult]:
+    """解析批量输出数组中的一个对象：(词汇编号（从 1 开始，缺失时为 None）, 结果)"""
+    if not isinstance(data, dict):
+        raise ValueError("数组元素必须是 object")
+
+    index: Optional[int]
+    try:
+        index = int(data.get("index"))
+    except (TypeError, ValueError):
+        index = None
+    result = _lookup_result_from_dict(
+        data,
+        max_basic_meanings=max_basic_meanings,
+        reserved=("index", "word", "basic_meaning", "contextual_meaning"),
+    )
+    return index, result
+
+
 def build_lookup_prompt(
     *,
     template_text: str,
@@ -168,6 +262,79 @@ def build_json_repair_prompt(*, invalid_output: str) -> str:
     ).strip()
 
 
+def build_batch_lookup_prompt(
+    *,
+    template_text: str,
+    items: Sequence[Tuple[str, str]],
+    enabled_optional_fields: Dict[str, bool],
+    max_basic_meanings: int = 3,
+) -> str:
+    """一次请求查询多个词汇；items 为 (单词, 上下文)
+
+    相同的上下文只发送一次，词汇按编号引用上下文；模型输出 JSON 数组，
+    每个元素带 index 字段对应词汇编号。
+    """
+    optional_fields = [k for k, enabled in enabled_optional_fields.items() if enabled]
+
+    contexts: List[str] = []
+    context_numbers: Dict[str, int] = {}
+    word_lines: List[str] = []
+    for number, (word, context) in enumerate(items, start=1):
+        context = (context or "").strip()
+        if context not in context_numbers:
+            contexts.append(context)
+            context_numbers[context] = len(contexts)
+        word_lines.append(f"{number}. {word}（上下文 C{context_numbers[context]}）")
+
+    schema = (
+        "[\n"
+        "  {\n"
+        '    "index": number  # 词汇编号\n'
+        '    "word": string,\n'
+        f'    "basic_meaning": [string]  # 最多 {max_basic_meanings} 条\n'
+        '    "contextual_meaning": string\n'
+        "  }\n"
+        "]"
+    )
+
+    words_clause = ", ".join(word for word, _ in items)
+    template_rendered = (template_text or "").strip()
+    template_rendered = template_rendered.replace("{word}", words_clause)
+    template_rendered = template_rendered.replace("{optional_fields}", ", ".join(optional_fields))
+    template_rendered = template_rendered.replace("{context}", "")
+    if "{json_schema}" in template_rendered:
+        template_rendered = template_rendered.replace("{json_schema}", schema)
+
+    parts: List[str] = []
+    if template_rendered:
+        parts.append(template_rendered)
+
+    parts.append(
+        "请严格只输出一个 JSON 数组（不要 Markdown/代码块/解释性文字），"
+        "每个目标词汇对应一个对象，按编号顺序输出。"
+    )
+    if "{json_schema}" not in (template_text or ""):
+        parts.append("JSON schema:")
+        parts.append(schema)
+    if optional_fields:
+        parts.append(
+            "可选字段（如果你能提供）："
+            + ", ".join(optional_fields)
+            + "（仅在有把握时输出；没有就省略字段）"
+        )
+    parts.append(
+        "要求：\n"
+        f"- basic_meaning：不超过 {max_basic_meanings} 条，给出词汇常见核心义（简明）。\n"
+        "- contextual_meaning：必须结合该词汇标注的上下文，并明确对应该上下文。"
+    )
+    parts.append(
+        "上下文：\n"
+        + "\n\n".join(f"C{number}:\n{context}" for number, context in enumerate(contexts, start=1))
+    )
+    parts.append("目标词汇：\n" + "\n".join(word_lines))
+    return "\n\n".join([p for p in parts if p.strip()]).strip()
+
+
 def escape_html(text: str) -> str:
     return (
         text.replace("&", "&amp;")
@@ -215,24 +382,27 @@ def lookup_template_for_preferences(*, style: str, language: str) -> str:
 
 
 def render_lookup_result_html(result: LookupResult, *, enabled_optional_fields: Dict[str, bool]) -> str:
-    label_map = {"pos": "词性", "ipa": "音标", "examples": "例句"}
     parts: List[str] = []
     parts.append("<div>")
-    parts.append("<h3 style='margin:0 0 8px 0;'>基本义</h3>")
-    parts.append("<ul style='margin:0 0 12px 18px; padding:0;'>")
-    for item in result.basic_meaning:
-        parts.append(f"<li style='margin:4px 0;'>{escape_html(item)}</li>")
-    parts.append("</ul>")
+    parts.append(render_basic_meaning_html(result.basic_meaning))
 
     parts.append("<h3 style='margin:0 0 8px 0;'>语境义</h3>")
     parts.append(f"<p style='margin:0 0 12px 0;'>{escape_html(result.contextual_meaning)}</p>")
+    parts.append(render_optional_fields_html(result.optional, enabled_optional_fields))
 
+    parts.append("</div>")
+    return "".join(parts)
+
+
+def render_optional_fields_html(optional: Dict[str, Any], enabled_optional_fields: Dict[str, bool]) -> str:
+    label_map = {"pos": "词性", "ipa": "音标", "examples": "例句"}
+    parts: List[str] = []
     for key, enabled in enabled_optional_fields.items():
         if not enabled:
             continue
-        if key not in result.optional:
+        if key not in optional:
             continue
-        value = result.optional.get(key)
+        value = optional.get(key)
         if value is None:
             continue
         title = label_map.get(key, str(key))
@@ -259,16 +429,40 @@ def render_lookup_result_html(result: LookupResult, *, enabled_optional_fields:
             parts.append("</ul>")
         else:
             parts.append(f"<p style='margin:0 0 12px 0;'>{escape_html(str(value))}</p>")
+    return "".join(parts)
+
+
+def render_basic_meaning_html(basic_meaning: List[str]) -> str:
+    parts: List[str] = ["<h3 style='margin:0 0 8px 0;'>基本义</h3>", "<ul style='margin:0 0 12px 18px; padding:0;'>"]
+    for item in basic_meaning:
+        parts.append(f"<li style='margin:4px 0;'>{escape_html(item)}</li>")
+    parts.append("</ul>")
+    return "".join(parts)
+
 
+def render_batch_lookup_html(
+    entries: Sequence[Tuple[str, Optional[LookupResult]]],
+    *,
+    pending: bool = True,
+) -> str:
+    """批量查词结果列表；entries 为 (单词, 结果)，结果为 None 表示尚未返回"""
+    parts: List[str] = ["<div>"]
+    for word, result in entries:
+        parts.append(f"<h3 style='margin:0 0 8px 0;'>{escape_html(word)}</h3>")
+        if result is None:
+            status = "正在生成…" if pending else "未返回结果（可单独点击查询）"
+            parts.append(f"<p style='margin:0 0 12px 0; color:#86868B;'>{status}</p>")
+            continue
+        if result.basic_meaning:
+            parts.append("<ul style='margin:0 0 8px 18px; padding:0;'>")
+            for item in result.basic_meaning:
+                parts.append(f"<li style='margin:4px 0;'>{escape_html(item)}</li>")
+            parts.append("</ul>")
+        parts.append(f"<p style='margin:0 0 12px 0;'>{escape_html(result.contextual_meaning)}</p>")
     parts.append("</div>")
     return "".join(parts)
 
 
-def render_streaming_html(accumulated_text: str) -> str:
-    safe = escape_html(accumulated_text)
-    return (
-        "<div>"
-        "<p style='margin:0 0 8px 0; color:#86868B;'>正在生成（流式）…</p>"
-        f"<pre style='white-space:pre-wrap; margin:0;'>{safe}</pre>"
-        "</div>"
-    )
+def render_batch_pending_html(count: int) -> str:
+    """批量查词进行中的状态行（各词结果随后追加在其后）"""
+    return f"<p style='margin:0 0 12px 0; color:#86868B;'>正在生成 {count} 个单词的释义（流式）…</p>"
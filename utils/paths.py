@@ -21,10 +21,31 @@ def config_dir() -> str:
     return os.path.join(addon_data_root(), "config")
 
 
+def library_dir() -> str:
+    return os.path.join(addon_data_root(), "library")
+
+
+def library_db_path() -> str:
+    # 书籍数据按 Anki 配置文件分开保存，与各自的集合对应
+    return os.path.join(library_dir(), f"{mw.pm.name}.sqlite3")
+
+
+def lookup_cache_path() -> str:
+    return os.path.join(addon_data_root(), "cache", "lookup_cache.sqlite3")
+
+
 def note_config_path() -> str:
     return os.path.join(config_dir(), "note_config.json")
 
 
+def word_frequency_path() -> str:
+    return os.path.join(config_dir(), "word_frequency.txt")
+
+
+def known_words_path() -> str:
+    return os.path.join(config_dir(), "known_words.txt")
+
+
 def reader_style_path() -> str:
     return os.path.join(config_dir(), "reader_style.json")
 
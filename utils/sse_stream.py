@@ -0,0 +1,185 @@
+"""流式 AI 响应（Server-Sent Events）的增量解码。
+
+SSEDecoder 把网络读到的字节块追加到同一个 bytearray 中，按偏移量查找行尾，
+已处理的部分累积到一定量后才整体丢弃，不会像 buffer.split(b"\\n", 1) 那样
+每行都复制一次剩余数据。每个 data 行只复制一次（取出载荷本身）。
+
+extract_delta_content 对 chat/completions 的常见分块格式直接定位
+choices[0].delta.content 字符串，只解码这一段；格式不符合时再完整解析 JSON。
+
+本模块只依赖标准库，可以直接运行做基准测试，回放录制的流：
+
+    python utils/sse_stream.py [录制文件 ...] [--read-size N]
+
+录制文件为原始响应体（例如 curl -N 的输出）；不指定时使用生成的示例流。
+"""
+
+from __future__ import annotations
+
+import json
+import re
+from typing import List, Optional
+
+DEFAULT_READ_SIZE = 16384
+# 已处理的数据超过这个量（或超过缓冲区一半）时才从缓冲区删除
+_COMPACT_THRESHOLD = 65536
+
+_DATA_PREFIX = b"data:"
+_DELTA_CONTENT_RE = re.compile(rb'"delta"\s*:\s*\{\s*(?:"role"\s*:\s*"[a-z]*"\s*,\s*)?"content"\s*:\s*"')
+_STRING_SPECIAL_RE = re.compile(rb'["\\]')
+
+
+class SSEDecoder:
+    """增量 SSE 解码器：feed 字节块，返回其中完整的 data 行载荷"""
+
+    def __init__(self) -> None:
+        self._buffer = bytearray()
+        self._offset = 0  # 缓冲区中尚未处理的数据起点
+
+    def feed(self, chunk: bytes) -> List[bytes]:
+        buffer = self._buffer
+        buffer += chunk
+        payloads: List[bytes] = []
+        pos = self._offset
+        with memoryview(buffer) as view:
+            while True:
+                newline = buffer.find(b"\n", pos)
+                if newline < 0:
+                    break
+                start, end = pos, newline
+                pos = newline + 1
+                while start < end and buffer[start] in b" \t":
+                    start += 1
+                if not buffer.startswith(_DATA_PREFIX, start, end):
+                    continue
+                start += len(_DATA_PREFIX)
+                while start < end and buffer[start] in b" \t":
+                    start += 1
+                while end > start and buffer[end - 1] in b" \t\r":
+                    end -= 1
+                if start < end:
+                    payloads.append(bytes(view[start:end]))
+
+        if pos >= len(buffer):
+            buffer.clear()
+            pos = 0
+        elif pos > _COMPACT_THRESHOLD or pos > len(buffer) // 2:
+            del buffer[:pos]
+            pos = 0
+        self._offset = pos
+        return payloads
+
+
+def extract_delta_content(payload: bytes) -> Optional[str]:
+    """从一个 chat/completions 流式分块中取出 choices[0].delta.content"""
+    match = _DELTA_CONTENT_RE.search(payload)
+    if match is not None:
+        start = match.end()
+        pos = start
+        while True:
+            special = _STRING_SPECIAL_RE.search(payload, pos)
+            if special is None:
+                break
+            if payload[special.start()] == 0x5C:  # 反斜杠：跳过被转义的字符
+                pos = special.start() + 2
+                continue
+            text = payload[start : special.start()].decode("utf-8", errors="replace")
+            if pos == start:
+                return text
+            try:
+                return json.loads(f'"{text}"')
+            except ValueError:
+                break
+    return _decode_delta_content(payload)
+
+
+def _decode_delta_content(payload: bytes) -> Optional[str]:
+    try:
+        obj = json.loads(payload.decode("utf-8", errors="replace"))
+        text = obj["choices"][0].get("delta", {}).get("content")
+    except Exception:
+        return None
+    return str(text) if text else None
+
+
+def _baseline_decode(chunks: List[bytes]) -> List[str]:
+    """原先的解码方式（每行 split 剩余缓冲区并完整解析 JSON），仅供基准对比"""
+    texts = []
+    buffer = b""
+    for chunk in chunks:
+        buffer += chunk
+        while b"\n" in buffer:
+            line, buffer = buffer.split(b"\n", 1)
+            line = line.strip()
+            if not line or not line.startswith(b"data:"):
+                continue
+            data = line[len(b"data:") :].strip()
+            if data == b"[DONE]":
+                return texts
+            text = _decode_delta_content(data)
+            if text:
+                texts.append(text)
+    return texts
+
+
+def _decode(chunks: List[bytes]) -> List[str]:
+    texts = []
+    decoder = SSEDecoder()
+    for chunk in chunks:
+        for data in decoder.feed(chunk):
+            if data == b"[DONE]":
+                return texts
+            text = extract_delta_content(data)
+            if text:
+                texts.append(text)
+    return texts
+
+
+def _sample_stream(events: int = 4000) -> bytes:
+    parts = []
+    for i in range(events):
+        content = ["词", " word", "\\n", " \\\"quoted\\\"", "é"][i % 5]
+        parts.append(
+            'data: {"id":"chatcmpl-1","object":"chat.completion.chunk","created":1700000000,'
+            '"model":"gpt-4o-mini","choices":[{"index":0,"delta":{"content":"%s"},'
+            '"logprobs":null,"finish_reason":null}]}\n\n' % content
+        )
+    parts.append("data: [DONE]\n\n")
+    return "".join(parts).encode("utf-8")
+
+
+def _benchmark(streams: List[bytes], read_size: int, repeat: int = 5) -> None:
+    import time
+
+    for index, body in enumerate(streams):
+        # 模拟突发到达：一次读到 read_size 字节
+        chunks = [body[i : i + read_size] for i in range(0, len(body), read_size)]
+        expected = _baseline_decode(chunks)
+        assert _decode(chunks) == expected, "解码结果与原实现不一致"
+        timings = {}
+        for name, decode in (("baseline", _baseline_decode), ("decoder", _decode)):
+            best = float("inf")
+            for _ in range(repeat):
+                started = time.perf_counter()
+                decode(chunks)
+                best = min(best, time.perf_counter() - started)
+            timings[name] = best
+        print(
+            f"流 {index}: {len(body)} 字节, {len(expected)} 个片段, 每次读取 {read_size} 字节: "
+            f"原实现 {timings['baseline'] * 1000:.1f} ms, 新实现 {timings['decoder'] * 1000:.1f} ms"
+        )
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="回放录制的 SSE 流，对比解码耗时")
+    parser.add_argument("captures", nargs="*", help="录制的原始响应体文件")
+    parser.add_argument("--read-size", type=int, default=DEFAULT_READ_SIZE)
+    args = parser.parse_args()
+
+    bodies = []
+    for path in args.captures:
+        with open(path, "rb") as file:
+            bodies.append(file.read())
+    _benchmark(bodies or [_sample_stream()], args.read_size)
@@ -1,6 +1,63 @@
 import re
+from bisect import bisect_right
 from typing import Tuple, List
 
+# 句子结束标点及其后的空白
+_SENTENCE_END_RE = re.compile(r'[.!?。！？]+\s*')
+
+
+class SentenceIndex:
+    """文本中所有句子边界的索引
+
+    构建时扫描一遍文本，之后按光标位置二分查找所在句子，不再重新切分全文。
+    句子 i 为 text[starts[i]:ends[i]]，包含结尾的标点与空白。
+    """
+
+    def __init__(self, text: str):
+        self.text = text
+        ends = [match.end() for match in _SENTENCE_END_RE.finditer(text)]
+        self.starts: List[int] = [0] + ends
+        self.ends: List[int] = ends + [len(text)]
+
+    def __len__(self) -> int:
+        return len(self.starts)
+
+    def sentence_at(self, cursor_pos: int) -> int:
+        """光标所在句子的序号，不在任何句子内时返回 -1"""
+        index = bisect_right(self.starts, cursor_pos) - 1
+        if index >= 0 and cursor_pos < self.ends[index]:
+            return index
+        return -1
+
+    def boundaries(self) -> List[Tuple[int, int]]:
+        return list(zip(self.starts, self.ends))
+
+    def get_context(self, cursor_pos: int, include_adjacent: bool = False, adjacent_count: int = 1) -> str:
+        """获取光标所在句子（及前后各 adjacent_count 句）的文本"""
+        text = self.text
+        if not text:
+            return ""
+
+        current_index = self.sentence_at(cursor_pos)
+        if current_index == -1:
+            return text.strip()
+
+        if not include_adjacent:
+            # 只返回当前句子
+            context = text[self.starts[current_index]:self.ends[current_index]].strip()
+            print(f"返回当前句子: {context}")
+            return context
+
+        # 获取前后句子
+        start_index = max(0, current_index - adjacent_count)
+        end_index = min(len(self) - 1, current_index + adjacent_count)
+
+        context = text[self.starts[start_index]:self.ends[end_index]].strip()
+        print(f"返回{adjacent_count}句上下文: {context}")
+        print(f"包含句子数量: 前{current_index - start_index}句 + 当前句 + 后{end_index - current_index}句")
+        return context
+
+
 class TextContextExtractor:
     @staticmethod
     def get_sentence_boundaries(text: str, cursor_pos: int) -> Tuple[int, int]:
@@ -75,39 +132,100 @@ class TextContextExtractor:
         Returns:
             str: 上下文文本
         """
-        if not text:
-            return ""
-            
-        # 获取所有句子边界
-        all_boundaries = TextContextExtractor.get_all_sentence_boundaries(text)
-        if not all_boundaries:
-            return text.strip()
-            
-        # 找到当前句子的索引
-        current_index = -1
-        for i, (start, end) in enumerate(all_boundaries):
-            if start <= cursor_pos < end:
-                current_index = i
-                break
-                
-        if current_index == -1:
-            return text.strip()
-            
-        if not include_adjacent:
-            # 只返回当前句子
-            start, end = all_boundaries[current_index]
-            context = text[start:end].strip()
-            print(f"返回当前句子: {context}")
-            return context
-            
-        # 获取前后句子
-        start_index = max(0, current_index - adjacent_count)
-        end_index = min(len(all_boundaries) - 1, current_index + adjacent_count)
-        
-        start = all_boundaries[start_index][0]
-        end = all_boundaries[end_index][1]
-        
-        context = text[start:end].strip()
-        print(f"返回{adjacent_count}句上下文: {context}")
-        print(f"包含句子数量: 前{current_index - start_index}句 + 当前句 + 后{end_index - current_index}句")
-        return context 
\ No newline at end of file
+        return SentenceIndex(text).get_context(cursor_pos, include_adjacent, adjacent_count)
+
+
+def _baseline_get_context(text: str, cursor_pos: int, include_adjacent: bool = False, adjacent_count: int = 1) -> str:
+    """原先的上下文提取（每次点击都 re.split 全文并线性查找），仅供基准对比"""
+    sentences = re.split(r'([.!?。！？]+\s*)', text)
+    all_boundaries = []
+    current_pos = 0
+    for i in range(0, len(sentences), 2):
+        sentence_length = len(sentences[i])
+        if i + 1 < len(sentences):
+            sentence_length += len(sentences[i + 1])
+        all_boundaries.append((current_pos, current_pos + sentence_length))
+        current_pos += sentence_length
+
+    current_index = -1
+    for i, (start, end) in enumerate(all_boundaries):
+        if start <= cursor_pos < end:
+            current_index = i
+            break
+    if current_index == -1:
+        return text.strip()
+    if not include_adjacent:
+        start, end = all_boundaries[current_index]
+        return text[start:end].strip()
+    start_index = max(0, current_index - adjacent_count)
+    end_index = min(len(all_boundaries) - 1, current_index + adjacent_count)
+    return text[all_boundaries[start_index][0]:all_boundaries[end_index][1]].strip()
+
+
+def _sample_chapter(size: int) -> str:
+    sentences = [
+        "It was the best of times, it was the worst of times. ",
+        "Was it the age of wisdom? ",
+        "It was the age of foolishness! ",
+        "那是最美好的时代，那是最糟糕的时代。",
+    ]
+    parts = []
+    length = 0
+    i = 0
+    while length < size:
+        sentence = sentences[i % len(sentences)]
+        parts.append(sentence)
+        length += len(sentence)
+        i += 1
+    return "".join(parts)[:size]
+
+
+def _benchmark(text: str, clicks: int = 50) -> None:
+    import contextlib
+    import io
+    import time
+
+    step = max(1, len(text) // clicks)
+    positions = list(range(0, len(text), step))[:clicks]
+    # get_context 会打印结果，计时时丢弃输出
+    with contextlib.redirect_stdout(io.StringIO()):
+        index = SentenceIndex(text)
+        for pos in positions:
+            for adjacent in (False, True):
+                assert index.get_context(pos, adjacent) == _baseline_get_context(text, pos, adjacent), "上下文与原实现不一致"
+
+        started = time.perf_counter()
+        for pos in positions:
+            _baseline_get_context(text, pos, True)
+        baseline = (time.perf_counter() - started) / len(positions)
+
+        started = time.perf_counter()
+        index = SentenceIndex(text)
+        build = time.perf_counter() - started
+
+        started = time.perf_counter()
+        for pos in positions:
+            index.get_context(pos, True)
+        lookup = (time.perf_counter() - started) / len(positions)
+
+    print(f"{len(text)} 个字符，{len(index)} 个句子：")
+    print(f"  原实现每次点击: {baseline * 1000:.2f} ms")
+    print(f"  SentenceIndex 建立（每章一次）: {build * 1000:.2f} ms")
+    print(f"  SentenceIndex 每次点击: {lookup * 1000000:.1f} us")
+
+
+if __name__ == "__main__":
+    # 只依赖标准库，可直接运行：python utils/text_utils.py [章节文本文件] [--size N]
+    import argparse
+
+    parser = argparse.ArgumentParser(description="对比逐次切分全文与句子索引查找上下文的耗时")
+    parser.add_argument("path", nargs="?", help="章节纯文本文件；不指定时生成示例文本")
+    parser.add_argument("--size", type=int, default=500_000, help="生成示例文本的字符数")
+    args = parser.parse_args()
+
+    if args.path:
+        with open(args.path, encoding="utf-8") as file:
+            chapter = file.read()
+    else:
+        chapter = _sample_chapter(args.size)
+    _benchmark(chapter)
@@ -0,0 +1,94 @@
+"""按生僻程度挑选页面中值得预先查询的单词。
+
+生僻程度来自本地词频表（每行一个词，越靠前越常见）；没有词频表时退化为按词长估计。
+用户的已知词表（每行一个词）中的词以及常见词不会被选中。
+"""
+
+from __future__ import annotations
+
+import os
+import re
+from collections import OrderedDict
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+
+from .lookup_cache import word_cache_key
+
+# 词频表中排在这之前的词视为常见词，不预先查询
+COMMON_WORD_CUTOFF = 3000
+MIN_WORD_LENGTH = 4
+
+_WORD_RE = re.compile(r"[A-Za-zÀ-ÖØ-öø-ÿ][A-Za-zÀ-ÖØ-öø-ÿ'’-]*[A-Za-zÀ-ÖØ-öø-ÿ]")
+
+
+def load_word_list(path: Optional[str]) -> List[str]:
+    """读取词表文件（每行一个词，# 开头的行为注释）；文件不存在时返回空列表"""
+    if not path or not os.path.exists(path):
+        return []
+    words = []
+    try:
+        with open(path, "r", encoding="utf-8") as file:
+            for line in file:
+                line = line.strip()
+                if line and not line.startswith("#"):
+                    key = word_cache_key(line.split()[0])
+                    if key:
+                        words.append(key)
+    except Exception as e:
+        print(f"读取词表失败 {path}: {str(e)}")
+    return words
+
+
+def distinct_words(text: str) -> List[Tuple[str, int]]:
+    """text 中不重复的单词（按 word_cache_key 去重）及其首次出现的位置，按出现顺序"""
+    seen: Set[str] = set()
+    words = []
+    for match in _WORD_RE.finditer(text):
+        key = word_cache_key(match.group())
+        if key and key not in seen:
+            seen.add(key)
+            words.append((match.group(), match.start()))
+    return words
+
+
+class WordRanker:
+    """按生僻程度给页面中的单词排序"""
+
+    def __init__(self, frequency_list: Iterable[str] = (), known_words: Iterable[str] = ()):
+        self.ranks: Dict[str, int] = {}
+        for index, word in enumerate(frequency_list):
+            self.ranks.setdefault(word, index)
+        self.known_words: Set[str] = set(known_words)
+
+    def rarity(self, key: str) -> float:
+        """数值越大越生僻；None 表示不值得预先查询"""
+        if self.ranks:
+            rank = self.ranks.get(key)
+            if rank is None:
+                # 词频表中没有的词（含屈折变化形式）按最生僻处理
+                return len(self.ranks) + len(key)
+            return rank if rank >= COMMON_WORD_CUTOFF else -1
+        return len(key)
+
+    def rank(self, text: str, limit: int, exclude: Iterable[str] = ()) -> List[Tuple[str, int]]:
+        """返回 text 中最生僻的 limit 个单词及其首次出现的位置
+
+        跳过已知词、过短的词、首字母大写的词（多为人名地名）与 exclude 中的词。
+        """
+        excluded = set(exclude)
+        first_seen: "OrderedDict[str, Tuple[str, int]]" = OrderedDict()
+        for match in _WORD_RE.finditer(text):
+            word = match.group()
+            if len(word) < MIN_WORD_LENGTH or word[0].isupper():
+                continue
+            key = word_cache_key(word)
+            if key in first_seen or key in excluded or key in self.known_words:
+                continue
+            first_seen[key] = (word, match.start())
+
+        scored = []
+        for key, (word, offset) in first_seen.items():
+            rarity = self.rarity(key)
+            if rarity >= 0:
+                scored.append((rarity, word, offset))
+        scored.sort(key=lambda item: item[0], reverse=True)
+        return [(word, offset) for _, word, offset in scored[:limit]]